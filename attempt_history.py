@@ -0,0 +1,124 @@
+"""Append-only on-disk history of every answered question.
+
+The history file is a 16-byte header (magic "QZHIST\\0\\0", version u32,
+record size u32) followed by fixed-size little-endian records:
+
+    answered_at    f8   Unix time the quiz finished
+    question_id    u8   Question.question_id
+    response_time  f4   seconds, NaN if untimed
+    category       u2   line number in the categories file
+    difficulty     u1   0 unknown, 1 easy, 2 medium, 3 hard
+    outcome        u1   0 wrong, 1 correct, 2 timed out
+
+Category names live in a side file, one per line, also only ever appended
+to. Records are only appended, so a whole quiz is written with one write
+call, and loading is a single read (or memory map) that needs no parsing.
+See attempt_stats for the analytics over it.
+"""
+import os
+import struct
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAGIC = b"QZHIST\0\0"
+VERSION = 1
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct("<dQfHBB")
+DEFAULT_HISTORY_PATH = os.path.join(os.path.expanduser("~"), ".quiz_app", "history.bin")
+
+DIFFICULTIES = ["", "easy", "medium", "hard"]
+WRONG, CORRECT, TIMED_OUT = 0, 1, 2
+
+Attempt = Tuple[float, int, float, str, str, int]  # answered_at, question_id, response_time, category, difficulty, outcome
+
+
+class HistoryFormatError(Exception):
+    """Raised when a file is not a readable attempt history."""
+
+
+class AttemptHistory:
+    """Writer for the attempt history file and its category table."""
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH):
+        self.path = path
+        self.categories_path = path + ".categories"
+        self._category_codes: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_env(cls) -> "AttemptHistory":
+        return cls(os.environ.get("QUIZ_APP_HISTORY_PATH", DEFAULT_HISTORY_PATH))
+
+    def categories(self) -> List[str]:
+        try:
+            with open(self.categories_path, encoding="utf-8") as f:
+                return f.read().splitlines()
+        except FileNotFoundError:
+            return []
+
+    def _category_code(self, category: str, new: List[str]) -> int:
+        if self._category_codes is None:
+            self._category_codes = {name: code for code, name in enumerate(self.categories())}
+        code = self._category_codes.get(category)
+        if code is None:
+            code = self._category_codes[category] = len(self._category_codes)
+            new.append(category)
+        return code
+
+    def append(self, attempts: Iterable[Attempt]) -> int:
+        """Append attempts in one write; returns how many were written."""
+        new_categories: List[str] = []
+        chunks = []
+        for answered_at, qid, response_time, category, difficulty, outcome in attempts:
+            chunks.append(RECORD.pack(
+                answered_at, qid, response_time, self._category_code(category, new_categories),
+                DIFFICULTIES.index(difficulty) if difficulty in DIFFICULTIES else 0, outcome,
+            ))
+        if not chunks:
+            return 0
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        if new_categories:
+            # Categories go first, so a record never refers to a code that is not on disk
+            with open(self.categories_path, "a", encoding="utf-8") as f:
+                f.write("".join(name.replace("\n", " ") + "\n" for name in new_categories))
+        with open(self.path, "ab") as f:
+            size = f.tell()
+            if size < HEADER.size:
+                f.truncate(0)
+                f.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+            elif (size - HEADER.size) % RECORD.size:
+                # Drop a record torn by a crash, or everything after it would be misaligned
+                f.truncate(size - (size - HEADER.size) % RECORD.size)
+            f.write(b"".join(chunks))
+        return len(chunks)
+
+    def record_session(self, session, answered_at: Optional[float] = None) -> int:
+        """Append every answered question of a QuizSession."""
+        answered_at = time.time() if answered_at is None else answered_at
+        attempts = []
+        for index in range(session.answered):
+            question = session.questions[index]
+            if session.answer_sheet.is_correct(index):
+                outcome = CORRECT
+            elif session.answer_sheet.answer(index, question) is None:
+                outcome = TIMED_OUT
+            else:
+                outcome = WRONG
+            attempts.append((answered_at, question.question_id, session.response_times[index],
+                             question.category, question.difficulty, outcome))
+        return self.append(attempts)
+
+
+def record_count(path: str) -> int:
+    """Validate a history file's header; returns how many complete records it holds."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            size = os.fstat(f.fileno()).st_size
+    except FileNotFoundError:
+        return 0
+    if len(header) < HEADER.size:
+        raise HistoryFormatError(f"{path} is too small to be an attempt history")
+    magic, version, record_size = HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise HistoryFormatError(f"{path} is not a version {VERSION} attempt history")
+    return (size - HEADER.size) // RECORD.size  # A torn final write leaves a partial record; skip it
@@ -0,0 +1,154 @@
+"""Vectorized statistics over the attempt history (see attempt_history).
+
+The history is memory-mapped as a NumPy structured array and every
+aggregate is a handful of whole-array operations (bincount, percentile),
+so millions of answers take milliseconds.
+
+Usage: python attempt_stats.py [history.bin]
+"""
+import sys
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from attempt_history import CORRECT, DIFFICULTIES, HEADER, TIMED_OUT, AttemptHistory, record_count
+
+RECORD_DTYPE = np.dtype([
+    ("answered_at", "<f8"),
+    ("question_id", "<u8"),
+    ("response_time", "<f4"),
+    ("category", "<u2"),
+    ("difficulty", "u1"),
+    ("outcome", "u1"),
+])
+DAY = 24 * 60 * 60
+
+
+def load_history(path: str) -> np.ndarray:
+    """Map a history file as a structured array (empty if there is no history yet)."""
+    count = record_count(path)
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER.size, shape=(count,))
+
+
+def _accuracy_rows(codes: np.ndarray, outcome: np.ndarray, size: int) -> Dict[str, np.ndarray]:
+    answers = np.bincount(codes, minlength=size)
+    correct = np.bincount(codes, weights=outcome == CORRECT, minlength=size)
+    timed_out = np.bincount(codes, weights=outcome == TIMED_OUT, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        accuracy = correct / answers
+    return {"answers": answers, "correct": correct.astype(np.int64), "timed_out": timed_out.astype(np.int64),
+            "accuracy": accuracy}
+
+
+def accuracy_by_category(history: np.ndarray, categories: Sequence[str]) -> List[Dict]:
+    size = max(len(categories), int(history["category"].max()) + 1 if len(history) else 0)
+    rows = _accuracy_rows(history["category"], history["outcome"], size)
+    return [{"category": categories[code] if code < len(categories) else f"#{code}",
+             "answers": int(rows["answers"][code]), "correct": int(rows["correct"][code]),
+             "timed_out": int(rows["timed_out"][code]), "accuracy": float(rows["accuracy"][code])}
+            for code in np.flatnonzero(rows["answers"])]
+
+
+def accuracy_by_category_difficulty(history: np.ndarray, categories: Sequence[str]) -> List[Dict]:
+    levels = len(DIFFICULTIES)
+    size = max(len(categories), int(history["category"].max()) + 1 if len(history) else 0) * levels
+    # One bincount over a combined (category, difficulty) key
+    keys = history["category"].astype(np.int64) * levels + history["difficulty"]
+    rows = _accuracy_rows(keys, history["outcome"], size)
+    return [{"category": categories[key // levels] if key // levels < len(categories) else f"#{key // levels}",
+             "difficulty": DIFFICULTIES[key % levels] or "unknown",
+             "answers": int(rows["answers"][key]), "accuracy": float(rows["accuracy"][key])}
+            for key in np.flatnonzero(rows["answers"])]
+
+
+def response_time_percentiles(history: np.ndarray, percentiles: Sequence[float] = (50, 90, 99),
+                              include_timeouts: bool = False) -> Dict[str, Optional[float]]:
+    times = history["response_time"]
+    mask = ~np.isnan(times)
+    if not include_timeouts:
+        mask &= history["outcome"] != TIMED_OUT
+    times = times[mask]
+    if not len(times):
+        return {f"p{p:g}": None for p in percentiles}
+    return {f"p{p:g}": float(value) for p, value in zip(percentiles, np.percentile(times, percentiles))}
+
+
+def _group(keys: np.ndarray):
+    """(distinct sorted keys, code of each element); like np.unique(return_inverse=True) for small ranges."""
+    low = int(keys.min())
+    span = int(keys.max()) - low + 1
+    if span > 4 * len(keys):
+        return np.unique(keys, return_inverse=True)
+    present = np.bincount(keys - low, minlength=span) > 0
+    codes = np.cumsum(present) - 1
+    return np.flatnonzero(present) + low, codes[keys - low]
+
+
+def trend(history: np.ndarray, period: float = DAY, since: Optional[float] = None) -> List[Dict]:
+    """Answers, accuracy and median response time per period (a day by default)."""
+    if since is not None:
+        history = history[history["answered_at"] >= since]
+    if not len(history):
+        return []
+    starts, inverse = _group((history["answered_at"] // period).astype(np.int64))
+    rows = _accuracy_rows(inverse, history["outcome"], len(starts))
+    # Medians per bucket: one sort of (bucket << 32 | time bits) -- non-negative float32
+    # bit patterns order like the floats -- then index the middle of each run
+    times = np.ascontiguousarray(history["response_time"])
+    valid = ~np.isnan(times)
+    codes = inverse[valid].astype(np.uint64)
+    keys = np.sort((codes << np.uint64(32)) | times[valid].view(np.uint32).astype(np.uint64))
+    sorted_times = (keys & np.uint64(0xFFFFFFFF)).astype(np.uint32).view(np.float32).astype(np.float64)
+    counts = np.bincount(codes.astype(np.int64), minlength=len(starts))
+    ends = np.cumsum(counts)
+    medians = np.full(len(starts), np.nan)
+    has_times = counts > 0
+    lower = (ends - counts + (counts - 1) // 2)[has_times]
+    upper = (ends - counts + counts // 2)[has_times]
+    medians[has_times] = (sorted_times[lower] + sorted_times[upper]) / 2
+    return [{"period_start": float(start * period), "answers": int(rows["answers"][i]),
+             "accuracy": float(rows["accuracy"][i]),
+             "median_response_time": None if np.isnan(medians[i]) else float(medians[i])}
+            for i, start in enumerate(starts)]
+
+
+def _count_distinct(values: np.ndarray) -> int:
+    # A plain sort is much faster than np.unique's hash path for millions of u8 ids
+    ordered = np.sort(values)
+    return int(np.count_nonzero(ordered[1:] != ordered[:-1]) + 1) if len(ordered) else 0
+
+
+def summary(history: np.ndarray, categories: Sequence[str]) -> Dict:
+    outcome = history["outcome"]
+    answers = len(history)
+    return {
+        "answers": answers,
+        "correct": int(np.count_nonzero(outcome == CORRECT)),
+        "timed_out": int(np.count_nonzero(outcome == TIMED_OUT)),
+        "accuracy": float(np.count_nonzero(outcome == CORRECT) / answers) if answers else None,
+        "distinct_questions": _count_distinct(history["question_id"]),
+        "response_time": response_time_percentiles(history),
+        "by_category": accuracy_by_category(history, categories),
+    }
+
+
+def main(argv: List[str]):
+    history_file = AttemptHistory(argv[0]) if argv else AttemptHistory.from_env()
+    history = load_history(history_file.path)
+    stats = summary(history, history_file.categories())
+    if not stats["answers"]:
+        print("No answers recorded yet.")
+        return
+    times = stats["response_time"]
+    print(f"{stats['answers']} answers to {stats['distinct_questions']} questions, "
+          f"{stats['accuracy']:.1%} correct, {stats['timed_out']} timed out")
+    if times["p50"] is not None:
+        print(f"Response time: median {times['p50']:.1f} s, p90 {times['p90']:.1f} s, p99 {times['p99']:.1f} s")
+    for row in sorted(stats["by_category"], key=lambda row: -row["answers"]):
+        print(f"  {row['category']:45} {row['answers']:8} answers  {row['accuracy']:6.1%}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,71 @@
+"""Measure open time, random-access latency and RSS of memory-mapped question banks.
+
+Usage: python -m benchmarks.bench_bank_file [count ...]
+
+Each bank is compiled from synthetic records into a temporary directory and
+then opened in a fresh interpreter, so the RSS figures are not polluted by
+the compile step.
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import List
+
+from benchmarks.synthetic import make_records
+from question_bank_file import compile_bank
+
+PROBE = r"""
+import json, random, resource, sys, time
+from question_bank_file import MappedQuestionBank
+
+def rss_kib(field):
+    # Anonymous (private) memory is what grows with parsing; mapped file pages are shared page cache
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+start = time.perf_counter()
+bank = MappedQuestionBank(sys.argv[1])
+opened = time.perf_counter()
+rng = random.Random(0)
+for _ in range(1000):
+    bank[rng.randrange(len(bank))]
+done = time.perf_counter()
+print(json.dumps({
+    "open_ms": (opened - start) * 1000,
+    "random_read_us": (done - opened) / 1000 * 1e6,
+    "max_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "rss_anon_kib": rss_kib("RssAnon"),
+    "rss_file_kib": rss_kib("RssFile"),
+}))
+"""
+
+
+def main(argv: List[str]):
+    counts = [int(arg) for arg in argv] or [1_000, 10_000, 100_000, 1_000_000]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in counts:
+            path = os.path.join(tmp, f"bank_{count}.qbank")
+            compile_bank(make_records(count), path)
+            probe = subprocess.run([sys.executable, "-c", PROBE, path], cwd=root,
+                                   capture_output=True, text=True, check=True)
+            row = {"questions": count, "file_bytes": os.path.getsize(path), **json.loads(probe.stdout)}
+            results.append(row)
+            print(f"{count:>9} questions: open {row['open_ms']:7.2f} ms | "
+                  f"random read {row['random_read_us']:6.1f} us | "
+                  f"RSS {row['max_rss_kib'] / 1024:6.1f} MiB (anon {(row['rss_anon_kib'] or 0) / 1024:5.1f} MiB)",
+                  file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,94 @@
+"""Ingest throughput with fingerprint deduplication.
+
+Feeds the same overlapping stream of records (a share of them resent with
+different case, spacing or escaping, as OpenTDB and old dumps do) through:
+
+- quiz_core.question_id alone (fingerprinting cost),
+- a Deduplicator over raw records (bank compiles, dump imports),
+- QuestionCache.put in API-sized batches (the persistent fingerprint index, up to
+  DEFAULT_MAX_ENTRIES records),
+- compile_bank with and without a Deduplicator in front.
+
+Usage: python -m benchmarks.bench_dedup [count] [duplicate_share]
+"""
+import html
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.synthetic import make_records
+from question_bank_file import compile_bank
+from question_cache import DEFAULT_MAX_ENTRIES, QuestionCache
+from quiz_core import Deduplicator, record_question_id
+
+
+def with_duplicates(count: int, share: float, seed: int = 0) -> List[Dict]:
+    """`count` records of which about `share` repeat an earlier one, re-cased or re-escaped."""
+    rng = random.Random(seed)
+    unique = list(make_records(int(count * (1 - share))))
+    records = list(unique)
+    while len(records) < count:
+        original = rng.choice(unique)
+        variant = dict(original)
+        prompt = html.unescape(original["question"])
+        variant["question"] = rng.choice([prompt.upper(), "  " + prompt.replace(" ", "  "), html.escape(prompt)])
+        records.append(variant)
+    rng.shuffle(records)
+    return records
+
+
+def rate(count: int, seconds: float) -> float:
+    return count / seconds if seconds else float("inf")
+
+
+def main(argv: List[str]):
+    count = int(argv[0]) if argv else 200_000
+    share = float(argv[1]) if len(argv) > 1 else 0.3
+    records = with_duplicates(count, share)
+    result = {"records": count, "duplicate_share": share}
+
+    start = time.perf_counter()
+    for item in records:
+        record_question_id(item)
+    result["fingerprints_per_s"] = rate(count, time.perf_counter() - start)
+
+    seen = Deduplicator()
+    start = time.perf_counter()
+    kept = sum(1 for _ in seen.records(records))
+    result["deduplicator_records_per_s"] = rate(count, time.perf_counter() - start)
+    result["unique"] = kept
+    result["duplicates_dropped"] = seen.dropped
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The cache commits every batch, so it is measured over one default-sized cache's worth
+        cached = records[:DEFAULT_MAX_ENTRIES]
+        cache = QuestionCache(os.path.join(tmp, "cache.sqlite3"))
+        start = time.perf_counter()
+        for offset in range(0, len(cached), 50):
+            cache.put(cached[offset:offset + 50])
+        result["cache_put_records_per_s"] = rate(len(cached), time.perf_counter() - start)
+        result["cache_stats"] = cache.stats()
+        cache.close()
+
+        for name, items in (("compile_bank_plain", lambda: records),
+                            ("compile_bank_dedup", lambda: Deduplicator().records(records))):
+            path = os.path.join(tmp, f"{name}.qbank")
+            start = time.perf_counter()
+            stored = compile_bank(items(), path)
+            result[f"{name}_records_per_s"] = rate(count, time.perf_counter() - start)
+            result[f"{name}_stored"] = stored
+
+    print(f"{count:,} records, {result['duplicates_dropped']:,} duplicates: "
+          f"fingerprint {result['fingerprints_per_s']:,.0f}/s, deduplicator {result['deduplicator_records_per_s']:,.0f}/s, "
+          f"cache put {result['cache_put_records_per_s']:,.0f}/s, "
+          f"compile {result['compile_bank_plain_records_per_s']:,.0f}/s plain vs "
+          f"{result['compile_bank_dedup_records_per_s']:,.0f}/s deduplicated", file=sys.stderr)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,214 @@
+"""Fetch-pipeline benchmark: request, JSON decode and HTML unescape, per frontend.
+
+Both frontends are driven against the local mock OpenTDB with a cold cache:
+quiz_app.py through its FetchWorker on the Qt thread pool (time until the
+page reaches the GUI thread) and quiz_app_gui.py through load_questions,
+which blocks the Tk event loop for the whole fetch. Each scenario adds mock
+latency or injected errors (HTTP 429 and response codes 1-5).
+
+Usage: python -m benchmarks.bench_fetch [--iterations N] [--amount N] [--frontends qt,tk]
+                                        [--backoff-base SECONDS] [--output results.json]
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+import question_cache
+import quiz_core
+from benchmarks.mock_opentdb import HTTP_TOO_MANY_REQUESTS, start_mock_server
+from benchmarks.synthetic import make_records
+from question_cache import QuestionCache
+from quiz_core import QuestionFetchError, parse_questions
+
+SCENARIOS = [
+    {"name": "baseline", "latency": 0.0, "error_rate": 0.0, "errors": []},
+    {"name": "latency_50ms", "latency": 0.05, "error_rate": 0.0, "errors": []},
+    {"name": "retryable_errors", "latency": 0.0, "error_rate": 0.3, "errors": [HTTP_TOO_MANY_REQUESTS, 5]},
+    {"name": "failing_errors", "latency": 0.0, "error_rate": 0.3, "errors": [1, 2, 3, 4]},
+]
+
+
+def bench_parse(total: int, page_size: int) -> Dict:
+    """JSON decode and html.unescape throughput over API-sized pages, without the network."""
+    records = list(make_records(page_size))
+    body = json.dumps({"response_code": 0, "results": records})
+    pages = max(1, total // page_size)
+    start = time.perf_counter()
+    decoded = [json.loads(body)["results"] for _ in range(pages)]
+    decode_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for items in decoded:
+        parse_questions(items)
+    parse_s = time.perf_counter() - start
+    tracemalloc.start()
+    parse_questions(json.loads(body)["results"])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    questions = pages * page_size
+    return {
+        "questions": questions,
+        "decode_questions_per_s": questions / decode_s,
+        "parse_questions_per_s": questions / parse_s,
+        "page_peak_kib": peak / 1024,
+    }
+
+
+def gui_fetch(amount: int) -> Callable[[], Dict]:
+    """quiz_app_gui.py: a synchronous fetch on the Tk thread."""
+    import quiz_app_gui
+    from quiz_prefetch import QuizPrefetcher
+
+    quiz_app_gui._prefetcher = QuizPrefetcher(depth=0)  # Every fetch is timed; none may be served prefetched
+
+    def fetch() -> Dict:
+        start = time.perf_counter()
+        questions = quiz_app_gui.load_questions(str(amount))
+        elapsed = time.perf_counter() - start
+        return {"questions": len(questions), "latency_s": elapsed, "first_page_s": elapsed}
+    return fetch
+
+
+def qt_fetch(amount: int) -> Callable[[], Dict]:
+    """quiz_app.py: a FetchWorker on the global thread pool, timed until its signals arrive."""
+    from PyQt5.QtCore import QCoreApplication, QEventLoop, QThreadPool
+    from quiz_app import FetchWorker
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+
+    def fetch() -> Dict:
+        loop = QEventLoop()
+        result = {"questions": 0, "first_page_s": None, "error": None}
+        worker = FetchWorker(amount, None, None)
+
+        def on_page(page):
+            if result["first_page_s"] is None:
+                result["first_page_s"] = time.perf_counter() - start
+            result["questions"] += len(page)
+
+        def on_failed(message):
+            result["error"] = message
+            loop.quit()
+
+        worker.signals.page_ready.connect(on_page)
+        worker.signals.finished.connect(loop.quit)
+        worker.signals.failed.connect(on_failed)
+        start = time.perf_counter()
+        QThreadPool.globalInstance().start(worker)
+        loop.exec_()
+        result["latency_s"] = time.perf_counter() - start
+        if result["error"]:
+            raise QuestionFetchError(result.pop("error"))
+        del result["error"]
+        return result
+    fetch.app = app  # Keep the application alive as long as the fetcher
+    return fetch
+
+
+FRONTENDS = {"qt": ("quiz_app.py", qt_fetch), "tk": ("quiz_app_gui.py", gui_fetch)}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_scenario(fetch: Callable[[], Dict], iterations: int, mock) -> Dict:
+    latencies, first_pages, failures = [], [], {}
+    questions = 0
+    requests_before = mock.requests
+    injected_before = dict(mock.injected)
+    for _ in range(iterations):
+        # A cold cache every time, so each iteration goes to the (mock) API
+        quiz_core.set_question_cache(QuestionCache(":memory:"))
+        try:
+            result = fetch()
+        except QuestionFetchError as e:
+            failures[str(e)] = failures.get(str(e), 0) + 1
+            continue
+        latencies.append(result["latency_s"])
+        first_pages.append(result["first_page_s"])
+        questions += result["questions"]
+    latencies.sort()
+    first_pages.sort()
+    summary = {
+        "iterations": iterations,
+        "succeeded": len(latencies),
+        "failures": failures,
+        "api_requests": mock.requests - requests_before,
+        "injected_errors": {str(error): count - injected_before.get(error, 0)
+                            for error, count in mock.injected.items() if count != injected_before.get(error, 0)},
+    }
+    if latencies:
+        summary.update({
+            "latency_p50_ms": statistics.median(latencies) * 1000,
+            "latency_p95_ms": percentile(latencies, 0.95) * 1000,
+            "latency_max_ms": latencies[-1] * 1000,
+            "first_page_p50_ms": statistics.median(first_pages) * 1000,
+            "questions_per_s": questions / sum(latencies),
+        })
+    return summary
+
+
+def peak_memory(fetch: Callable[[], Dict]) -> float:
+    """Peak Python heap allocated during one cold fetch, in KiB."""
+    quiz_core.set_question_cache(QuestionCache(":memory:"))
+    tracemalloc.start()
+    fetch()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main(argv: List[str]):
+    parser = argparse.ArgumentParser(description="Benchmark the question fetch pipeline of both frontends")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--amount", type=int, default=quiz_core.PAGE_SIZE, help="questions per fetch (1-50)")
+    parser.add_argument("--frontends", default="qt,tk")
+    parser.add_argument("--backoff-base", type=float, default=quiz_core.BACKOFF_BASE,
+                        help="retry backoff in seconds (the client default is used unless given)")
+    parser.add_argument("--parse-questions", type=int, default=100_000)
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args(argv)
+
+    server = start_mock_server()
+    mock = server.mock
+    quiz_core._client = quiz_core.OpenTDBClient(f"http://127.0.0.1:{server.server_address[1]}", interval=0)
+    quiz_core.BACKOFF_BASE = args.backoff_base
+    quiz_core.set_question_bank(None)
+    question_cache.REFILL_THRESHOLD = 0  # No background refills competing with the timed fetches
+
+    results = {
+        "config": {"iterations": args.iterations, "amount": args.amount, "backoff_base_s": args.backoff_base,
+                   "python": sys.version.split()[0], "platform": sys.platform},
+        "parse": bench_parse(args.parse_questions, quiz_core.PAGE_SIZE),
+        "fetch": [],
+    }
+    print(f"parse: {results['parse']['decode_questions_per_s']:,.0f} q/s decode, "
+          f"{results['parse']['parse_questions_per_s']:,.0f} q/s unescape", file=sys.stderr)
+    for key in args.frontends.split(","):
+        frontend, make_fetch = FRONTENDS[key]
+        fetch = make_fetch(args.amount)
+        mock.latency, mock.error_rate, mock.errors = 0.0, 0.0, []
+        fetch()  # Warm up imports and the keep-alive connection
+        memory = peak_memory(fetch)
+        for scenario in SCENARIOS:
+            mock.latency, mock.error_rate, mock.errors = scenario["latency"], scenario["error_rate"], scenario["errors"]
+            summary = run_scenario(fetch, args.iterations, mock)
+            results["fetch"].append({"frontend": frontend, "scenario": scenario["name"], "peak_kib": memory, **summary})
+            print(f"{frontend:16} {scenario['name']:17} {summary['succeeded']}/{args.iterations} ok, "
+                  f"p50 {summary.get('latency_p50_ms', float('nan')):.1f} ms, "
+                  f"p95 {summary.get('latency_p95_ms', float('nan')):.1f} ms", file=sys.stderr)
+    server.shutdown()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
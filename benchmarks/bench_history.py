@@ -0,0 +1,87 @@
+"""Attempt history: append throughput, and load/aggregate time at millions of answers.
+
+Usage: python -m benchmarks.bench_history [count ...]   (default 100k, 1M and 5M answers)
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+import numpy as np
+
+from attempt_history import HEADER, MAGIC, RECORD, VERSION, AttemptHistory
+from attempt_stats import (
+    RECORD_DTYPE, accuracy_by_category_difficulty, load_history, response_time_percentiles, summary, trend
+)
+from category_catalog import DEFAULT_CATEGORIES
+
+CATEGORIES = list(DEFAULT_CATEGORIES.values())
+
+
+def bench_append(path: str, quizzes: int = 10_000, per_quiz: int = 10) -> float:
+    """Answers appended per second through AttemptHistory, one quiz per write."""
+    history = AttemptHistory(path)
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for quiz in range(quizzes):
+        history.append((1.7e9 + quiz * 60, int(rng.integers(2 ** 63)), 5.0, CATEGORIES[quiz % len(CATEGORIES)],
+                        "easy", quiz % 3) for _ in range(per_quiz))
+    return quizzes * per_quiz / (time.perf_counter() - start)
+
+
+def write_synthetic(path: str, count: int):
+    """Write `count` random answers spread over a year in one go."""
+    rng = np.random.default_rng(count)
+    records = np.empty(count, dtype=RECORD_DTYPE)
+    records["answered_at"] = np.sort(1.7e9 + rng.random(count) * 365 * 86400)
+    records["question_id"] = rng.integers(0, 2 ** 63, count, dtype=np.uint64)
+    records["response_time"] = rng.gamma(2.0, 4.0, count).astype(np.float32)
+    records["category"] = rng.integers(0, len(CATEGORIES), count)
+    records["difficulty"] = rng.integers(0, 4, count)
+    records["outcome"] = rng.choice(3, count, p=[0.3, 0.6, 0.1])
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+        records.tofile(f)
+    with open(path + ".categories", "w", encoding="utf-8") as f:
+        f.write("".join(name + "\n" for name in CATEGORIES))
+
+
+def timed_ms(function, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv: List[str]):
+    counts = [int(arg) for arg in argv] or [100_000, 1_000_000, 5_000_000]
+    results = {"append_answers_per_s": None, "aggregates": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        results["append_answers_per_s"] = bench_append(os.path.join(tmp, "append.bin"))
+        print(f"append: {results['append_answers_per_s']:,.0f} answers/s", file=sys.stderr)
+        for count in counts:
+            path = os.path.join(tmp, f"history_{count}.bin")
+            write_synthetic(path, count)
+            history = load_history(path)
+            row = {
+                "answers": count,
+                "file_mb": os.path.getsize(path) / 2 ** 20,
+                "load_ms": timed_ms(lambda: load_history(path)),
+                "summary_ms": timed_ms(lambda: summary(history, CATEGORIES)),
+                "category_difficulty_ms": timed_ms(lambda: accuracy_by_category_difficulty(history, CATEGORIES)),
+                "percentiles_ms": timed_ms(lambda: response_time_percentiles(history)),
+                "daily_trend_ms": timed_ms(lambda: trend(history)),
+            }
+            results["aggregates"].append(row)
+            print(f"{count:>10,} answers: load {row['load_ms']:.2f} ms, summary {row['summary_ms']:.0f} ms, "
+                  f"percentiles {row['percentiles_ms']:.0f} ms, trend {row['daily_trend_ms']:.0f} ms", file=sys.stderr)
+            del history
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,69 @@
+"""Compare indexed sampling with a scan-and-shuffle over a compiled question bank.
+
+Usage: python -m benchmarks.bench_index [count]   (default 1,000,000 questions)
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List
+
+from benchmarks.synthetic import make_records
+from question_bank_file import MappedQuestionBank, compile_bank
+
+FILTERS = [
+    {},
+    {"difficulty": "hard"},
+    {"category": "Science: Computers", "difficulty": "easy"},
+    {"category": "History", "difficulty": "medium", "question_type": "boolean"},
+]
+AMOUNTS = [10, 50]
+
+
+def scan_and_shuffle(bank: MappedQuestionBank, amount: int, category=None, difficulty=None, question_type=None):
+    """The naive approach: test every question, then shuffle the matches."""
+    wanted = (category, difficulty, question_type)
+    matches = []
+    for i in range(len(bank)):
+        names = [table[code] for table, code in zip((bank.categories, bank.difficulties, bank.types), bank.codes(i))]
+        if all(want is None or want == name for want, name in zip(wanted, names)):
+            matches.append(i)
+    random.shuffle(matches)
+    return matches[:amount]
+
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(argv: List[str]):
+    count = int(argv[0]) if argv else 1_000_000
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bank.qbank")
+        compile_bank(make_records(count), path)
+        bank = MappedQuestionBank(path)
+        for filters in FILTERS:
+            matching = bank.index.count(**filters)
+            naive = timed(lambda: scan_and_shuffle(bank, 10, **filters), repeat=1)
+            for amount in AMOUNTS:
+                indexed = timed(lambda: bank.index.sample(amount, **filters), repeat=200)
+                with_decode = timed(lambda: bank.sample(amount, **filters), repeat=200)
+                row = {"questions": count, "filters": filters, "matching": matching, "amount": amount,
+                       "index_sample_us": indexed * 1e6, "sample_and_decode_us": with_decode * 1e6,
+                       "scan_and_shuffle_ms": naive * 1000}
+                results.append(row)
+                print(f"{json.dumps(filters):<75} k={amount:<3} matching={matching:>7}: "
+                      f"index {row['index_sample_us']:8.1f} us | with decode {row['sample_and_decode_us']:8.1f} us | "
+                      f"scan {row['scan_and_shuffle_ms']:8.1f} ms", file=sys.stderr)
+        bank.close()
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,63 @@
+"""Compare the memory used by a list of Question objects with a columnar QuestionBank.
+
+Usage: python -m benchmarks.bench_memory [count ...]
+"""
+import gc
+import html
+import json
+import sys
+import tracemalloc
+from typing import List
+
+from benchmarks.synthetic import make_records
+from question_bank import QuestionBank
+from quiz_core import parse_question
+
+
+class LegacyQuestion:
+    """The dict-backed Question used before __slots__ and AnswerSheet."""
+
+    def __init__(self, prompt: str, correct_answer: str, incorrect_answers: List[str]):
+        self.prompt = prompt
+        self.correct_answer = correct_answer
+        self.incorrect_answers = incorrect_answers
+        self.user_answer = None
+
+
+def legacy_list(records):
+    return [LegacyQuestion(html.unescape(item["question"]), html.unescape(item["correct_answer"]),
+                           [html.unescape(ans) for ans in item["incorrect_answers"]]) for item in records]
+
+
+def slotted_list(records):
+    return [parse_question(item) for item in records]
+
+
+def measure(build, count: int) -> int:
+    """Bytes still allocated after building from `count` streamed records."""
+    gc.collect()
+    tracemalloc.start()
+    result = build(make_records(count))
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main(argv: List[str]):
+    counts = [int(arg) for arg in argv] or [10_000, 100_000]
+    results = []
+    for count in counts:
+        row = {"questions": count}
+        for name, build in (("legacy_list", legacy_list), ("slotted_list", slotted_list),
+                            ("question_bank", QuestionBank.from_records)):
+            row[f"{name}_bytes"] = measure(build, count)
+        results.append(row)
+        print(f"{count:>9} questions: legacy {row['legacy_list_bytes'] / 2**20:8.1f} MiB | "
+              f"slotted {row['slotted_list_bytes'] / 2**20:8.1f} MiB | "
+              f"bank {row['question_bank_bytes'] / 2**20:8.1f} MiB", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,72 @@
+"""Time to start the next quiz, with and without prefetching.
+
+Plays a series of quizzes back to back against the local mock OpenTDB (with
+added latency and a cold cache, so every fetch goes to the API): each quiz
+is started, "played" for a while, then the next one is started with the same
+settings, as "play again" does. Reports the median and worst start time,
+the prefetch hit rate and how long served sets had waited, and the API
+request rate (which must stay within the client's rate limit).
+
+Usage: python -m benchmarks.bench_prefetch [quizzes] [play_seconds] [api_latency_ms] [interval_s]
+"""
+import json
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+import quiz_core
+from benchmarks.mock_opentdb import start_mock_server
+from question_cache import QuestionCache
+from quiz_core import fetch_questions
+from quiz_prefetch import QuizPrefetcher
+
+
+def play_series(quizzes: int, play_seconds: float, amount: int, prefetcher: QuizPrefetcher) -> Dict:
+    starts: List[float] = []
+    for _ in range(quizzes):
+        start = time.perf_counter()
+        questions = prefetcher.take(amount)
+        if questions is None:
+            questions = fetch_questions(amount)
+        starts.append((time.perf_counter() - start) * 1000)
+        assert len(questions) == amount
+        prefetcher.predict(amount)
+        time.sleep(play_seconds)
+    return {"median_start_ms": statistics.median(starts), "first_start_ms": starts[0],
+            "max_later_start_ms": max(starts[1:], default=0.0)}
+
+
+def main(argv: List[str]):
+    quizzes = int(argv[0]) if argv else 10
+    play_seconds = float(argv[1]) if len(argv) > 1 else 1.0
+    latency = float(argv[2]) / 1000 if len(argv) > 2 else 0.5
+    interval = float(argv[3]) if len(argv) > 3 else 0.25
+    server = start_mock_server()
+    server.mock.latency = latency
+    quiz_core._client = quiz_core.OpenTDBClient(f"http://127.0.0.1:{server.server_address[1]}", interval=interval)
+    results = {"quizzes": quizzes, "play_seconds": play_seconds, "api_latency_ms": latency * 1000,
+               "interval_s": interval}
+    for name, depth in (("no_prefetch", 0), ("prefetch", 2)):
+        quiz_core.set_question_cache(QuestionCache(":memory:", ttl=0))  # Nothing cached is fresh: every fetch is a miss
+        requests_before = server.mock.requests
+        prefetcher = QuizPrefetcher(depth=depth)
+        start = time.perf_counter()
+        row = play_series(quizzes, play_seconds, 10, prefetcher)
+        elapsed = time.perf_counter() - start
+        row["api_requests_per_s"] = (server.mock.requests - requests_before) / elapsed
+        row["prefetch"] = prefetcher.stats()
+        results[name] = row
+    server.shutdown()
+    for name in ("no_prefetch", "prefetch"):
+        row = results[name]
+        print(f"{name:11}: median start {row['median_start_ms']:7.1f} ms, later starts up to "
+              f"{row['max_later_start_ms']:7.1f} ms, {row['api_requests_per_s']:.2f} API requests/s", file=sys.stderr)
+    prefetch = results["prefetch"]["prefetch"]
+    print(f"prefetch hit rate {prefetch['hit_rate']:.0%}, served sets waited median {prefetch['median_age_s']:.1f} s "
+          f"(max {prefetch['max_age_s']:.1f} s), {prefetch['discarded']} discarded", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,87 @@
+"""Spaced-repetition deck: picking the next due batch and grading a quiz, at 100k cards.
+
+Usage: python -m benchmarks.bench_review [cards] [batch]
+"""
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+from benchmarks.synthetic import make_records
+from quiz_core import parse_questions
+from quiz_session import QuizSession
+from review_scheduler import DAY, ReviewScheduler
+
+
+def play(scheduler: ReviewScheduler, questions, rng: random.Random, now: float, miss_rate: float = 1.0):
+    """Answer every question (wrongly with probability `miss_rate`) and grade the quiz."""
+    session = QuizSession(questions, rng=rng)
+    session.start()
+    while session.has_question():
+        options = session.present()
+        correct = rng.random() >= miss_rate
+        session.answer(session.current_correct_index if correct else (session.current_correct_index + 1) % len(options),
+                       rng.uniform(1, 30))
+    session.finish()
+    scheduler.record_session(session, now=now)
+
+
+def main(argv: List[str]):
+    cards = int(argv[0]) if argv else 100_000
+    batch = int(argv[1]) if len(argv) > 1 else 20
+    rng = random.Random(0)
+    questions = parse_questions(list(make_records(cards)))
+    now = time.time()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "reviews.sqlite3")
+        scheduler = ReviewScheduler(path)
+        start = time.perf_counter()
+        for offset in range(0, cards, 500):
+            # Missed over the past month, so due times are spread out
+            play(scheduler, questions[offset:offset + 500], rng, now - rng.uniform(1, 30) * DAY)
+        build_s = time.perf_counter() - start
+        scheduler.close()
+
+        start = time.perf_counter()
+        scheduler = ReviewScheduler(path)
+        due_count = scheduler.due_count()
+        open_ms = (time.perf_counter() - start) * 1000
+
+        pick_ms, grade_ms = [], []
+        for _ in range(200):
+            start = time.perf_counter()
+            due = scheduler.due(batch, now=now)
+            pick_ms.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            play(scheduler, due, rng, now, miss_rate=0.3)
+            grade_ms.append((time.perf_counter() - start) * 1000)
+        filtered_ms = []
+        for _ in range(50):
+            start = time.perf_counter()
+            scheduler.due(batch, category="History", difficulty="hard", now=now)
+            filtered_ms.append((time.perf_counter() - start) * 1000)
+        result = {
+            "cards": cards,
+            "batch": batch,
+            "build_s": build_s,
+            "open_and_count_ms": open_ms,
+            "due_at_open": due_count,
+            "pick_due_ms_p50": statistics.median(pick_ms),
+            "pick_due_ms_max": max(pick_ms),
+            "pick_due_filtered_ms_p50": statistics.median(filtered_ms),
+            "grade_quiz_ms_p50": statistics.median(grade_ms),
+            "stats": scheduler.stats(now),
+        }
+        scheduler.close()
+    print(f"{cards:,} cards: open+count {open_ms:.1f} ms, next {batch} due {result['pick_due_ms_p50']:.2f} ms "
+          f"(filtered {result['pick_due_filtered_ms_p50']:.2f} ms), grade a quiz {result['grade_quiz_ms_p50']:.2f} ms",
+          file=sys.stderr)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,111 @@
+"""Load-test quiz_server: concurrent players completing quizzes over keep-alive HTTP.
+
+The server fetches from the local mock OpenTDB, so the numbers measure the
+server and its shared question pool, not the real API.
+
+Usage: python -m benchmarks.bench_server [players] [quizzes_per_player] [questions_per_quiz]
+"""
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+import quiz_core
+from benchmarks.mock_opentdb import start_mock_server
+from question_cache import QuestionCache
+from quiz_server import QuizServer
+
+
+class Client:
+    """Minimal keep-alive HTTP/1.1 JSON client."""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, data: Dict = None) -> Tuple[int, Dict]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(data).encode("utf-8") if data is not None else b""
+        self.writer.write(f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(body)}\r\n\r\n"
+                          .encode("latin-1") + body)
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        length = next(int(line.split(b":", 1)[1]) for line in head.split(b"\r\n")
+                      if line.lower().startswith(b"content-length:"))
+        return status, json.loads(await self.reader.readexactly(length))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def player(host: str, port: int, quizzes: int, questions: int, latencies: List[float], rng: random.Random):
+    client = Client(host, port)
+    try:
+        for _ in range(quizzes):
+            status, reply = await client.request("POST", "/quiz", {"amount": questions})
+            if status != 200:
+                raise RuntimeError(f"POST /quiz failed with {status}: {reply}")
+            session_id = reply["session_id"]
+            while "question" in reply:
+                start = time.perf_counter()
+                status, reply = await client.request(
+                    "POST", f"/quiz/{session_id}/answer",
+                    {"option": rng.randrange(len(reply["question"]["options"]))})
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    raise RuntimeError(f"answer failed with {status}: {reply}")
+            await client.request("GET", f"/quiz/{session_id}/review")
+    finally:
+        client.close()
+
+
+async def run(players: int, quizzes: int, questions: int) -> Dict:
+    server = QuizServer()
+    listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+    host, port = listener.sockets[0].getsockname()[:2]
+    latencies: List[float] = []
+    start = time.perf_counter()
+    async with listener:
+        await asyncio.gather(*(player(host, port, quizzes, questions, latencies, random.Random(i))
+                               for i in range(players)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    sessions = players * quizzes
+    return {
+        "players": players,
+        "sessions": sessions,
+        "questions_per_session": questions,
+        "elapsed_s": elapsed,
+        "sessions_per_s": sessions / elapsed,
+        "answer_p50_ms": statistics.median(latencies) * 1000,
+        "answer_p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "server": server.stats(),
+    }
+
+
+def main(argv: List[str]):
+    players = int(argv[0]) if argv else 200
+    quizzes = int(argv[1]) if len(argv) > 1 else 5
+    questions = int(argv[2]) if len(argv) > 2 else 10
+    mock = start_mock_server()
+    quiz_core._client = quiz_core.OpenTDBClient(f"http://127.0.0.1:{mock.server_address[1]}", interval=0)
+    with tempfile.TemporaryDirectory() as tmp:
+        quiz_core.set_question_cache(QuestionCache(os.path.join(tmp, "cache.sqlite3")))
+        result = asyncio.run(run(players, quizzes, questions))
+        quiz_core.get_question_cache().close()
+    mock.shutdown()
+    print(f"{result['sessions']} quizzes by {players} concurrent players in {result['elapsed_s']:.2f} s: "
+          f"{result['sessions_per_s']:,.0f} sessions/s, answer p50 {result['answer_p50_ms']:.2f} ms, "
+          f"p99 {result['answer_p99_ms']:.2f} ms", file=sys.stderr)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,26 @@
+"""Headless QuizSession throughput: complete simulated quizzes per second.
+
+Usage: python -m benchmarks.bench_sessions [sessions] [questions_per_session]
+"""
+import json
+import sys
+from typing import List
+
+from benchmarks.synthetic import make_records
+from quiz_core import parse_questions
+from quiz_session import run_batch
+
+
+def main(argv: List[str]):
+    sessions = int(argv[0]) if argv else 10_000
+    per_session = int(argv[1]) if len(argv) > 1 else 10
+    questions = parse_questions(make_records(per_session))
+    result = run_batch(questions, sessions)
+    print(f"{sessions} sessions x {per_session} questions in {result['elapsed_s']:.2f} s: "
+          f"{result['sessions_per_s']:,.0f} sessions/s, {result['answers_per_s']:,.0f} answers/s",
+          file=sys.stderr)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
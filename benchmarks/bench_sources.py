@@ -0,0 +1,123 @@
+"""Question sources: streaming file readers and concurrent fan-out.
+
+- Reads a large synthetic dump as JSON, JSONL and CSV with the streaming
+  readers, reporting records/s and peak traced memory (which should stay
+  flat however large the file is).
+- Fans a quiz out to the mock API (with added latency), a JSONL file and
+  the cache, and reports time to the first page and to a full quiz,
+  against the default fetch_questions path (cache, then the API).
+- Repeats with a hung API (latency far above its timeout) to show the quiz
+  starts from the other sources without waiting for it.
+
+Usage: python -m benchmarks.bench_sources [records] [api_latency_ms]
+"""
+import csv
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List
+
+import question_cache
+import quiz_core
+from benchmarks.mock_opentdb import start_mock_server
+from benchmarks.synthetic import make_records
+from question_cache import QuestionCache
+from question_sources import CacheSource, FileSource, OpenTDBSource, QuestionFanOut, iter_file_records
+
+
+def write_files(directory: str, count: int) -> Dict[str, str]:
+    paths = {name: os.path.join(directory, f"dump.{name}") for name in ("json", "jsonl", "csv")}
+    with open(paths["json"], "w", encoding="utf-8") as json_file, \
+            open(paths["jsonl"], "w", encoding="utf-8") as jsonl_file, \
+            open(paths["csv"], "w", encoding="utf-8", newline="") as csv_file:
+        writer = csv.DictWriter(csv_file, ["question", "correct_answer", "incorrect_answers", "category",
+                                           "difficulty", "type"])
+        writer.writeheader()
+        json_file.write('{"response_code": 0, "results": [\n')
+        for i, item in enumerate(make_records(count, seed=1)):
+            line = json.dumps(item)
+            json_file.write(("," if i else "") + line + "\n")
+            jsonl_file.write(line + "\n")
+            writer.writerow({**item, "incorrect_answers": "|".join(item["incorrect_answers"])})
+        json_file.write("]}\n")
+    return paths
+
+
+def bench_reader(path: str) -> Dict:
+    start = time.perf_counter()
+    count = sum(1 for _ in iter_file_records(path))
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()  # Traced separately; tracing slows the reader down several times
+    for _ in iter_file_records(path):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"records": count, "file_mb": os.path.getsize(path) / 2 ** 20,
+            "records_per_s": count / elapsed, "peak_traced_mb": peak / 2 ** 20}
+
+
+def time_quiz(fan_out: QuestionFanOut, amount: int, runs: int = 5) -> Dict:
+    first, full, got = [], [], 0
+    for _ in range(runs):
+        start = time.perf_counter()
+        got = 0
+        for page in fan_out.stream(amount):
+            if not got:
+                first.append((time.perf_counter() - start) * 1000)
+            got += len(page)
+        full.append((time.perf_counter() - start) * 1000)
+    return {"questions": got, "first_page_ms": statistics.median(first), "full_quiz_ms": statistics.median(full)}
+
+
+def time_default_fetch(amount: int, runs: int = 5) -> float:
+    """fetch_questions without sources: the cache cannot fill the quiz, so it waits for the API."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        quiz_core.fetch_questions(amount)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main(argv: List[str]):
+    count = int(argv[0]) if argv else 200_000
+    latency = float(argv[1]) / 1000 if len(argv) > 1 else 0.3
+    results = {"readers": {}, "fan_out": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_files(tmp, count)
+        for name, path in paths.items():
+            results["readers"][name] = row = bench_reader(path)
+            print(f"{name:5} {row['file_mb']:7.1f} MB: {row['records_per_s']:,.0f} records/s, "
+                  f"peak {row['peak_traced_mb']:.2f} MB", file=sys.stderr)
+
+        server = start_mock_server()
+        quiz_core._client = quiz_core.OpenTDBClient(f"http://127.0.0.1:{server.server_address[1]}", interval=0)
+        question_cache.REFILL_THRESHOLD = 0
+        small = os.path.join(tmp, "small.jsonl")
+        with open(small, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(item) + "\n" for item in make_records(2000, seed=3))
+
+        server.mock.latency = latency
+        quiz_core.set_question_cache(QuestionCache(":memory:", max_entries=20))  # Holds part of a quiz
+        results["fan_out"]["default_fetch_ms"] = time_default_fetch(quiz_core.PAGE_SIZE)
+        sources = [CacheSource(), FileSource(small), OpenTDBSource()]
+        results["fan_out"]["concurrent"] = time_quiz(QuestionFanOut(sources), quiz_core.PAGE_SIZE)
+        hung = OpenTDBSource()
+        hung.timeout = 0.5
+        server.mock.latency = 5.0
+        results["fan_out"]["hung_api"] = time_quiz(QuestionFanOut([hung, FileSource(small)]), 10, runs=1)
+        server.shutdown()
+    concurrent, hung_result = results["fan_out"]["concurrent"], results["fan_out"]["hung_api"]
+    print(f"fan-out ({latency * 1000:.0f} ms API): first page {concurrent['first_page_ms']:.1f} ms, "
+          f"full quiz {concurrent['full_quiz_ms']:.1f} ms vs {results['fan_out']['default_fetch_ms']:.1f} ms "
+          f"cache-then-API; "
+          f"hung API: {hung_result['questions']} questions in {hung_result['full_quiz_ms']:.1f} ms", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
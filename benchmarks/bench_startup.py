@@ -0,0 +1,146 @@
+"""Measure quiz_app.py cold start: import-time breakdown and time to first paint.
+
+Usage: python -m benchmarks.bench_startup [runs]
+
+Each run starts a fresh interpreter that imports quiz_app, builds the main
+window as main() does and stops at its first paint event, against empty
+temporary cache and catalog files. Two cases are measured:
+
+- offline: offline mode, so nothing touches the network;
+- online_stale: online against the local mock OpenTDB, with the catalog and
+  the global count stale (as on a first run and once a day after that), so
+  the app refreshes them in the background. The run also waits for that
+  refresh to finish and reports whether it happened.
+
+Without a display the offscreen Qt platform is used.
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from benchmarks.mock_opentdb import start_mock_server
+
+PROBE = r"""
+import json, sys, time
+start = time.perf_counter()
+import quiz_app
+imported = time.perf_counter()
+from PyQt5.QtCore import QEvent, QObject, QThreadPool, QTimer
+
+online = sys.argv[1:] == ["online"]
+app = quiz_app.QApplication(sys.argv[:1])
+quiz_app.set_question_cache(quiz_app.QuestionCache.from_env(offline=not online))
+window = quiz_app.QuizApp()
+constructed = time.perf_counter()
+
+class FirstPaint(QObject):
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and obj is window:
+            painted = time.perf_counter()
+            print(json.dumps({
+                "import_ms": (imported - start) * 1000,
+                "construct_ms": (constructed - imported) * 1000,
+                "first_paint_ms": (painted - start) * 1000,
+                "requests_imported": "requests" in sys.modules,
+            }), flush=True)
+            window.removeEventFilter(self)
+            QTimer.singleShot(0, finish)
+        return False
+
+def finish():
+    if online:
+        # Let the app start its after-paint catalog refresh, wait for it and report whether it ran
+        app.processEvents()
+        QThreadPool.globalInstance().waitForDone(10000)
+        catalog = quiz_app.get_category_catalog()
+        print(json.dumps({"catalog_refreshed": not catalog.categories_stale() and not catalog.count_stale(None)}),
+              flush=True)
+    app.quit()
+
+first_paint = FirstPaint()
+window.installEventFilter(first_paint)
+window.show()
+app.exec_()
+"""
+
+
+def import_breakdown(root: str, env: Dict[str, str], top: int = 10) -> List[Dict]:
+    """Slowest top-level imports of quiz_app, from `python -X importtime`."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import quiz_app"], cwd=root, env=env,
+                            capture_output=True, text=True, check=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth <= 1:  # quiz_app itself and the modules it imports directly
+            modules.append({"module": name.strip(), "self_ms": int(self_us) / 1000,
+                            "cumulative_ms": int(cumulative_us) / 1000})
+    return sorted(modules, key=lambda m: m["cumulative_ms"], reverse=True)[:top]
+
+
+def measure(root: str, env: Dict[str, str], runs: int, online: bool) -> Dict:
+    samples = []
+    for _ in range(runs):
+        for name in ("cache.sqlite3", "categories.json"):
+            path = os.path.join(os.path.dirname(env["QUIZ_APP_CACHE_PATH"]), name)
+            if os.path.exists(path):
+                os.remove(path)  # Every run starts cold, with a stale (missing) catalog
+        start = time.perf_counter()
+        probe = subprocess.Popen([sys.executable, "-c", PROBE] + (["online"] if online else []), cwd=root, env=env,
+                                 stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        line = probe.stdout.readline()
+        wall_ms = (time.perf_counter() - start) * 1000
+        sample = {"process_to_first_paint_ms": wall_ms, **json.loads(line)}
+        if online:
+            sample.update(json.loads(probe.stdout.readline() or '{"catalog_refreshed": false}'))
+        probe.wait()
+        samples.append(sample)
+    result = {key: statistics.median(sample[key] for sample in samples)
+              for key in ("process_to_first_paint_ms", "import_ms", "construct_ms", "first_paint_ms")}
+    result["requests_imported_at_startup"] = any(sample["requests_imported"] for sample in samples)
+    if online:
+        result["catalog_refreshed"] = all(sample["catalog_refreshed"] for sample in samples)
+    result["samples"] = samples
+    return result
+
+
+def main(argv: List[str]):
+    runs = int(argv[0]) if argv else 5
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server = start_mock_server()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, QUIZ_APP_CACHE_PATH=os.path.join(tmp, "cache.sqlite3"),
+                   QUIZ_APP_CATALOG_PATH=os.path.join(tmp, "categories.json"),
+                   QUIZ_APP_API_URL=f"http://127.0.0.1:{server.server_address[1]}", QUIZ_APP_API_INTERVAL="0")
+        if not env.get("DISPLAY") and not env.get("WAYLAND_DISPLAY"):
+            env.setdefault("QT_QPA_PLATFORM", "offscreen")
+        offline = measure(root, env, runs, online=False)
+        online_stale = measure(root, env, runs, online=True)
+        breakdown = import_breakdown(root, env)
+    server.shutdown()
+
+    result = {
+        "runs": runs,
+        "platform": env.get("QT_QPA_PLATFORM", "native"),
+        **offline,
+        "online_stale": online_stale,
+        "slowest_imports": breakdown,
+    }
+    print(f"time to first paint {result['process_to_first_paint_ms']:.0f} ms "
+          f"(import {result['import_ms']:.0f} ms, window {result['construct_ms']:.0f} ms) over {runs} runs",
+          file=sys.stderr)
+    print(f"online, stale catalog: first paint {online_stale['process_to_first_paint_ms']:.0f} ms, "
+          f"requests imported before it: {online_stale['requests_imported_at_startup']}, "
+          f"catalog refreshed afterwards: {online_stale['catalog_refreshed']}", file=sys.stderr)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,71 @@
+"""Cost of the tracing hooks, switched off and on.
+
+Reports nanoseconds per span() block and per traced() call, and the
+throughput of the traced parse path (parse_questions on 50-question pages)
+with tracing off and on.
+
+Usage: python -m benchmarks.bench_trace [iterations]
+"""
+import json
+import sys
+import time
+from typing import Callable, Dict, List
+
+import quiz_trace
+from benchmarks.synthetic import make_records
+from quiz_core import PAGE_SIZE, parse_questions
+from quiz_trace import span, traced
+
+
+@traced("noop")
+def traced_noop():
+    pass
+
+
+def plain_noop():
+    pass
+
+
+def per_call_ns(function: Callable[[], None], iterations: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter_ns() - start) / iterations
+
+
+def span_block():
+    with span("noop"):
+        pass
+
+
+def measure(iterations: int, pages: List[List[Dict]]) -> Dict[str, float]:
+    quiz_trace.clear()
+    baseline = per_call_ns(plain_noop, iterations)
+    start = time.perf_counter()
+    for page in pages:
+        parse_questions(page)
+    parse_seconds = time.perf_counter() - start
+    return {
+        "span_ns": per_call_ns(span_block, iterations),
+        "traced_call_overhead_ns": per_call_ns(traced_noop, iterations) - baseline,
+        "parse_questions_per_s": len(pages) * PAGE_SIZE / parse_seconds,
+    }
+
+
+def main(argv: List[str]):
+    iterations = int(argv[0]) if argv else 1_000_000
+    records = list(make_records(100_000))
+    pages = [records[i:i + PAGE_SIZE] for i in range(0, len(records), PAGE_SIZE)]
+    quiz_trace.disable()
+    results = {"off": measure(iterations, pages)}
+    quiz_trace.enable()
+    results["on"] = measure(iterations, pages)
+    quiz_trace.disable()
+    for state, row in results.items():
+        print(f"tracing {state:3}: span {row['span_ns']:.0f} ns, traced() +{row['traced_call_overhead_ns']:.0f} ns, "
+              f"parse {row['parse_questions_per_s']:,.0f} questions/s", file=sys.stderr)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
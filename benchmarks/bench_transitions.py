@@ -0,0 +1,144 @@
+"""Question-to-question transitions and memory over repeated quizzes in quiz_app.py.
+
+Plays many quizzes in one window on the offscreen Qt platform, the way a
+user does with "Play Again": every question is answered through the quiz
+screen (Submit, inline feedback, Next) and every quiz returns to the welcome
+screen. Reports
+
+- answer-to-feedback and Next-to-question times (including the layout and
+  paint they trigger),
+- RSS, Python heap, live QObjects and timer connections after each quiz.
+  QObjects and timer connections must stay constant, since the quiz screen
+  is reused rather than rebuilt. RSS grows over the first quizzes while
+  allocators and caches warm up (the review deck and history also grow by
+  one quiz each time), so its growth is reported per quiz over the second
+  half of the run.
+
+The end-of-quiz dialogs are answered by a timer (no review, play again).
+Questions come from quiz plans, so no run touches the network, and the
+resume file, history and review deck are written to a temporary directory.
+
+Usage: python -m benchmarks.bench_transitions [quizzes] [questions]
+"""
+import gc
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtWidgets import QApplication, QMessageBox
+
+from benchmarks.synthetic import make_records
+
+
+def rss_kib() -> Optional[int]:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def answer_dialogs():
+    """Dismiss the end-of-quiz message boxes: no review, play again."""
+    box = QApplication.activeModalWidget()
+    if not isinstance(box, QMessageBox):
+        return
+    if box.windowTitle() == "Play Again":
+        box.button(QMessageBox.Yes).click()
+    elif box.button(QMessageBox.No) is not None:
+        box.button(QMessageBox.No).click()
+    else:
+        box.accept()
+
+
+def percentile(values: List[float], share: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def main(argv: List[str]):
+    quizzes = int(argv[0]) if argv else 50
+    questions = int(argv[1]) if len(argv) > 1 else 20
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, file_name in (("CACHE", "cache.sqlite3"), ("CATALOG", "categories.json"),
+                                ("RESUME", "resume.json"), ("HISTORY", "history.bin"), ("REVIEW", "reviews.sqlite3")):
+            os.environ[f"QUIZ_APP_{name}_PATH"] = os.path.join(tmp, file_name)
+        os.environ["QUIZ_APP_PREFETCH_DEPTH"] = "0"
+        import quiz_app
+        from quiz_core import parse_questions
+        from quiz_plan import QuizPlan
+
+        app = QApplication(sys.argv[:1])
+        quiz_app.set_question_cache(quiz_app.QuestionCache.from_env(offline=True))
+        window = quiz_app.QuizApp()
+        window.show()
+        dialogs = QTimer()
+        dialogs.timeout.connect(answer_dialogs)
+        dialogs.start(5)
+        records = list(make_records(questions * quizzes))
+
+        to_feedback: List[float] = []
+        to_question: List[float] = []
+        per_quiz: List[Dict] = []
+        tracemalloc.start()
+        for quiz in range(quizzes):
+            plan = QuizPlan.build(parse_questions(records[quiz * questions:(quiz + 1) * questions]), seed=quiz)
+            window.start_plan(plan)
+            app.processEvents()
+            while window.session is not None:
+                window.options_group.button(quiz % 2).setChecked(True)
+                start = time.perf_counter()
+                window.submit_button.click()
+                app.processEvents()
+                to_feedback.append((time.perf_counter() - start) * 1000)
+                start = time.perf_counter()
+                window.next_button.click()  # Ends the quiz after the last question
+                app.processEvents()
+                if window.session is not None:
+                    to_question.append((time.perf_counter() - start) * 1000)
+            app.processEvents()
+            gc.collect()
+            per_quiz.append({"rss_kib": rss_kib(), "python_heap_kib": tracemalloc.get_traced_memory()[0] / 1024,
+                             "qobjects": len(window.findChildren(QObject)),
+                             "timer_connections": window.timer.receivers(window.timer.timeout)})
+        tracemalloc.stop()
+        dialogs.stop()
+        window.close()
+
+    first, half, last = per_quiz[0], per_quiz[len(per_quiz) // 2], per_quiz[-1]
+    later_quizzes = max(1, len(per_quiz) - 1 - len(per_quiz) // 2)
+    result = {
+        "quizzes": quizzes,
+        "questions_per_quiz": questions,
+        "platform": os.environ.get("QT_QPA_PLATFORM", "native"),
+        "answer_to_feedback_ms": {"p50": statistics.median(to_feedback), "p95": percentile(to_feedback, 0.95)},
+        "next_to_question_ms": {"p50": statistics.median(to_question), "p95": percentile(to_question, 0.95)},
+        "rss_growth_per_quiz_kib": ((last["rss_kib"] - half["rss_kib"]) / later_quizzes
+                                    if last["rss_kib"] is not None else None),
+        "python_heap_growth_per_quiz_kib": (last["python_heap_kib"] - half["python_heap_kib"]) / later_quizzes,
+        "per_quiz": per_quiz,
+    }
+    print(f"{quizzes} quizzes x {questions} questions: answer -> feedback p50 "
+          f"{result['answer_to_feedback_ms']['p50']:.2f} ms (p95 {result['answer_to_feedback_ms']['p95']:.2f}), "
+          f"next -> question p50 {result['next_to_question_ms']['p50']:.2f} ms "
+          f"(p95 {result['next_to_question_ms']['p95']:.2f}); second half per quiz: RSS "
+          f"{result['rss_growth_per_quiz_kib'] or 0:+.1f} KiB, heap {result['python_heap_growth_per_quiz_kib']:+.1f} KiB; "
+          f"QObjects {first['qobjects']} -> {last['qobjects']}, timer connections {last['timer_connections']}",
+          file=sys.stderr)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
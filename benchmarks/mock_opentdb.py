@@ -0,0 +1,191 @@
+"""Local stand-in for the Open Trivia DB API, for benchmarks and offline development.
+
+Serves api.php, api_token.php, api_category.php and api_count.php from a
+synthetic question pool, optionally with added latency and injected
+failures (HTTP 429 or OpenTDB response codes 1-5). Run it standalone with
+
+    python -m benchmarks.mock_opentdb [--port 8001] [--questions 5000] [--latency MS]
+                                      [--error-rate P] [--errors 429,5]
+
+and point the app at it with QUIZ_APP_API_URL=http://127.0.0.1:8001 (plus
+QUIZ_APP_API_INTERVAL=0 to lift the client-side rate limit).
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Set
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic import make_records
+from category_catalog import DEFAULT_CATEGORIES
+
+
+HTTP_TOO_MANY_REQUESTS = 429
+
+
+class MockOpenTDB:
+    """In-memory question pool and session tokens behind the mock endpoints.
+
+    Every request waits `latency` seconds. With probability `error_rate`, an
+    api.php request fails with one of `errors`: 429 for an HTTP "Too Many
+    Requests" answer, or 1-5 for that OpenTDB response code.
+    """
+
+    def __init__(self, questions: int = 5000, seed: int = 0, latency: float = 0.0,
+                 error_rate: float = 0.0, errors: Sequence[int] = (HTTP_TOO_MANY_REQUESTS, 5)):
+        category_ids = list(DEFAULT_CATEGORIES)
+        self.records: List[Dict] = []
+        self.category_ids: List[int] = []
+        for i, record in enumerate(make_records(questions, seed)):
+            category_id = category_ids[i % len(category_ids)]
+            record["category"] = DEFAULT_CATEGORIES[category_id]
+            self.records.append(record)
+            self.category_ids.append(category_id)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.errors = list(errors)
+        self.tokens: Dict[str, Set[int]] = {}
+        self.requests = 0
+        self.injected: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+
+    def _matching(self, category: Optional[int], difficulty: Optional[str], question_type: Optional[str]):
+        return [i for i, record in enumerate(self.records)
+                if (category is None or self.category_ids[i] == category)
+                and (difficulty is None or record["difficulty"] == difficulty)
+                and (question_type is None or record["type"] == question_type)]
+
+    def inject_error(self, path: str) -> Optional[int]:
+        """Pick an error to fail this request with, or None to serve it normally."""
+        if path != "/api.php" or not self.errors:
+            return None
+        with self._lock:
+            if self._rng.random() >= self.error_rate:
+                return None
+            error = self._rng.choice(self.errors)
+            self.requests += 1
+            self.injected[error] = self.injected.get(error, 0) + 1
+            return error
+
+    def handle(self, path: str, query: Dict[str, str]) -> Dict:
+        with self._lock:
+            self.requests += 1
+            if path == "/api.php":
+                return self.api(query)
+            if path == "/api_token.php":
+                token = uuid.uuid4().hex
+                self.tokens[token] = set()
+                return {"response_code": 0, "response_message": "Token Generated Successfully!", "token": token}
+            if path == "/api_category.php":
+                return {"trivia_categories": [{"id": cat_id, "name": name} for cat_id, name in DEFAULT_CATEGORIES.items()]}
+            if path == "/api_count.php":
+                category = int(query.get("category", 0))
+                counts = {level: len(self._matching(category, level, None)) for level in ("easy", "medium", "hard")}
+                return {"category_id": category, "category_question_count": {
+                    "total_question_count": sum(counts.values()),
+                    "total_easy_question_count": counts["easy"],
+                    "total_medium_question_count": counts["medium"],
+                    "total_hard_question_count": counts["hard"],
+                }}
+            if path == "/api_count_global.php":
+                per_category = {str(cat_id): self.category_ids.count(cat_id) for cat_id in DEFAULT_CATEGORIES}
+                return {"overall": {"total_num_of_questions": len(self.records),
+                                    "total_num_of_verified_questions": len(self.records)},
+                        "categories": {cat_id: {"total_num_of_questions": count,
+                                                "total_num_of_verified_questions": count}
+                                       for cat_id, count in per_category.items()}}
+        raise KeyError(path)
+
+    def api(self, query: Dict[str, str]) -> Dict:
+        try:
+            amount = int(query.get("amount", 10))
+            category = int(query["category"]) if "category" in query else None
+        except ValueError:
+            return {"response_code": 2, "results": []}
+        if not 1 <= amount <= 50:
+            return {"response_code": 2, "results": []}
+        candidates = self._matching(category, query.get("difficulty"), query.get("type"))
+        token = query.get("token")
+        if token is not None:
+            if token not in self.tokens:
+                return {"response_code": 3, "results": []}
+            served = self.tokens[token]
+            candidates = [i for i in candidates if i not in served]
+            if len(candidates) < amount:
+                return {"response_code": 4, "results": []}
+        if len(candidates) < amount:
+            return {"response_code": 1, "results": []}
+        chosen = self._rng.sample(candidates, amount)
+        if token is not None:
+            self.tokens[token].update(chosen)
+        return {"response_code": 0, "results": [self.records[i] for i in chosen]}
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real service
+    disable_nagle_algorithm = True  # Headers and body are separate writes; avoid delayed-ACK stalls
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        mock = self.server.mock
+        if mock.latency:
+            time.sleep(mock.latency)
+        error = mock.inject_error(url.path)
+        if error == HTTP_TOO_MANY_REQUESTS:
+            self.send_json(HTTP_TOO_MANY_REQUESTS, {"response_code": 5, "results": []})
+            return
+        if error is not None:
+            self.send_json(200, {"response_code": error, "results": []})
+            return
+        try:
+            data = mock.handle(url.path, query)
+        except KeyError:
+            self.send_error(404)
+            return
+        self.send_json(200, data)
+
+    def send_json(self, status: int, data: Dict):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+
+def start_mock_server(mock: Optional[MockOpenTDB] = None, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Serve `mock` on a daemon thread; the bound address is in `server.server_address`."""
+    server = ThreadingHTTPServer((host, port), MockRequestHandler)
+    server.daemon_threads = True
+    server.mock = mock or MockOpenTDB()
+    threading.Thread(target=server.serve_forever, name="mock-opentdb", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--questions", type=int, default=5000)
+    parser.add_argument("--latency", type=float, default=0.0, help="added delay per request, in milliseconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of api.php requests that fail")
+    parser.add_argument("--errors", default="429,5", help="comma-separated errors to inject: 429 and/or 1-5")
+    args = parser.parse_args()
+    server = ThreadingHTTPServer((args.host, args.port), MockRequestHandler)
+    server.mock = MockOpenTDB(args.questions, latency=args.latency / 1000, error_rate=args.error_rate,
+                              errors=[int(error) for error in args.errors.split(",") if error])
+    print(f"Mock OpenTDB listening on http://{args.host}:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+import random
+from typing import Dict, Iterator
+
+CATEGORIES = [
+    "General Knowledge", "Entertainment: Books", "Entertainment: Film", "Entertainment: Music",
+    "Science &amp; Nature", "Science: Computers", "Science: Mathematics", "Mythology", "Sports",
+    "Geography", "History", "Politics", "Art", "Celebrities", "Animals", "Vehicles",
+]
+DIFFICULTIES = ["easy", "medium", "hard"]
+WORDS = ("the which capital river largest &quot;famous&quot; planet first album invented "
+         "known year country element author film player team &#039;classic&#039; war").split()
+
+
+def make_records(count: int, seed: int = 0) -> Iterator[Dict]:
+    """Yield `count` random OpenTDB-shaped records (HTML-escaped, like the API)."""
+    rng = random.Random(seed)
+    for i in range(count):
+        boolean = rng.random() < 0.25
+        prompt = " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 16))) + f" #{i}?"
+        yield {
+            "type": "boolean" if boolean else "multiple",
+            "difficulty": rng.choice(DIFFICULTIES),
+            "category": rng.choice(CATEGORIES),
+            "question": prompt,
+            "correct_answer": "True" if boolean else " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))),
+            "incorrect_answers": ["False"] if boolean else [
+                " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))) for _ in range(3)
+            ],
+        }
@@ -0,0 +1,157 @@
+import html
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.expanduser("~"), ".quiz_app", "categories.json")
+DEFAULT_REFRESH_INTERVAL = 24 * 60 * 60  # One day, in seconds
+
+# Categories from the Open Trivia DB API, used until the live list has been fetched
+DEFAULT_CATEGORIES = {
+    9: "General Knowledge",
+    10: "Entertainment: Books",
+    11: "Entertainment: Film",
+    12: "Entertainment: Music",
+    13: "Entertainment: Musicals & Theatres",
+    14: "Entertainment: Television",
+    15: "Entertainment: Video Games",
+    16: "Entertainment: Board Games",
+    17: "Science & Nature",
+    18: "Science: Computers",
+    19: "Science: Mathematics",
+    20: "Mythology",
+    21: "Sports",
+    22: "Geography",
+    23: "History",
+    24: "Politics",
+    25: "Art",
+    26: "Celebrities",
+    27: "Animals",
+    28: "Vehicles",
+    29: "Entertainment: Comics",
+    30: "Science: Gadgets",
+    31: "Entertainment: Japanese Anime & Manga",
+    32: "Entertainment: Cartoon & Animations"
+}
+
+
+class CategoryCatalog:
+    """OpenTDB category list and per-category question counts, cached in a JSON file.
+
+    Categories come from api_category.php, per-category counts from
+    api_count.php and the total over all categories from api_count_global.php;
+    all are refetched once older than `refresh_interval` seconds. Network calls
+    take an OpenTDBClient so they share its session and rate limit.
+    """
+
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH, refresh_interval: float = DEFAULT_REFRESH_INTERVAL):
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.categories: Dict[int, str] = dict(DEFAULT_CATEGORIES)
+        self.categories_fetched_at = 0.0
+        self.counts: Dict[int, Dict[str, float]] = {}
+        self.global_count: Optional[Dict[str, float]] = None  # All categories together ("Any")
+        self._lock = threading.Lock()
+        self.load()
+
+    @classmethod
+    def from_env(cls) -> "CategoryCatalog":
+        return cls(
+            path=os.environ.get("QUIZ_APP_CATALOG_PATH", DEFAULT_CATALOG_PATH),
+            refresh_interval=float(os.environ.get("QUIZ_APP_CATALOG_REFRESH", DEFAULT_REFRESH_INTERVAL)),
+        )
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return  # Nothing cached yet (or unreadable); keep the defaults
+        with self._lock:
+            if data.get("categories"):
+                self.categories = {int(cat_id): name for cat_id, name in data["categories"].items()}
+                self.categories_fetched_at = data.get("categories_fetched_at", 0.0)
+            self.counts = {int(cat_id): count for cat_id, count in data.get("counts", {}).items()}
+            self.global_count = data.get("global_count")
+
+    def save(self):
+        # Under the lock throughout: refreshes on different workers save concurrently and share the temp file
+        with self._lock:
+            data = {
+                "categories": self.categories,
+                "categories_fetched_at": self.categories_fetched_at,
+                "counts": self.counts,
+                "global_count": self.global_count,
+            }
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            temp_path = self.path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.path)
+
+    def categories_stale(self) -> bool:
+        return time.time() - self.categories_fetched_at > self.refresh_interval
+
+    def count_stale(self, category: Optional[int]) -> bool:
+        """Whether the count of `category` (or of all categories, if None) needs fetching."""
+        with self._lock:
+            count = self.counts.get(category) if category else self.global_count
+        return count is None or time.time() - count["fetched_at"] > self.refresh_interval
+
+    def refresh_categories(self, client) -> Dict[int, str]:
+        """Fetch the live category list and persist it."""
+        data = client.get("api_category.php")
+        categories = {item["id"]: html.unescape(item["name"]) for item in data["trivia_categories"]}
+        with self._lock:
+            self.categories = categories
+            self.categories_fetched_at = time.time()
+        self.save()
+        return categories
+
+    def refresh_count(self, client, category: Optional[int]) -> Dict[str, float]:
+        """Fetch and persist the per-difficulty question counts of one category, or the global count if None."""
+        if not category:
+            return self.refresh_global_count(client)
+        data = client.get("api_count.php", category=category)["category_question_count"]
+        count = {
+            "total": data["total_question_count"],
+            "easy": data["total_easy_question_count"],
+            "medium": data["total_medium_question_count"],
+            "hard": data["total_hard_question_count"],
+            "fetched_at": time.time(),
+        }
+        with self._lock:
+            self.counts[category] = count
+        self.save()
+        return count
+
+    def refresh_global_count(self, client) -> Dict[str, float]:
+        """Fetch and persist the number of questions over all categories."""
+        data = client.get("api_count_global.php")["overall"]
+        # Only verified questions are served by api.php
+        count = {"total": data["total_num_of_verified_questions"], "fetched_at": time.time()}
+        with self._lock:
+            self.global_count = count
+        self.save()
+        return count
+
+    def available(self, category: Optional[int], difficulty: Optional[str] = None) -> Optional[int]:
+        """Cached number of questions for a category/difficulty, or None if unknown.
+
+        For "any category" the global count is used. It has no per-difficulty
+        split, so with a difficulty the counts of all categories are summed,
+        which is only possible once every category has been counted.
+        """
+        key = difficulty or "total"
+        with self._lock:
+            if category is not None:
+                count = self.counts.get(category)
+                return int(count[key]) if count else None
+            if difficulty is None and self.global_count:
+                return int(self.global_count["total"])
+            if not self.categories or any(cat_id not in self.counts for cat_id in self.categories):
+                return None
+            return sum(int(self.counts[cat_id][key]) for cat_id in self.categories)
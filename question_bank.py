@@ -0,0 +1,125 @@
+import html
+from array import array
+from typing import Dict, Iterable, Iterator, List
+
+from quiz_core import Question
+
+
+class StringTable:
+    """Interns repeated strings (categories, difficulties, types) as small integer codes."""
+    __slots__ = ("values", "_codes")
+
+    def __init__(self):
+        self.values: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def code(self, value: str) -> int:
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+class QuestionBank:
+    """Columnar, append-only store for large offline question banks.
+
+    All prompt and answer text lives UTF-8 encoded in one bytearray, addressed
+    through a flat offset table. String `s` spans
+    `_text[_offsets[s]:_offsets[s + 1]]`, and question `i` owns strings
+    `_first[i]` (prompt), `_first[i] + 1` (correct answer) up to
+    `_first[i + 1]` (incorrect answers). Category, difficulty and type are
+    interned into StringTables and stored as one small code per question.
+    Question objects are only built on access.
+    """
+
+    def __init__(self):
+        self._text = bytearray()
+        self._offsets = array("Q", [0])
+        self._first = array("I", [0])
+        self.categories = StringTable()
+        self.difficulties = StringTable()
+        self.types = StringTable()
+        self._category = array("H")
+        self._difficulty = array("B")
+        self._type = array("B")
+
+    @classmethod
+    def from_records(cls, items: Iterable[Dict]) -> "QuestionBank":
+        """Build a bank from raw (HTML-escaped) OpenTDB records."""
+        bank = cls()
+        for item in items:
+            bank.append_fields(
+                html.unescape(item["question"]),
+                html.unescape(item["correct_answer"]),
+                [html.unescape(ans) for ans in item["incorrect_answers"]],
+                html.unescape(item.get("category", "")),
+                item.get("difficulty", ""),
+                item.get("type", ""),
+            )
+        return bank
+
+    def _add_string(self, value: str):
+        self._text += value.encode("utf-8")
+        self._offsets.append(len(self._text))
+
+    def append_fields(self, prompt: str, correct_answer: str, incorrect_answers: List[str],
+                      category: str = "", difficulty: str = "", question_type: str = ""):
+        self._add_string(prompt)
+        self._add_string(correct_answer)
+        for answer in incorrect_answers:
+            self._add_string(answer)
+        self._first.append(len(self._offsets) - 1)
+        self._category.append(self.categories.code(category))
+        self._difficulty.append(self.difficulties.code(difficulty))
+        self._type.append(self.types.code(question_type))
+
+    def append(self, question: Question):
+        self.append_fields(question.prompt, question.correct_answer, question.incorrect_answers,
+                           question.category, question.difficulty, question.question_type)
+
+    def extend(self, questions: Iterable[Question]):
+        for question in questions:
+            self.append(question)
+
+    def __len__(self) -> int:
+        return len(self._category)
+
+    def _string(self, s: int) -> str:
+        return self._text[self._offsets[s]:self._offsets[s + 1]].decode("utf-8")
+
+    def __getitem__(self, index: int) -> Question:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("question index out of range")
+        first, end = self._first[index], self._first[index + 1]
+        return Question(
+            self._string(first),
+            self._string(first + 1),
+            [self._string(s) for s in range(first + 2, end)],
+            category=self.categories.values[self._category[index]],
+            difficulty=self.difficulties.values[self._difficulty[index]],
+            question_type=self.types.values[self._type[index]],
+        )
+
+    def __iter__(self) -> Iterator[Question]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def category_code(self, index: int) -> int:
+        return self._category[index]
+
+    def difficulty_code(self, index: int) -> int:
+        return self._difficulty[index]
+
+    def type_code(self, index: int) -> int:
+        return self._type[index]
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the bank's buffers (excluding the small string tables)."""
+        return (len(self._text) + sum(a.itemsize * len(a) for a in (
+            self._offsets, self._first, self._category, self._difficulty, self._type)))
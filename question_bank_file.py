@@ -0,0 +1,216 @@
+"""Memory-mapped binary question banks for offline play.
+
+Layout (all integers little-endian):
+
+    header   magic "QZBANK\\0\\0", version u32, count u32, index offset u64, meta offset u64
+    records  per question: category u16, difficulty u8, type u8, answer count u8,
+             then prompt and answers, each as u32 byte length + UTF-8 text
+    index    count x u64 record offsets
+    postings u32 question ids for each (category, difficulty, type) combination
+    meta     UTF-8 JSON with the category/difficulty/type string tables and
+             the [category, difficulty, type, offset, count] posting table
+
+Text is stored exactly as OpenTDB returns it (HTML-escaped) and only
+unescaped when a question is read, so opening a bank costs the same for 1k
+or 1M questions: the header and the small meta table are all that is parsed.
+The posting lists are mapped in place and back a QuestionIndex, so filtered
+random samples never scan the bank.
+
+Compile OpenTDB JSON dumps (or JSONL/CSV files, see question_sources) with:
+
+    python question_bank_file.py compile bank.qbank dump.json [dump.json ...]
+"""
+import html
+import json
+import mmap
+import struct
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from question_bank import StringTable
+from question_index import QuestionIndex
+from quiz_core import Deduplicator, Question, QuestionFetchError, check_options
+
+MAGIC = b"QZBANK\0\0"
+VERSION = 2
+HEADER = struct.Struct("<8sIIQQ")
+RECORD_HEAD = struct.Struct("<HBBB")
+LENGTH = struct.Struct("<I")
+OFFSET = struct.Struct("<Q")
+
+
+class BankFormatError(Exception):
+    """Raised when a file is not a readable question bank."""
+
+
+def compile_bank(items: Iterable[Dict], path: str) -> int:
+    """Write raw (HTML-escaped) OpenTDB records to a bank file; returns the question count.
+
+    Records are streamed to disk, so only the offset index and posting lists
+    are held in memory. Raises ValueError for a record with more answers than
+    the frontends can show.
+    """
+    categories, difficulties, types = StringTable(), StringTable(), StringTable()
+    offsets = array("Q")
+    postings: Dict[tuple, array] = {}
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        position = HEADER.size
+        for number, item in enumerate(items, 1):
+            try:
+                check_options(item)
+            except ValueError as e:
+                raise ValueError(f"record {number}: {e}") from None
+            strings = [item["question"], item["correct_answer"]] + list(item["incorrect_answers"])
+            combo = (
+                categories.code(html.unescape(item.get("category", ""))),
+                difficulties.code(item.get("difficulty", "")),
+                types.code(item.get("type", "")),
+            )
+            postings.setdefault(combo, array("I")).append(len(offsets))
+            chunks = [RECORD_HEAD.pack(*combo, len(strings) - 1)]
+            for value in strings:
+                data = value.encode("utf-8")
+                chunks.append(LENGTH.pack(len(data)))
+                chunks.append(data)
+            record = b"".join(chunks)
+            offsets.append(position)
+            f.write(record)
+            position += len(record)
+
+        # Keep the u64 index and u32 posting lists aligned for in-place access
+        padding = -position % OFFSET.size
+        f.write(b"\0" * padding)
+        index_offset = position + padding
+        count = len(offsets)
+        if sys.byteorder != "little":
+            offsets.byteswap()
+        offsets.tofile(f)
+        position = index_offset + count * OFFSET.size
+        posting_table = []
+        for combo, posting in postings.items():
+            posting_table.append([*combo, position, len(posting)])
+            position += len(posting) * posting.itemsize
+            if sys.byteorder != "little":
+                posting.byteswap()
+            posting.tofile(f)
+        meta_offset = position
+        f.write(json.dumps({
+            "categories": categories.values,
+            "difficulties": difficulties.values,
+            "types": types.values,
+            "postings": posting_table,
+        }).encode("utf-8"))
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, count, index_offset, meta_offset))
+    return count
+
+
+def iter_dump_records(paths: Iterable[str]) -> Iterator[Dict]:
+    """Stream records from OpenTDB JSON dumps (API responses or plain lists of results), JSONL or CSV files."""
+    from question_sources import iter_file_records
+    for path in paths:
+        yield from iter_file_records(path)
+
+
+class MappedQuestionBank:
+    """Read-only, memory-mapped view of a compiled bank file.
+
+    Opening is O(1); questions are decoded one at a time on access and
+    `index` samples over the mapped posting lists.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            raise BankFormatError(f"{path} is too small to be a question bank")
+        magic, version, self._count, self._index_offset, meta_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise BankFormatError(f"{path} is not a version {VERSION} question bank")
+        meta = json.loads(self._mm[meta_offset:].decode("utf-8"))
+        self.categories: List[str] = meta["categories"]
+        self.difficulties: List[str] = meta["difficulties"]
+        self.types: List[str] = meta["types"]
+        self._view = memoryview(self._mm)
+        postings = {}
+        for category, difficulty, question_type, offset, count in meta["postings"]:
+            posting = self._view[offset:offset + count * 4].cast("I")
+            if sys.byteorder != "little":
+                posting = array("I", posting)
+                posting.byteswap()
+            postings[(category, difficulty, question_type)] = posting
+        self.index = QuestionIndex(postings, self.categories, self.difficulties, self.types)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _record_offset(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("question index out of range")
+        return OFFSET.unpack_from(self._mm, self._index_offset + index * OFFSET.size)[0]
+
+    def codes(self, index: int):
+        """(category, difficulty, type) codes of a question, without decoding its text."""
+        return RECORD_HEAD.unpack_from(self._mm, self._record_offset(index))[:3]
+
+    def __getitem__(self, index: int) -> Question:
+        position = self._record_offset(index)
+        category, difficulty, question_type, answer_count = RECORD_HEAD.unpack_from(self._mm, position)
+        position += RECORD_HEAD.size
+        strings = []
+        for _ in range(answer_count + 1):
+            (length,) = LENGTH.unpack_from(self._mm, position)
+            position += LENGTH.size
+            strings.append(html.unescape(self._mm[position:position + length].decode("utf-8")))
+            position += length
+        return Question(
+            strings[0], strings[1], strings[2:],
+            category=self.categories[category],
+            difficulty=self.difficulties[difficulty],
+            question_type=self.types[question_type],
+        )
+
+    def __iter__(self) -> Iterator[Question]:
+        for index in range(self._count):
+            yield self[index]
+
+    def sample(self, amount: int, category: Optional[str] = None, difficulty: Optional[str] = None,
+               question_type: Optional[str] = None) -> List[Question]:
+        """Pick `amount` random questions matching the filters, in O(amount) time."""
+        try:
+            ids = self.index.sample(amount, category, difficulty, question_type)
+        except ValueError:
+            raise QuestionFetchError("Not enough questions in the local bank for this category and difficulty",
+                                     response_code=1)
+        return [self[i] for i in ids]
+
+    def close(self):
+        # Release every exported view first, or mmap.close() refuses
+        for posting in self.index.postings.values():
+            if isinstance(posting, memoryview):
+                posting.release()
+        self._view.release()
+        self._mm.close()
+
+
+def main(argv: List[str]):
+    if len(argv) < 3 or argv[0] != "compile":
+        print("usage: python question_bank_file.py compile OUTPUT DUMP.json [DUMP.json ...]", file=sys.stderr)
+        sys.exit(2)
+    # Dumps often overlap (and repeat questions with different escaping); keep one copy of each
+    seen = Deduplicator()
+    try:
+        count = compile_bank(seen.records(iter_dump_records(argv[2:])), argv[1])
+    except (OSError, ValueError) as e:
+        print(f"Compile failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Wrote {count} questions to {argv[1]} ({seen.dropped} duplicates dropped)")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
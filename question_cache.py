@@ -0,0 +1,294 @@
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from quiz_trace import traced
+
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".quiz_app", "questions.sqlite3")
+DEFAULT_TTL = 7 * 24 * 60 * 60  # One week, in seconds
+DEFAULT_MAX_ENTRIES = 20000
+REFILL_BATCH = 50  # Largest amount OpenTDB returns in one call
+REFILL_THRESHOLD = 100  # Refill a pool once fewer fresh questions than this remain
+SAMPLE_ROUNDS = 4  # Batches of random row ids tried before a pool is sampled from its full id list
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS questions (
+    question TEXT PRIMARY KEY,
+    category INTEGER,
+    difficulty TEXT,
+    question_type TEXT,
+    payload TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    fingerprint INTEGER
+);
+CREATE INDEX IF NOT EXISTS questions_last_used ON questions (last_used);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def _fingerprint(item: Dict) -> int:
+    from quiz_core import record_question_id, signed_id  # quiz_core imports this module
+    return signed_id(record_question_id(item))
+
+
+class QuestionCache:
+    """Disk-backed store of raw OpenTDB question records.
+
+    Records are kept exactly as the API returns them (still HTML-escaped) and
+    are keyed by the category they were requested with, so a cached pool can
+    serve later requests for the same category/difficulty. A unique index on
+    each question's fingerprint (quiz_core.question_id) drops questions that
+    are already stored, even if their case, spacing or escaping differ; they
+    only refresh the stored copy's age. Entries older than
+    `ttl` seconds are not served (except in offline mode) and the store is
+    trimmed to `max_entries` by evicting the least recently used rows.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, offline: bool = False):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.duplicates = 0
+        self.evicted = 0  # Rows dropped to stay within max_entries
+        self._lock = threading.RLock()
+        self._refilling = set()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(questions)")]
+        if "question_type" not in columns:
+            # Caches written before type filtering; the type is still in each payload
+            self._conn.execute("ALTER TABLE questions ADD COLUMN question_type TEXT")
+            self._conn.execute("UPDATE questions SET question_type = json_extract(payload, '$.type')")
+        if len(self._conn.execute("PRAGMA index_info(questions_pool)").fetchall()) == 3:
+            # Caches written before the index covered fetched_at, which every online take() filters on
+            self._conn.execute("DROP INDEX questions_pool")
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS questions_pool ON questions (category, difficulty, question_type, fetched_at)"
+        )
+        if "fingerprint" not in columns:
+            # Fingerprint rows of older caches, keeping the first copy of any duplicates
+            self._conn.execute("ALTER TABLE questions ADD COLUMN fingerprint INTEGER")
+            rows = self._conn.execute("SELECT question, payload FROM questions").fetchall()
+            self._conn.executemany("UPDATE questions SET fingerprint = ? WHERE question = ?",
+                                   [(_fingerprint(json.loads(payload)), question) for question, payload in rows])
+            self._conn.execute("DELETE FROM questions WHERE rowid NOT IN "
+                               "(SELECT MIN(rowid) FROM questions GROUP BY fingerprint)")
+        self._conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS questions_fingerprint ON questions (fingerprint)")
+        self._conn.commit()
+
+    @classmethod
+    def from_env(cls, offline: bool = False) -> "QuestionCache":
+        """Build a cache configured from QUIZ_APP_CACHE_* / QUIZ_APP_OFFLINE environment variables."""
+        return cls(
+            path=os.environ.get("QUIZ_APP_CACHE_PATH", DEFAULT_CACHE_PATH),
+            ttl=float(os.environ.get("QUIZ_APP_CACHE_TTL", DEFAULT_TTL)),
+            max_entries=int(os.environ.get("QUIZ_APP_CACHE_SIZE", DEFAULT_MAX_ENTRIES)),
+            offline=offline or os.environ.get("QUIZ_APP_OFFLINE", "") not in ("", "0"),
+        )
+
+    def _pool_filter(self, category: Optional[int], difficulty: Optional[str], question_type: Optional[str]):
+        # Only the filters that are set, so SQLite can look the pool up in questions_pool
+        filters = [(column, value) for column, value in (("category", category), ("difficulty", difficulty),
+                                                         ("question_type", question_type)) if value is not None]
+        return (" AND ".join(f"{column} = ?" for column, _ in filters) or "1",
+                tuple(value for _, value in filters))
+
+    @traced("cache.take", "cache")
+    def take(self, amount: int, category: Optional[int] = None, difficulty: Optional[str] = None,
+             question_type: Optional[str] = None, partial: bool = False) -> Optional[List[Dict]]:
+        """Return `amount` random cached records for the pool, or None on a miss.
+
+        In offline mode stale entries are served too, and a partial result is
+        returned rather than nothing when the pool is smaller than `amount`;
+        `partial` does the same for fresh entries.
+        """
+        where, params = self._pool_filter(category, difficulty, question_type)
+        now = time.time()
+        if not self.offline:
+            where += " AND fetched_at >= ?"
+            params += (now - self.ttl,)
+        with self._lock:
+            picked = self._sample_row_ids(amount, category, where, params)
+            rows = self._conn.execute(
+                f"SELECT question, payload FROM questions WHERE rowid IN ({','.join('?' * len(picked))})", picked
+            ).fetchall() if picked else []
+            random.shuffle(rows)
+            if len(rows) < amount and not ((self.offline or partial) and rows):
+                self.misses += 1
+                self._bump("misses")
+                return None
+            self.hits += 1
+            self._bump("hits")
+            self._conn.executemany("UPDATE questions SET last_used = ? WHERE question = ?",
+                                   [(now, question) for question, _ in rows])
+            self._conn.commit()
+        return [json.loads(payload) for _, payload in rows]
+
+    def _sample_row_ids(self, amount: int, category: Optional[int], where: str, params: tuple) -> List[int]:
+        """Up to `amount` distinct random row ids matching `where`, without sorting the pool.
+
+        Without a category the pool is most of the table, so batches of random
+        row ids are drawn and the matching ones kept (uniform, even with gaps
+        left by eviction). A category's pool, or one too sparse to hit, is read
+        from the questions_pool index and sampled whole.
+        """
+        if category is None:
+            # Separate subqueries: SQLite only answers a lone MIN() or MAX() from the primary key
+            low, high = self._conn.execute(
+                "SELECT (SELECT MIN(rowid) FROM questions), (SELECT MAX(rowid) FROM questions)"
+            ).fetchone()
+            picked = set()
+            for _ in range(SAMPLE_ROUNDS if low is not None else 0):
+                candidates = random.sample(range(low, high + 1), min(high - low + 1, 2 * (amount - len(picked))))
+                picked.update(row[0] for row in self._conn.execute(
+                    f"SELECT rowid FROM questions WHERE rowid IN ({','.join('?' * len(candidates))}) AND {where}",
+                    tuple(candidates) + params
+                ))
+                if len(picked) >= amount:
+                    return random.sample(sorted(picked), amount)
+        row_ids = [row[0] for row in self._conn.execute(f"SELECT rowid FROM questions WHERE {where}", params)]
+        return random.sample(row_ids, min(amount, len(row_ids)))
+
+    @traced("cache.put", "cache")
+    def put(self, items: List[Dict], category: Optional[int] = None, from_api: bool = True) -> int:
+        """Store raw API records requested with `category`, then apply TTL and size limits.
+
+        Returns how many records were new; the others were duplicates of
+        stored questions (or of each other) and were dropped. Pass
+        `from_api=False` for records that did not come from an API call
+        (file imports), so they are not counted as one.
+        """
+        now = time.time()
+        fingerprints = [_fingerprint(item) for item in items]
+        with self._lock:
+            known = set()
+            for start in range(0, len(fingerprints), 500):  # Stay below SQLite's parameter limit
+                chunk = fingerprints[start:start + 500]
+                known.update(row[0] for row in self._conn.execute(
+                    f"SELECT fingerprint FROM questions WHERE fingerprint IN ({','.join('?' * len(chunk))})", chunk
+                ))
+            new, duplicates = [], []
+            for item, fingerprint in zip(items, fingerprints):
+                if fingerprint in known:
+                    duplicates.append((now, category, fingerprint))
+                else:
+                    known.add(fingerprint)
+                    new.append((item["question"], category, item.get("difficulty"), item.get("type"),
+                                json.dumps(item), now, now, fingerprint))
+            self._conn.executemany(
+                "INSERT INTO questions (question, category, difficulty, question_type, payload, fetched_at, last_used, "
+                "fingerprint) VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(question) DO UPDATE SET "
+                "category = COALESCE(excluded.category, category), question_type = excluded.question_type, "
+                "payload = excluded.payload, fetched_at = excluded.fetched_at, fingerprint = excluded.fingerprint",
+                new
+            )
+            # A question sent again is still current; keep the stored copy from expiring
+            self._conn.executemany("UPDATE questions SET fetched_at = ?, category = COALESCE(?, category) "
+                                   "WHERE fingerprint = ?", duplicates)
+            self.duplicates += len(duplicates)
+            if from_api:
+                self._bump("api_calls")
+            self._bump("duplicates", len(duplicates))
+            self._evict(now)
+            self._conn.commit()
+        return len(new)
+
+    def _evict(self, now: float):
+        if not self.offline:
+            # Offline mode keeps stale rows around, since they are all it can serve
+            self._conn.execute("DELETE FROM questions WHERE fetched_at < ?", (now - self.ttl,))
+        excess = self.count() - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM questions WHERE question IN "
+                "(SELECT question FROM questions ORDER BY last_used LIMIT ?)", (excess,)
+            )
+            self.evicted += excess
+
+    def _bump(self, name: str, amount: int = 1):
+        self._conn.execute(
+            "INSERT INTO counters VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            (name, amount)
+        )
+
+    def count(self, category: Optional[int] = None, difficulty: Optional[str] = None,
+              question_type: Optional[str] = None, fresh_only: bool = False) -> int:
+        where, params = self._pool_filter(category, difficulty, question_type)
+        if fresh_only:
+            where += " AND fetched_at >= ?"
+            params += (time.time() - self.ttl,)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM questions WHERE {where}", params).fetchone()[0]
+
+    def refill_async(self, fetch_raw: Callable[..., List[Dict]], category: Optional[int] = None,
+                     difficulty: Optional[str] = None, question_type: Optional[str] = None):
+        """Top up a pool on a daemon thread if it is running low on fresh questions.
+
+        `fetch_raw(amount, category, difficulty, question_type)` must return raw
+        API records. Failures are ignored; the next cache miss will fetch on
+        demand anyway.
+        """
+        key = (category, difficulty, question_type)
+        with self._lock:
+            if self.offline or key in self._refilling:
+                return
+            if self.count(*key, fresh_only=True) >= REFILL_THRESHOLD:
+                return
+            self._refilling.add(key)
+
+        def refill():
+            try:
+                self.put(fetch_raw(REFILL_BATCH, *key), category)
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refilling.discard(key)
+
+        threading.Thread(target=refill, name="question-cache-refill", daemon=True).start()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters for this process plus the totals persisted on disk."""
+        with self._lock:
+            totals = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+            stored = self.count()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "duplicates": self.duplicates,
+            "total_hits": totals.get("hits", 0),
+            "total_misses": totals.get("misses", 0),
+            "total_api_calls": totals.get("api_calls", 0),
+            "total_duplicates": totals.get("duplicates", 0),
+            "stored": stored,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    # Print the cache counters, e.g. `python question_cache.py [path]`
+    cache = QuestionCache(sys.argv[1] if len(sys.argv) > 1 else os.environ.get("QUIZ_APP_CACHE_PATH", DEFAULT_CACHE_PATH))
+    for name, value in cache.stats().items():
+        print(f"{name}: {value}")
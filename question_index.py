@@ -0,0 +1,91 @@
+import random
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+Combo = Tuple[int, int, int]  # (category, difficulty, type) codes
+
+
+class QuestionIndex:
+    """Inverted index over question category, difficulty and type.
+
+    Every question lives in exactly one posting list, the one for its
+    (category, difficulty, type) combination. A filter on any subset of the
+    three fields is therefore the union of a few disjoint posting lists,
+    found without looking at the questions themselves. Posting lists only
+    need len() and indexing, so arrays, ranges and memoryviews all work.
+    """
+
+    def __init__(self, postings: Dict[Combo, Sequence[int]], categories: List[str],
+                 difficulties: List[str], types: List[str]):
+        self.postings = postings
+        self.categories = categories
+        self.difficulties = difficulties
+        self.types = types
+
+    @classmethod
+    def build(cls, codes: Iterable[Combo], categories: List[str], difficulties: List[str],
+              types: List[str]) -> "QuestionIndex":
+        """Index questions given their (category, difficulty, type) codes in id order."""
+        postings: Dict[Combo, array] = {}
+        for question_id, combo in enumerate(codes):
+            posting = postings.get(combo)
+            if posting is None:
+                posting = postings[combo] = array("I")
+            posting.append(question_id)
+        return cls(postings, categories, difficulties, types)
+
+    @classmethod
+    def for_bank(cls, bank) -> "QuestionIndex":
+        """Index an in-memory QuestionBank."""
+        return cls.build(
+            ((bank.category_code(i), bank.difficulty_code(i), bank.type_code(i)) for i in range(len(bank))),
+            bank.categories.values, bank.difficulties.values, bank.types.values,
+        )
+
+    def select(self, category: Optional[str] = None, difficulty: Optional[str] = None,
+               question_type: Optional[str] = None) -> List[Sequence[int]]:
+        """Posting lists whose questions match every given filter; None matches anything."""
+        wanted = []
+        for value, names in ((category, self.categories), (difficulty, self.difficulties),
+                             (question_type, self.types)):
+            if value is None:
+                wanted.append(None)
+            elif value in names:
+                wanted.append(names.index(value))
+            else:
+                return []
+        return [posting for combo, posting in self.postings.items()
+                if all(code is None or code == combo[field] for field, code in enumerate(wanted))]
+
+    def count(self, category: Optional[str] = None, difficulty: Optional[str] = None,
+              question_type: Optional[str] = None) -> int:
+        return sum(len(posting) for posting in self.select(category, difficulty, question_type))
+
+    def sample(self, k: int, category: Optional[str] = None, difficulty: Optional[str] = None,
+               question_type: Optional[str] = None, rng: Optional[random.Random] = None) -> List[int]:
+        """Draw `k` distinct matching question ids in random order.
+
+        Runs in O(k log m) for m matching posting lists, independent of the
+        bank size. Raises ValueError if fewer than `k` questions match.
+        """
+        rng = rng or random
+        postings = self.select(category, difficulty, question_type)
+        ends = list(accumulate(len(posting) for posting in postings))
+        total = ends[-1] if ends else 0
+        if k > total:
+            raise ValueError(f"only {total} questions match, {k} requested")
+        # Floyd's algorithm: k distinct positions in the concatenated posting lists
+        chosen = set()
+        for upper in range(total - k, total):
+            position = rng.randrange(upper + 1)
+            chosen.add(upper if position in chosen else position)
+        positions = list(chosen)
+        rng.shuffle(positions)
+        ids = []
+        for position in positions:
+            which = bisect_right(ends, position)
+            start = ends[which - 1] if which else 0
+            ids.append(postings[which][position - start])
+        return ids
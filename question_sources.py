@@ -0,0 +1,425 @@
+"""Pluggable question sources, queried concurrently and merged as they answer.
+
+A source yields pages of questions for a quiz request. QuestionFanOut asks
+all of its sources at once on a thread pool and yields pages in the order
+they arrive, deduplicated, until the quiz is full. Every source has its own
+timeout (per page), so a slow or failing source never holds up the start.
+
+Sources are named in a comma-separated spec, e.g. for QUIZ_APP_SOURCES or
+`python quiz_app.py --sources`:
+
+    opentdb            the Open Trivia DB API (pages are stored in the cache)
+    cache              the local question cache
+    bank:PATH          a compiled question bank (question_bank_file)
+    PATH / file:PATH   an OpenTDB JSON dump, a JSONL file or a CSV file
+
+Append @SECONDS to a source to change its timeout, e.g. `opentdb@3,cache`.
+
+File sources stream their records with generators, so a multi-GB file is
+never held in memory; importing it into the cache once is faster for
+repeated play:
+
+    python question_sources.py import FILE [FILE ...]
+"""
+import abc
+import csv
+import html
+import json
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from quiz_core import (
+    PAGE_SIZE, Deduplicator, Question, QuestionFetchError, category_name, check_options, get_category_catalog,
+    get_question_cache, parse_question, parse_questions, stream_api_questions
+)
+
+JSON_CHUNK_SIZE = 1 << 20  # Characters read at a time when streaming a JSON array
+_SEPARATORS = re.compile(r"[\s,]*")
+_WHITESPACE = re.compile(r"\s*")
+
+
+def _checked(item: Dict, where: str) -> Dict:
+    """The record, or a ValueError naming `where` if the frontends could not show all its answers."""
+    try:
+        check_options(item)
+    except ValueError as e:
+        raise ValueError(f"{where}: {e}") from None
+    return item
+
+
+def iter_json_records(path: str, chunk_size: int = JSON_CHUNK_SIZE) -> Iterator[Dict]:
+    """Stream the records of a JSON file: a plain list of questions, or an API response's "results" array."""
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buffer, position, eof = "", 0, False
+
+        def read_on():
+            nonlocal buffer, position, eof
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer, position = buffer[position:] + chunk, 0
+
+        def next_char(pattern) -> str:
+            # The first character after whatever `pattern` matches, reading on as needed
+            nonlocal position
+            while True:
+                position = pattern.match(buffer, position).end()
+                if position < len(buffer):
+                    return buffer[position]
+                if eof:
+                    raise ValueError(f"{path}: truncated JSON")
+                read_on()
+
+        def next_value():
+            nonlocal position
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                    # A value that reaches the end of the buffer may be a number cut in two
+                    if end < len(buffer) or eof:
+                        position = end
+                        return value
+                except json.JSONDecodeError:
+                    if eof:
+                        raise ValueError(f"{path}: truncated or malformed JSON")
+                read_on()
+
+        first = next_char(_WHITESPACE)
+        if first == "{":
+            # Skip the members of an API response up to its results
+            position += 1
+            while True:
+                if next_char(_SEPARATORS) == "}":
+                    return
+                key = next_value()
+                if next_char(_WHITESPACE) != ":":
+                    raise ValueError(f"{path}: malformed JSON object")
+                position += 1
+                next_char(_WHITESPACE)
+                if key == "results":
+                    break
+                next_value()
+        elif first != "[":
+            raise ValueError(f"{path}: expected a JSON array or an object with a \"results\" array")
+        if next_char(_WHITESPACE) != "[":
+            raise ValueError(f"{path}: \"results\" must be a JSON array")
+        position += 1
+        number = 0
+        while True:
+            if next_char(_SEPARATORS) == "]":
+                return
+            item = next_value()
+            number += 1
+            if not isinstance(item, dict):
+                raise ValueError(f"{path}: question records must be JSON objects, found {type(item).__name__}")
+            yield _checked(item, f"{path}: record {number}")
+            if position > chunk_size:
+                buffer, position = buffer[position:], 0
+
+
+def iter_jsonl_records(path: str) -> Iterator[Dict]:
+    """Stream one record per line from a JSON Lines file."""
+    with open(path, encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if line.strip():
+                item = json.loads(line)
+                if not isinstance(item, dict):
+                    raise ValueError(f"{path}:{number}: question records must be JSON objects")
+                yield _checked(item, f"{path}:{number}")
+
+
+def iter_csv_records(path: str) -> Iterator[Dict]:
+    """Stream records from a CSV file with question, correct_answer and incorrect_answers columns.
+
+    Incorrect answers are separated by "|"; category, difficulty and type
+    columns are optional.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            incorrect = [answer for answer in (row.get("incorrect_answers") or "").split("|") if answer]
+            yield _checked({
+                "question": row["question"],
+                "correct_answer": row["correct_answer"],
+                "incorrect_answers": incorrect,
+                "category": row.get("category") or "",
+                "difficulty": row.get("difficulty") or "",
+                "type": row.get("type") or ("boolean" if len(incorrect) == 1 else "multiple"),
+            }, f"{path}:{reader.line_num}")
+
+
+def iter_file_records(path: str) -> Iterator[Dict]:
+    """Stream raw question records from a JSON, JSONL or CSV file, by extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in (".jsonl", ".ndjson"):
+        return iter_jsonl_records(path)
+    if extension == ".csv":
+        return iter_csv_records(path)
+    return iter_json_records(path)
+
+
+class QuestionSource(abc.ABC):
+    """Somewhere questions come from. Subclasses implement pages()."""
+
+    name = "source"
+    timeout = 10.0  # Seconds to wait for each page
+
+    @abc.abstractmethod
+    def pages(self, amount: int, category: Optional[int] = None, difficulty: Optional[str] = None,
+              question_type: Optional[str] = None) -> Iterator[List[Question]]:
+        """Yield pages of up to `amount` questions in total; raise QuestionFetchError on failure."""
+
+
+class OpenTDBSource(QuestionSource):
+    name = "opentdb"
+
+    def pages(self, amount, category=None, difficulty=None, question_type=None):
+        return stream_api_questions(amount, category, difficulty, question_type)
+
+
+class CacheSource(QuestionSource):
+    """Fresh questions from the local question cache, as many as it has."""
+
+    name = "cache"
+    timeout = 2.0
+
+    def pages(self, amount, category=None, difficulty=None, question_type=None):
+        items = get_question_cache().take(amount, category, difficulty, question_type, partial=True)
+        if items:
+            yield parse_questions(items)
+
+
+class BankSource(QuestionSource):
+    """Random questions from a compiled question bank file, opened on first use."""
+
+    timeout = 2.0
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = f"bank:{os.path.basename(path)}"
+        self._bank = None
+
+    def pages(self, amount, category=None, difficulty=None, question_type=None):
+        if self._bank is None:
+            from question_bank_file import MappedQuestionBank
+            self._bank = MappedQuestionBank(self.path)
+        name = category_name(category)
+        amount = min(amount, self._bank.index.count(name, difficulty, question_type))
+        if amount:
+            yield self._bank.sample(amount, name, difficulty, question_type)
+
+
+class FileSource(QuestionSource):
+    """Random questions from a JSON, JSONL or CSV file, drawn in one streaming pass."""
+
+    timeout = 30.0
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = f"file:{os.path.basename(path)}"
+
+    def pages(self, amount, category=None, difficulty=None, question_type=None):
+        name = category_name(category)
+        # Reservoir sampling: memory stays at `amount` records however large the file is
+        sample: List[Dict] = []
+        matched = 0
+        for item in iter_file_records(self.path):
+            if ((name and html.unescape(item.get("category", "")) != name)
+                    or (difficulty and item.get("difficulty") != difficulty)
+                    or (question_type and item.get("type") != question_type)):
+                continue
+            matched += 1
+            if len(sample) < amount:
+                sample.append(item)
+            else:
+                slot = random.randrange(matched)
+                if slot < amount:
+                    sample[slot] = item
+        random.shuffle(sample)
+        for start in range(0, len(sample), PAGE_SIZE):
+            yield parse_questions(sample[start:start + PAGE_SIZE])
+
+
+def parse_sources(spec: str) -> List[QuestionSource]:
+    """Build sources from a comma-separated spec (see the module docstring)."""
+    sources = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        timeout = None
+        name, at, seconds = entry.rpartition("@")
+        if at and re.fullmatch(r"\d+(\.\d*)?", seconds):
+            entry, timeout = name, float(seconds)
+        if entry == "opentdb":
+            source = OpenTDBSource()
+        elif entry == "cache":
+            source = CacheSource()
+        elif entry.startswith("bank:"):
+            source = BankSource(entry[len("bank:"):])
+        else:
+            source = FileSource(entry[len("file:"):] if entry.startswith("file:") else entry)
+        if timeout is not None:
+            source.timeout = timeout
+        sources.append(source)
+    if not sources:
+        raise ValueError("no question sources given")
+    return sources
+
+
+class QuestionFanOut:
+    """Queries several sources at once and merges their pages as they arrive."""
+
+    def __init__(self, sources: Sequence[QuestionSource]):
+        self.sources = list(sources)
+        # Room for a second round while stragglers from the previous quiz are still running
+        self._executor = ThreadPoolExecutor(max_workers=2 * len(self.sources), thread_name_prefix="question-source")
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[str, float]] = {
+            source.name: {"pages": 0, "questions": 0, "timeouts": 0, "errors": 0, "first_page_ms": 0.0}
+            for source in self.sources
+        }
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "QuestionFanOut":
+        return cls(parse_sources(spec))
+
+    def _count(self, source: QuestionSource, name: str, amount: float = 1):
+        with self._lock:
+            self.counters[source.name][name] += amount
+
+    def stream(self, amount: int, category: Optional[int] = None, difficulty: Optional[str] = None,
+               question_type: Optional[str] = None) -> Iterator[List[Question]]:
+        """Yield deduplicated pages from whichever sources answer first until `amount` questions arrived.
+
+        Raises QuestionFetchError if no source produced anything in time.
+        """
+        results: "queue.Queue" = queue.Queue()
+        done = threading.Event()
+
+        def run(source: QuestionSource):
+            try:
+                for page in source.pages(amount, category, difficulty, question_type):
+                    if done.is_set():
+                        return
+                    results.put((source, page, None))
+            except Exception as e:  # Reported to the consumer; one broken source must not end the quiz
+                results.put((source, None, e))
+                return
+            results.put((source, None, None))
+
+        started = time.monotonic()
+        deadlines = {source: started + source.timeout for source in self.sources}
+        first_page = set()
+        for source in self.sources:
+            self._executor.submit(run, source)
+        seen = Deduplicator()
+        remaining = amount
+        errors = []
+        try:
+            while deadlines and remaining > 0:
+                try:
+                    source, page, error = results.get(timeout=max(0.0, min(deadlines.values()) - time.monotonic()))
+                except queue.Empty:
+                    now = time.monotonic()
+                    for source in [source for source, deadline in deadlines.items() if deadline <= now]:
+                        del deadlines[source]  # Its late pages are ignored
+                        self._count(source, "timeouts")
+                        errors.append(f"{source.name}: timed out")
+                    continue
+                if source not in deadlines:
+                    continue
+                if page is None:
+                    del deadlines[source]
+                    if error is not None:
+                        self._count(source, "errors")
+                        errors.append(f"{source.name}: {error}")
+                    continue
+                deadlines[source] = time.monotonic() + source.timeout
+                if source not in first_page:
+                    first_page.add(source)
+                    with self._lock:
+                        self.counters[source.name]["first_page_ms"] = (time.monotonic() - started) * 1000
+                page = seen.questions(page)[:remaining]
+                self._count(source, "pages")
+                self._count(source, "questions", len(page))
+                if page:
+                    remaining -= len(page)
+                    yield page
+        finally:
+            done.set()
+        if remaining == amount:
+            raise QuestionFetchError("No question source returned any questions"
+                                     + (f" ({'; '.join(errors)})" if errors else ""))
+
+    def fetch(self, amount: int, category: Optional[int] = None, difficulty: Optional[str] = None,
+              question_type: Optional[str] = None) -> List[Question]:
+        """Up to `amount` questions merged from all sources (fewer if none had more in time)."""
+        return [question for page in self.stream(amount, category, difficulty, question_type) for question in page]
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {name: dict(counters) for name, counters in self.counters.items()}
+
+
+def import_files(paths: Sequence[str], batch_size: int = 500) -> Dict[str, int]:
+    """Stream records from files into the question cache in batches.
+
+    Records are filed under the id of the category they name, so they serve
+    quizzes for that category as well as "Any". Returns the read, stored,
+    duplicate and evicted counts and the questions the cache holds
+    afterwards; evicted rows were dropped to stay within the cache size.
+    Raises ValueError on the first malformed record.
+    """
+    cache = get_question_cache()
+    category_ids = {name: category for category, name in get_category_catalog().categories.items()}
+    evicted_before = cache.evicted
+    stored = read = 0
+
+    def put(batch: List[Dict]) -> int:
+        by_category: Dict[Optional[int], List[Dict]] = {}
+        for item in batch:
+            category = category_ids.get(html.unescape(item.get("category") or ""))
+            by_category.setdefault(category, []).append(item)
+        return sum(cache.put(items, category, from_api=False) for category, items in by_category.items())
+
+    for path in paths:
+        batch = []
+        for item in iter_file_records(path):
+            try:
+                parse_question(item)  # Reject malformed records before they reach the cache
+            except (KeyError, TypeError) as e:
+                raise ValueError(f"{path}: malformed question record ({type(e).__name__}: {e})") from e
+            batch.append(item)
+            if len(batch) == batch_size:
+                stored += put(batch)
+                read += len(batch)
+                batch = []
+        if batch:
+            stored += put(batch)
+            read += len(batch)
+    return {"read": read, "stored": stored, "duplicates": read - stored, "evicted": cache.evicted - evicted_before,
+            "cached": cache.count()}
+
+
+def main(argv: List[str]):
+    if len(argv) < 2 or argv[0] != "import":
+        print("usage: python question_sources.py import FILE [FILE ...]", file=sys.stderr)
+        sys.exit(2)
+    try:
+        counts = import_files(argv[1:])
+    except (OSError, ValueError) as e:
+        print(f"Import failed: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Imported {counts['stored']} of {counts['read']} questions ({counts['duplicates']} duplicates dropped)")
+    if counts["evicted"]:
+        print(f"{counts['evicted']} questions were evicted to stay within the cache size (QUIZ_APP_CACHE_SIZE); "
+              f"the cache now holds {counts['cached']}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,15 +1,34 @@
-import sys
-import requests
-import html
+import json
+import math
+import os
 import random
+import sqlite3
+import sys
 from typing import List, Optional
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
     QRadioButton, QMessageBox, QButtonGroup, QLineEdit, QProgressBar, QComboBox,
-    QGridLayout, QDialog, QTextEdit
+    QGridLayout, QDialog, QListView, QTableWidget, QTableWidgetItem, QHeaderView, QCheckBox
 )
 from PyQt5.QtGui import QFont, QIcon, QPixmap
-from PyQt5.QtCore import Qt, QTimer, QTime
+from PyQt5.QtCore import (
+    Qt, QTimer, QTime, QObject, QRunnable, QThreadPool, pyqtSignal, QAbstractListModel, QModelIndex,
+    QSortFilterProxyModel
+)
+
+from attempt_history import AttemptHistory, HistoryFormatError
+from question_cache import QuestionCache
+from quiz_core import (
+    MAX_OPTIONS, PAGE_SIZE, Question, QuestionFetchError, available_questions, category_name, fetch_questions,
+    get_category_catalog, get_client, get_question_bank, get_question_cache, set_question_bank,
+    set_question_cache, set_question_sources, stream_questions
+)
+from quiz_plan import DEFAULT_RESUME_PATH, QuizPlan, save_json
+from quiz_prefetch import QuizPrefetcher
+from quiz_session import AnswerResult, QuizSession, ReviewItem, SessionState, SessionStateError
+from quiz_timer import QuestionTimer
+from quiz_trace import enable_from_env, span, traced
+from review_scheduler import ReviewScheduler, mix_due
 
 
 # Added Portion:
@@ -19,46 +38,142 @@ def resource_path(relative_path):
     return os.path.join(base_path, relative_path)
 #End of added portion
 
+LOGO_SIZE = 200
+LOGO_FILE = 'logoquizapp.png'  # Set your own logo here
+SCALED_LOGO_FILE = 'logoquizapp_200.png'  # LOGO_FILE pre-scaled to LOGO_SIZE, shipped to skip scaling at startup
 
+def load_logo() -> QPixmap:
+    """The welcome-screen logo, from the pre-scaled copy when it is present."""
+    if os.path.exists(resource_path(SCALED_LOGO_FILE)):
+        return QPixmap(resource_path(SCALED_LOGO_FILE))
+    return QPixmap(resource_path(LOGO_FILE)).scaled(LOGO_SIZE, LOGO_SIZE, Qt.KeepAspectRatio,
+                                                    Qt.SmoothTransformation)
 
 
-class Question:
-    def __init__(self, prompt: str, correct_answer: str, incorrect_answers: List[str]):
-        self.prompt = prompt
-        self.correct_answer = correct_answer
-        self.incorrect_answers = incorrect_answers
-        self.user_answer = None  # Store user's answer for review
 
-def fetch_questions(amount: int = 10, category: Optional[int] = None, difficulty: Optional[str] = None) -> List[Question]:
-    """Fetch questions from the Open Trivia DB API."""
-    url = f"https://opentdb.com/api.php?amount={amount}"
-    if category:
-        url += f"&category={category}"
-    if difficulty:
-        url += f"&difficulty={difficulty}"
-    
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data['response_code'] != 0:
-            raise ValueError("Failed to fetch questions from the API")
-        
-        questions = []
-        for item in data['results']:
-            prompt = html.unescape(item['question'])
-            correct_answer = html.unescape(item['correct_answer'])
-            incorrect_answers = [html.unescape(ans) for ans in item['incorrect_answers']]
-            questions.append(Question(prompt, correct_answer, incorrect_answers))
-        return questions
-        
-    except requests.RequestException as e:
-        QMessageBox.critical(None, "Error", f"Error fetching questions: {e}")
-        return []
-    except Exception as e:
-        QMessageBox.critical(None, "Error", f"Unexpected error: {e}")
-        return []
+
+MAX_QUESTIONS = 500  # Quizzes above PAGE_SIZE are streamed in pages
+AUTO_ADVANCE_DELAY = 1500  # Milliseconds the answer feedback stays up when advancing automatically
+
+class FetchSignals(QObject):
+    page_ready = pyqtSignal(object)  # List[Question]
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+
+class FetchWorker(QRunnable):
+    """Fetches questions on the thread pool and reports back through signals.
+
+    Quizzes of up to PAGE_SIZE questions arrive as one page via fetch_questions;
+    larger ones are streamed page by page with stream_questions.
+    """
+
+    def __init__(self, amount: int, category: Optional[int], difficulty: Optional[str],
+                 question_type: Optional[str] = None):
+        super().__init__()
+        self.amount = amount
+        self.category = category
+        self.difficulty = difficulty
+        self.question_type = question_type
+        self.cancelled = False
+        self.signals = FetchSignals()
+
+    def cancel(self):
+        # The HTTP request itself cannot be interrupted; the result is dropped instead.
+        self.cancelled = True
+
+    @traced("FetchWorker.run", "fetch")
+    def run(self):
+        try:
+            if self.amount <= PAGE_SIZE:
+                pages = iter([fetch_questions(amount=self.amount, category=self.category, difficulty=self.difficulty,
+                                              question_type=self.question_type)])
+            else:
+                pages = stream_questions(self.amount, category=self.category, difficulty=self.difficulty,
+                                         question_type=self.question_type)
+            for page in pages:
+                if self.cancelled:
+                    return
+                self.signals.page_ready.emit(page)
+        except QuestionFetchError as e:
+            if not self.cancelled:
+                self.signals.failed.emit(str(e))
+            return
+        except Exception as e:  # The cache, a bank file or a source failed; the welcome screen must not hang
+            if not self.cancelled:
+                self.signals.failed.emit(f"Could not load questions: {e}")
+            return
+        if not self.cancelled:
+            self.signals.finished.emit()
+
+class TaskSignals(QObject):
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+class TaskWorker(QRunnable):
+    """Runs a single blocking call on the thread pool, e.g. a catalog refresh."""
+
+    def __init__(self, function, *args):
+        super().__init__()
+        self.function = function
+        self.args = args
+        self.signals = TaskSignals()
+
+    def run(self):
+        try:
+            result = self.function(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.finished.emit(result)
+
+class ReviewModel(QAbstractListModel):
+    """Reviewed questions as list rows; a row's text is only built when the view asks for it."""
+
+    CategoryRole = Qt.UserRole
+    SearchTextRole = Qt.UserRole + 1
+
+    def __init__(self, items: List[ReviewItem], parent=None):
+        super().__init__(parent)
+        self.items = items
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.items)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        question, user_answer = self.items[index.row()]
+        if role == Qt.DisplayRole:
+            return (f"Question {index.row() + 1}:\n{question.prompt}\n"
+                    f"Your Answer: {user_answer or 'No Answer'}\n"
+                    f"Correct Answer: {question.correct_answer}")
+        if role == self.CategoryRole:
+            return question.category
+        if role == self.SearchTextRole:
+            return f"{question.prompt}\n{user_answer or ''}\n{question.correct_answer}".casefold()
+        return None
+
+    def categories(self) -> List[str]:
+        return sorted({question.category for question, _ in self.items if question.category})
+
+class ReviewFilterModel(QSortFilterProxyModel):
+    """Filters review rows by a search string and a category."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.search = ""
+        self.category: Optional[str] = None
+
+    def set_filter(self, search: str, category: Optional[str]):
+        self.search = search.casefold().strip()
+        self.category = category
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        index = self.sourceModel().index(source_row, 0, source_parent)
+        if self.category and index.data(ReviewModel.CategoryRole) != self.category:
+            return False
+        return not self.search or self.search in index.data(ReviewModel.SearchTextRole)
 
 class QuizApp(QWidget):
     def __init__(self):
@@ -66,14 +181,35 @@ class QuizApp(QWidget):
         self.setWindowTitle("Modern Quiz App")
         self.setGeometry(100, 100, 800, 600)
         self.setWindowIcon(QIcon(resource_path('quizappicon.png')))  # Set your own icon here
-        self.questions = []
-        self.score = 0
-        self.question_index = 0
-        self.current_correct_index = -1
-        self.timer = QTimer()
+        self.session: Optional[QuizSession] = None
         self.time_limit = 30  # Time limit per question in seconds
-        self.remaining_time = self.time_limit
-        self.incorrect_questions = []
+        # The countdown is computed from a monotonic deadline; the QTimer only wakes us when the shown second changes
+        self.question_timer = QuestionTimer(self.time_limit)
+        self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.PreciseTimer)
+        self.timer.timeout.connect(self.update_timer)
+        # Moves on to the next question after the feedback has been shown, with auto-advance on
+        self.advance_timer = QTimer()
+        self.advance_timer.setSingleShot(True)
+        self.advance_timer.timeout.connect(self.display_question)
+        self.question_widget = None  # The quiz screen; built for the first quiz and reused for later ones
+        self.shown_seconds = None  # Value currently on the timer label
+        self.resume_remaining = None  # Time left on the current question of a resumed quiz
+        self.fetch_worker = None
+        self.catalog_refresh_pending = False  # Set by the welcome screen until the window is first painted
+        self.expected_total = 0  # Questions requested; the session's list may still be growing
+        self.waiting_for_questions = False
+        self.counting_categories = set()  # Categories with a count request in flight
+        self.seed: Optional[int] = None  # Option-order seed for new quizzes; random if None
+        self.save_plan_path: Optional[str] = None  # Where to write each new quiz's plan, for sharing
+        # Progress is saved here after every question
+        self.resume_path = os.environ.get("QUIZ_APP_RESUME_PATH", DEFAULT_RESUME_PATH)
+        self.reviews = ReviewScheduler.from_env()  # Spaced-repetition deck of missed questions
+        self.review_questions: List[Question] = []  # Due cards waiting to be mixed into the quiz being fetched
+        # Fetches the next quiz's questions while this one is played
+        self.prefetcher = QuizPrefetcher.from_env()
+        self.last_request = None  # (amount, category, difficulty, type) of the quiz being started
         self.init_ui()
         self.set_style()
     
@@ -87,16 +223,14 @@ class QuizApp(QWidget):
         self.welcome_widget.setLayout(self.welcome_layout)
 
         self.logo_label = QLabel()
-        pixmap = QPixmap(resource_path('logoquizapp.png'))  # Set your own logo here
-        pixmap = pixmap.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-        self.logo_label.setPixmap(pixmap)
+        self.logo_label.setPixmap(load_logo())
         self.logo_label.setAlignment(Qt.AlignCenter)
 
         self.welcome_label = QLabel("Welcome to the Quiz App!")
         self.welcome_label.setFont(QFont("Arial", 28, QFont.Bold))
         self.welcome_label.setAlignment(Qt.AlignCenter)
         
-        self.num_questions_label = QLabel("Number of Questions (1-50):")
+        self.num_questions_label = QLabel(f"Number of Questions (1-{MAX_QUESTIONS}):")
         self.num_questions_input = QLineEdit()
         self.num_questions_input.setFixedWidth(100)
 
@@ -107,10 +241,38 @@ class QuizApp(QWidget):
         self.difficulty_label = QLabel("Select Difficulty:")
         self.difficulty_combo = QComboBox()
         self.difficulty_combo.addItems(["Any", "Easy", "Medium", "Hard"])
+
+        self.type_label = QLabel("Select Type:")
+        self.type_combo = QComboBox()
+        self.type_combo.addItem("Any", None)
+        self.type_combo.addItem("Multiple Choice", "multiple")
+        self.type_combo.addItem("True / False", "boolean")
+
+        self.review_checkbox = QCheckBox()
+        self.update_review_count()
+        self.auto_advance_checkbox = QCheckBox("Go to the next question automatically after answering")
         
         self.start_button = QPushButton("Start Quiz")
         self.start_button.clicked.connect(self.start_quiz)
         self.start_button.setFixedWidth(200)
+
+        # Shown while questions are being fetched in the background
+        self.fetch_status_label = QLabel("Fetching questions...")
+        self.fetch_status_label.setAlignment(Qt.AlignCenter)
+        self.fetch_progress = QProgressBar()
+        self.fetch_progress.setRange(0, 0)  # Busy indicator
+        self.fetch_progress.setTextVisible(False)
+        self.fetch_progress.setFixedHeight(20)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_fetch)
+        self.cancel_button.setFixedWidth(200)
+
+        self.statistics_button = QPushButton("Statistics")
+        self.statistics_button.clicked.connect(self.show_statistics)
+        self.statistics_button.setFixedWidth(200)
+
+        self.cache_stats_label = QLabel()
+        self.cache_stats_label.setAlignment(Qt.AlignCenter)
         
         self.welcome_layout.addWidget(self.logo_label)
         self.welcome_layout.addWidget(self.welcome_label)
@@ -123,53 +285,74 @@ class QuizApp(QWidget):
         form_layout.addWidget(self.category_combo, 1, 1)
         form_layout.addWidget(self.difficulty_label, 2, 0)
         form_layout.addWidget(self.difficulty_combo, 2, 1)
+        form_layout.addWidget(self.type_label, 3, 0)
+        form_layout.addWidget(self.type_combo, 3, 1)
+        form_layout.addWidget(self.review_checkbox, 4, 0, 1, 2)
+        form_layout.addWidget(self.auto_advance_checkbox, 5, 0, 1, 2)
         form_layout.setAlignment(Qt.AlignCenter)
         self.welcome_layout.addLayout(form_layout)
 
         self.welcome_layout.addWidget(self.start_button, alignment=Qt.AlignCenter)
+        self.welcome_layout.addWidget(self.statistics_button, alignment=Qt.AlignCenter)
+        self.welcome_layout.addWidget(self.fetch_status_label)
+        self.welcome_layout.addWidget(self.fetch_progress)
+        self.welcome_layout.addWidget(self.cancel_button, alignment=Qt.AlignCenter)
+        self.welcome_layout.addWidget(self.cache_stats_label)
         self.welcome_layout.setAlignment(Qt.AlignCenter)
+        self.set_fetching(False)
+        self.update_cache_stats()
         
         self.main_layout.addWidget(self.welcome_widget)
     
-    def populate_categories(self):
-        # Categories from the Open Trivia DB API
-        categories = {
-            0: "Any",
-            9: "General Knowledge",
-            10: "Entertainment: Books",
-            11: "Entertainment: Film",
-            12: "Entertainment: Music",
-            13: "Entertainment: Musicals & Theatres",
-            14: "Entertainment: Television",
-            15: "Entertainment: Video Games",
-            16: "Entertainment: Board Games",
-            17: "Science & Nature",
-            18: "Science: Computers",
-            19: "Science: Mathematics",
-            20: "Mythology",
-            21: "Sports",
-            22: "Geography",
-            23: "History",
-            24: "Politics",
-            25: "Art",
-            26: "Celebrities",
-            27: "Animals",
-            28: "Vehicles",
-            29: "Entertainment: Comics",
-            30: "Science: Gadgets",
-            31: "Entertainment: Japanese Anime & Manga",
-            32: "Entertainment: Cartoon & Animations"
-        }
+    def populate_categories(self, categories=None):
+        """Fill the category combo from the cached catalog, refreshing it in the background if stale."""
+        catalog = get_category_catalog()
+        selected = self.category_combo.currentData()
+        self.category_combo.blockSignals(True)
+        self.category_combo.clear()
         self.category_combo.addItem("Any", 0)
-        for cat_id, cat_name in categories.items():
-            if cat_id != 0:
-                self.category_combo.addItem(cat_name, cat_id)
+        for cat_id, cat_name in (categories or catalog.categories).items():
+            self.category_combo.addItem(cat_name, cat_id)
+        self.category_combo.setCurrentIndex(max(self.category_combo.findData(selected), 0))
+        self.category_combo.blockSignals(False)
+        if categories is None:
+            self.category_combo.currentIndexChanged.connect(self.refresh_category_count)
+            # Stale on a first run and once a day; refreshed after the first paint (see paintEvent), since
+            # the client and the requests import behind it would compete with startup even on a worker thread
+            self.catalog_refresh_pending = True
+    
+    def refresh_catalog(self):
+        """Refresh a stale category list and the selected category's count in the background."""
+        catalog = get_category_catalog()
+        if catalog.categories_stale() and self.catalog_online():
+            # The client is created on the worker thread
+            worker = TaskWorker(lambda: catalog.refresh_categories(get_client()))
+            worker.signals.finished.connect(self.populate_categories)
+            QThreadPool.globalInstance().start(worker)
+        self.refresh_category_count()  # "Any" is selected at first; its count comes from the global total
+    
+    def catalog_online(self) -> bool:
+        # Counts for a local bank come from its index, and offline mode must not hit the network
+        return get_question_bank() is None and not get_question_cache().offline
+    
+    def refresh_category_count(self):
+        """Fetch question counts for the selected category (or all, for "Any") in the background if not cached."""
+        category = self.category_combo.currentData() or None
+        catalog = get_category_catalog()
+        if (category in self.counting_categories or not self.catalog_online()
+                or not catalog.count_stale(category)):
+            return
+        self.counting_categories.add(category)
+        worker = TaskWorker(lambda: catalog.refresh_count(get_client(), category))
+        worker.signals.finished.connect(lambda _: self.counting_categories.discard(category))
+        worker.signals.failed.connect(lambda _: self.counting_categories.discard(category))
+        QThreadPool.globalInstance().start(worker)
     
     def start_quiz(self):
         try:
             num_questions = int(self.num_questions_input.text())
-            if not 1 <= num_questions <= 50:
-                raise ValueError("Number must be between 1 and 50")
+            if not 1 <= num_questions <= MAX_QUESTIONS:
+                raise ValueError(f"Number must be between 1 and {MAX_QUESTIONS}")
             
             category = self.category_combo.currentData()
             if category == 0:
@@ -177,16 +360,189 @@ class QuizApp(QWidget):
             difficulty = self.difficulty_combo.currentText().lower()
             if difficulty == "any":
                 difficulty = None
+            question_type = self.type_combo.currentData()
+            # "Review due" mode: cards that are due take the first places, fresh questions fill the rest
+            self.review_questions = []
+            if self.review_checkbox.isChecked():
+                self.review_questions = self.reviews.due(num_questions, category_name(category), difficulty,
+                                                         question_type)
+            fresh = num_questions - len(self.review_questions)
+            # Check against cached counts before any network call
+            available = available_questions(category, difficulty, question_type)
+            if available is not None and fresh > available:
+                raise ValueError(f"Only {available} questions are available for this category and difficulty")
             
-            self.questions = fetch_questions(amount=num_questions, category=category, difficulty=difficulty)
-            if self.questions:
-                # Clear the welcome screen
-                self.welcome_widget.hide()
-                self.build_quiz_ui()
-                self.display_question()
+            self.session = None
+            self.expected_total = num_questions
+            self.last_request = (num_questions, category, difficulty, question_type)
+            prefetched = self.prefetcher.take(fresh, category, difficulty, question_type) if fresh else []
+            if prefetched is not None:
+                self.start_questions(prefetched)
+                return
+            self.fetch_worker = FetchWorker(fresh, category, difficulty, question_type)
+            self.fetch_worker.signals.page_ready.connect(self.on_questions_fetched)
+            self.fetch_worker.signals.finished.connect(self.on_fetch_finished)
+            self.fetch_worker.signals.failed.connect(self.on_fetch_failed)
+            self.set_fetching(True)
+            QThreadPool.globalInstance().start(self.fetch_worker)
         except ValueError as e:
             QMessageBox.warning(self, "Invalid Input", f"Invalid input: {e}")
     
+    def set_fetching(self, fetching: bool):
+        """Toggle the welcome screen between its input and progress/cancel states."""
+        for widget in (self.num_questions_input, self.category_combo, self.difficulty_combo, self.type_combo,
+                       self.review_checkbox, self.auto_advance_checkbox, self.start_button):
+            widget.setEnabled(not fetching)
+        self.fetch_status_label.setVisible(fetching)
+        self.fetch_progress.setVisible(fetching)
+        self.cancel_button.setVisible(fetching)
+    
+    def update_cache_stats(self):
+        stats = get_question_cache().stats()
+        mode = " (offline)" if get_question_cache().offline else ""
+        self.cache_stats_label.setText(
+            f"Question cache{mode}: {stats['stored']} stored, "
+            f"{stats['total_hits']} hits / {stats['total_misses']} misses, "
+            f"{stats['total_duplicates']} duplicates dropped"
+        )
+        prefetch = self.prefetcher.stats()
+        if prefetch["hits"] or prefetch["misses"]:
+            self.cache_stats_label.setText(
+                self.cache_stats_label.text() + f"\nNext quiz prefetched: {prefetch['hits']} of "
+                f"{prefetch['hits'] + prefetch['misses']} starts, median wait {prefetch['median_age_s']:.0f} s"
+            )
+    
+    def update_review_count(self):
+        self.review_checkbox.setText(f"Mix in questions due for review ({self.reviews.due_count()} due)")
+    
+    def cancel_fetch(self):
+        if self.fetch_worker is not None:
+            self.fetch_worker.cancel()
+            self.fetch_worker = None
+        self.set_fetching(False)
+    
+    def is_current_fetch(self) -> bool:
+        # Ignore results from a worker that was cancelled or superseded
+        return self.fetch_worker is not None and self.sender() is self.fetch_worker.signals
+    
+    @traced("on_questions_fetched", "fetch")
+    def on_questions_fetched(self, questions: List[Question]):
+        if not self.is_current_fetch():
+            return
+        if self.session is not None:
+            # A later page of a streamed quiz arrived while the user plays
+            self.session.add_questions(questions)
+            if self.waiting_for_questions:
+                self.display_question()
+            return
+        self.update_cache_stats()
+        if not questions and not self.review_questions:
+            self.on_fetch_failed("No questions were returned by the API.")
+            return
+        self.set_fetching(False)
+        self.start_questions(questions)
+    
+    def start_questions(self, questions: List[Question]):
+        """Start a new quiz with these questions, mixed with any due review cards."""
+        if self.review_questions:
+            questions = mix_due(self.review_questions, questions, random.Random(self.seed))
+            self.review_questions = []
+        self.begin_session(QuizSession(time_limit=self.time_limit, plan=QuizPlan.build(questions, self.seed)))
+        # This quiz's questions are in, so the rate limit is free for the next one
+        self.prefetcher.predict(*self.last_request)
+    
+    def begin_session(self, session: QuizSession):
+        """Switch from the welcome screen to a new, or resumed, quiz session."""
+        self.session = session
+        self.question_timer.time_limit = session.time_limit
+        if session.state is SessionState.IDLE:
+            session.start()
+            if self.save_plan_path:
+                session.plan.save(self.save_plan_path)
+        if self.fetch_worker is None:
+            self.expected_total = len(session.questions)
+        # Clear the welcome screen
+        self.welcome_widget.hide()
+        if self.question_widget is None:
+            self.build_quiz_ui()
+        self.progress_bar.setMaximum(self.expected_total)
+        self.question_widget.show()
+        self.display_question()
+    
+    def start_plan(self, plan: QuizPlan):
+        """Play a saved quiz plan: the same questions, in the same order, without fetching."""
+        self.begin_session(QuizSession(time_limit=self.time_limit, plan=plan))
+    
+    def offer_resume(self):
+        """Ask to continue a quiz that was interrupted before it finished."""
+        try:
+            with open(self.resume_path, encoding="utf-8") as f:
+                data = json.load(f)
+            session = QuizSession.from_snapshot(data)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError, SessionStateError):
+            self.discard_progress()  # Unreadable; nothing to resume
+            return
+        if not session.has_question():
+            self.discard_progress()
+            return
+        answer = QMessageBox.question(
+            self, "Resume Quiz",
+            f"You have an unfinished quiz ({session.answered} of {len(session.questions)} questions answered). "
+            "Would you like to continue it?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if answer == QMessageBox.Yes:
+            self.resume_remaining = data.get("remaining")
+            self.begin_session(session)
+        else:
+            self.discard_progress()
+    
+    def save_progress(self, remaining: Optional[float] = None):
+        data = self.session.snapshot()
+        if remaining is not None:
+            data["remaining"] = remaining  # Time left on the question being shown
+        try:
+            save_json(data, self.resume_path)
+        except OSError:
+            pass  # Resuming is a convenience; never interrupt the quiz over it
+    
+    def discard_progress(self):
+        try:
+            os.remove(self.resume_path)
+        except OSError:
+            pass
+    
+    def on_fetch_finished(self):
+        if not self.is_current_fetch():
+            return
+        self.fetch_worker = None
+        if self.session is not None:
+            self.expected_total = len(self.session.questions)
+            self.progress_bar.setMaximum(self.expected_total)
+            if self.waiting_for_questions:
+                self.display_question()
+    
+    def on_fetch_failed(self, message: str):
+        if not self.is_current_fetch():
+            return
+        if self.session is not None:
+            # A streamed quiz is already running; end it with what has arrived
+            self.on_fetch_finished()
+            return
+        self.fetch_worker.cancel()
+        self.fetch_worker = None
+        self.set_fetching(False)
+        if self.review_questions:
+            # No fresh questions, but the due cards still make a quiz
+            QMessageBox.warning(self, "Error", f"{message}\nStarting with your {len(self.review_questions)} due "
+                                               "review questions only.")
+            self.start_questions([])
+            return
+        QMessageBox.critical(self, "Error", message)
+    
+    @traced("build_quiz_ui", "render")
     def build_quiz_ui(self):
         # Quiz Screen Widgets
         self.question_widget = QWidget()
@@ -203,18 +559,35 @@ class QuizApp(QWidget):
         self.options_layout = QVBoxLayout()
         self.options_layout.setSpacing(10)
         
-        for i in range(4):
+        for i in range(MAX_OPTIONS):
             radio_btn = QRadioButton()
             radio_btn.setFont(QFont("Arial", 16))
             self.options_group.addButton(radio_btn, id=i)
             self.options_layout.addWidget(radio_btn)
         
+        # Shows whether the last answer was right, without blocking the quiz in a dialog
+        self.feedback_label = QLabel("")
+        self.feedback_label.setObjectName("feedback_label")
+        self.feedback_label.setWordWrap(True)
+        self.feedback_label.setFont(QFont("Arial", 16, QFont.Bold))
+        self.feedback_label.setAlignment(Qt.AlignCenter)
+        
         self.submit_button = QPushButton("Submit Answer")
         self.submit_button.clicked.connect(self.check_answer)
         self.submit_button.setFixedWidth(200)
+        self.next_button = QPushButton("Next Question")
+        self.next_button.clicked.connect(self.display_question)
+        self.next_button.setFixedWidth(200)
+        self.pause_button = QPushButton("Pause")
+        self.pause_button.clicked.connect(self.toggle_pause)
+        self.pause_button.setFixedWidth(200)
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addWidget(self.submit_button)
+        buttons_layout.addWidget(self.next_button)
+        buttons_layout.addWidget(self.pause_button)
+        buttons_layout.setAlignment(Qt.AlignCenter)
         
         self.progress_bar = QProgressBar()
-        self.progress_bar.setMaximum(len(self.questions))
         self.progress_bar.setTextVisible(False)
         self.progress_bar.setFixedHeight(20)
         
@@ -225,90 +598,159 @@ class QuizApp(QWidget):
         self.quiz_layout.addWidget(self.timer_label)
         self.quiz_layout.addWidget(self.question_label)
         self.quiz_layout.addLayout(self.options_layout)
-        self.quiz_layout.addWidget(self.submit_button, alignment=Qt.AlignCenter)
+        self.quiz_layout.addWidget(self.feedback_label)
+        self.quiz_layout.addLayout(buttons_layout)
         self.quiz_layout.addWidget(self.progress_bar)
         
         self.main_layout.addWidget(self.question_widget)
-
-        # Timer setup
-        self.timer.timeout.connect(self.update_timer)
     
     def display_question(self):
-        if self.question_index < len(self.questions):
-            self.remaining_time = self.time_limit
-            self.update_timer_label()
-            self.timer.start(1000)
-            
-            question = self.questions[self.question_index]
-            self.question_label.setText(f"Question {self.question_index + 1}:\n\n{question.prompt}")
-            
-            options = question.incorrect_answers + [question.correct_answer]
-            random.shuffle(options)
-            self.current_correct_index = options.index(question.correct_answer)
-            
-            for i, option in enumerate(options):
-                radio_btn = self.options_group.button(i)
-                radio_btn.setText(option)
-                radio_btn.show()
-                radio_btn.setChecked(False)
-            
-            # Hide unused radio buttons
-            for i in range(len(options), 4):
-                radio_btn = self.options_group.button(i)
-                radio_btn.hide()
-            
-            self.progress_bar.setValue(self.question_index)
+        self.advance_timer.stop()
+        self.waiting_for_questions = False
+        self.feedback_label.hide()
+        self.next_button.hide()
+        self.submit_button.show()
+        self.submit_button.setEnabled(True)
+        self.pause_button.setEnabled(True)
+        if self.session.has_question():
+            with span("display_question", "render", index=self.session.question_index):
+                remaining, self.resume_remaining = self.resume_remaining, None
+                with span("save_progress", "io"):
+                    self.save_progress(remaining)
+                
+                options = self.session.present()
+                question = self.session.current_question
+                self.question_label.setText(f"Question {self.session.question_index + 1}:\n\n{question.prompt}")
+                
+                # An exclusive group never lets its checked button be unchecked
+                self.options_group.setExclusive(False)
+                for i, option in enumerate(options):
+                    radio_btn = self.options_group.button(i)
+                    radio_btn.setText(option)
+                    radio_btn.setEnabled(True)
+                    radio_btn.show()
+                    radio_btn.setChecked(False)
+                self.options_group.setExclusive(True)
+                
+                # Hide unused radio buttons
+                for i in range(len(options), MAX_OPTIONS):
+                    radio_btn = self.options_group.button(i)
+                    radio_btn.hide()
+                
+                self.progress_bar.setValue(self.session.question_index)
+            # Start the clock once the question is on screen
+            self.question_timer.start(remaining)
+            self.shown_seconds = None
+            self.update_timer()
+        elif self.fetch_worker is not None:
+            # The user caught up with a streamed quiz; continue once the next page arrives
+            self.waiting_for_questions = True
+            self.submit_button.setEnabled(False)
+            self.pause_button.setEnabled(False)
+            self.question_label.setText("Loading more questions...")
+            for button in self.options_group.buttons():
+                button.hide()
+            self.progress_bar.setValue(self.session.question_index)
         else:
             self.show_result()
     
     def check_answer(self):
+        if self.question_timer.expired():
+            # The deadline passed before the timer event was handled; it is a timeout, not an answer
+            self.update_timer()
+            return
         selected_id = self.options_group.checkedId()
-        self.timer.stop()
         if selected_id == -1:
-            QMessageBox.warning(self, "No Selection", "Please select an answer before submitting.")
-            self.timer.start(1000)
+            self.set_feedback("Please select an answer before submitting.", "warning")
             return
         
-        question = self.questions[self.question_index]
-        question.user_answer = self.options_group.button(selected_id).text()
-        
-        if selected_id == self.current_correct_index:
-            self.score += 1
-            QMessageBox.information(self, "Correct", "✓ Correct!")
+        self.timer.stop()
+        self.show_answer_feedback(self.session.answer(selected_id, self.question_timer.stop()))
+    
+    def set_feedback(self, text: str, kind: str):
+        self.feedback_label.setText(text)
+        if self.feedback_label.property("kind") != kind:
+            # Re-apply the stylesheet rule for this kind of feedback
+            self.feedback_label.setProperty("kind", kind)
+            self.feedback_label.style().unpolish(self.feedback_label)
+            self.feedback_label.style().polish(self.feedback_label)
+        self.feedback_label.show()
+    
+    def show_answer_feedback(self, result: AnswerResult):
+        """Show how the question went in place, then wait for Next (or advance automatically)."""
+        if result.timed_out:
+            self.set_feedback(f"Time's up! The correct answer was: {result.correct_answer}", "incorrect")
+        elif result.correct:
+            self.set_feedback("✓ Correct!", "correct")
         else:
-            self.incorrect_questions.append(question)
-            QMessageBox.information(self, "Incorrect", f"✗ Wrong. The correct answer was: {question.correct_answer}")
-        
-        self.question_index += 1
-        self.display_question()
+            self.set_feedback(f"✗ Wrong. The correct answer was: {result.correct_answer}", "incorrect")
+        for button in self.options_group.buttons():
+            button.setEnabled(False)
+        self.submit_button.hide()
+        self.pause_button.setEnabled(False)
+        self.next_button.show()
+        self.next_button.setFocus()
+        self.progress_bar.setValue(self.session.question_index)
+        if self.auto_advance_checkbox.isChecked():
+            self.advance_timer.start(AUTO_ADVANCE_DELAY)
     
     def update_timer(self):
-        self.remaining_time -= 1
-        self.update_timer_label()
-        if self.remaining_time == 0:
-            self.timer.stop()
-            QMessageBox.information(self, "Time's Up", "Time's up for this question!")
+        if not self.question_timer.running:
+            return
+        seconds = self.question_timer.remaining_seconds()
+        if seconds != self.shown_seconds:
+            # Repaint only when the displayed number changes
+            self.shown_seconds = seconds
+            self.update_timer_label()
+        if self.question_timer.expired():
             # Record that the user did not answer in time
-            question = self.questions[self.question_index]
-            question.user_answer = None
-            self.incorrect_questions.append(question)
-            self.question_index += 1
-            self.display_question()
+            self.show_answer_feedback(self.session.timeout(self.question_timer.stop()))
+        else:
+            self.timer.start(max(1, math.ceil(self.question_timer.until_next_second() * 1000)))
     
     def update_timer_label(self):
-        self.timer_label.setText(f"Time Remaining: {self.remaining_time} seconds")
+        self.timer_label.setText(f"Time Remaining: {self.shown_seconds} seconds")
+    
+    def toggle_pause(self):
+        paused = not self.question_timer.paused
+        if paused:
+            self.question_timer.pause()
+            self.timer.stop()
+            # Saved with the time left, so a resumed quiz continues the question where it was paused
+            self.save_progress(self.question_timer.remaining())
+        else:
+            self.question_timer.resume()
+            self.update_timer()
+        self.pause_button.setText("Resume" if paused else "Pause")
+        self.submit_button.setEnabled(not paused)
+        for button in self.options_group.buttons():
+            button.setEnabled(not paused)
+        self.question_label.setVisible(not paused)
     
     def show_result(self):
-        percentage = (self.score / len(self.questions)) * 100
+        self.session.finish()
+        # The finished quiz stays on screen behind the dialogs; nothing on it may be answered any more
+        self.submit_button.setEnabled(False)
+        self.pause_button.setEnabled(False)
+        self.next_button.hide()
+        self.discard_progress()
+        try:
+            AttemptHistory.from_env().record_session(self.session)
+        except (OSError, HistoryFormatError):
+            pass  # Statistics are a convenience; never lose the result screen over them
+        try:
+            self.reviews.record_session(self.session)
+        except sqlite3.Error:
+            pass
         QMessageBox.information(
             self, "Quiz Completed",
-            f"Your score: {self.score}/{len(self.questions)} ({percentage:.1f}%)"
+            f"Your score: {self.session.score}/{self.session.answered} ({self.session.percentage:.1f}%)"
         )
         self.review_incorrect_answers()
     
     def review_incorrect_answers(self):
-        if not self.incorrect_questions:
-            self.close()
+        if not self.session.incorrect_questions:
+            self.offer_next_quiz()
             return
         review = QMessageBox.question(
             self, "Review Incorrect Answers",
@@ -317,39 +759,167 @@ class QuizApp(QWidget):
         )
         if review == QMessageBox.Yes:
             self.show_incorrect_answers()
+        else:
+            self.offer_next_quiz()
+    
+    def offer_next_quiz(self):
+        answer = QMessageBox.question(self, "Play Again", "Would you like to play another quiz?",
+                                      QMessageBox.Yes | QMessageBox.No)
+        if answer == QMessageBox.Yes:
+            self.return_to_welcome()
         else:
             self.close()
     
+    def return_to_welcome(self):
+        """Leave the finished quiz for the welcome screen, keeping the last settings and the quiz screen."""
+        self.timer.stop()
+        self.advance_timer.stop()
+        self.question_widget.hide()
+        self.session = None
+        self.update_cache_stats()
+        self.update_review_count()
+        self.welcome_widget.show()
+    
+    def play_again(self):
+        self.review_action = "play_again"
+        self.review_widget.close()
+    
+    def on_review_finished(self):
+        # Play Again and Close decide what comes next; Esc or the window's X still has to ask
+        action, self.review_action = self.review_action, None
+        if action == "play_again":
+            self.return_to_welcome()
+        elif action is None:
+            self.offer_next_quiz()
+    
     def show_incorrect_answers(self):
+        with span("review_render", "render"):
+            self.build_review_dialog()
+        self.review_widget.exec_()
+    
+    def build_review_dialog(self):
         self.review_widget = QDialog(self)
+        self.review_widget.setAttribute(Qt.WA_DeleteOnClose)  # The window stays open across quizzes
         self.review_widget.setWindowTitle("Review Incorrect Answers")
+        self.review_action = None  # Set by the Play Again and Close buttons
+        self.review_widget.finished.connect(self.on_review_finished)
         self.review_widget.setGeometry(150, 150, 700, 500)
         
         layout = QVBoxLayout()
-        text_edit = QTextEdit()
-        text_edit.setReadOnly(True)
-        text_edit.setFont(QFont("Arial", 14))
-        
-        review_text = ""
-        for idx, question in enumerate(self.incorrect_questions, 1):
-            review_text += f"Question {idx}:\n{question.prompt}\n"
-            if question.user_answer:
-                review_text += f"Your Answer: {question.user_answer}\n"
-            else:
-                review_text += f"Your Answer: No Answer\n"
-            review_text += f"Correct Answer: {question.correct_answer}\n\n"
-        
-        text_edit.setText(review_text)
-        layout.addWidget(text_edit)
+        self.review_model = ReviewModel(self.session.review(), self.review_widget)
+        self.review_filter = ReviewFilterModel(self.review_widget)
+        self.review_filter.setSourceModel(self.review_model)
+
+        filter_layout = QHBoxLayout()
+        self.review_search = QLineEdit()
+        self.review_search.setPlaceholderText("Search questions and answers")
+        self.review_search.textChanged.connect(self.filter_review)
+        self.review_category = QComboBox()
+        self.review_category.addItem("All Categories", None)
+        for category in self.review_model.categories():
+            self.review_category.addItem(category, category)
+        self.review_category.currentIndexChanged.connect(self.filter_review)
+        filter_layout.addWidget(self.review_search)
+        filter_layout.addWidget(self.review_category)
+        layout.addLayout(filter_layout)
+
+        self.review_count_label = QLabel()
+        layout.addWidget(self.review_count_label)
+
+        # Only visible rows are laid out and painted, in batches, however long the list is
+        review_list = QListView()
+        review_list.setModel(self.review_filter)
+        review_list.setFont(QFont("Arial", 14))
+        review_list.setWordWrap(True)
+        review_list.setSpacing(8)
+        review_list.setLayoutMode(QListView.Batched)
+        review_list.setBatchSize(50)
+        review_list.setVerticalScrollMode(QListView.ScrollPerPixel)
+        review_list.setSelectionMode(QListView.NoSelection)
+        review_list.setEditTriggers(QListView.NoEditTriggers)
+        layout.addWidget(review_list)
+        self.filter_review()
         
+        play_again_button = QPushButton("Play Again")
+        play_again_button.clicked.connect(self.play_again)
         close_button = QPushButton("Close")
         close_button.clicked.connect(self.close_application)
-        layout.addWidget(close_button, alignment=Qt.AlignCenter)
+        buttons_layout = QHBoxLayout()
+        buttons_layout.addWidget(play_again_button)
+        buttons_layout.addWidget(close_button)
+        buttons_layout.setAlignment(Qt.AlignCenter)
+        layout.addLayout(buttons_layout)
         
         self.review_widget.setLayout(layout)
-        self.review_widget.exec_()
+    
+    @traced("filter_review", "render")
+    def filter_review(self):
+        self.review_filter.set_filter(self.review_search.text(), self.review_category.currentData())
+        self.review_count_label.setText(
+            f"Showing {self.review_filter.rowCount()} of {self.review_model.rowCount()} questions"
+        )
+    
+    def show_statistics(self):
+        """Accuracy and response times over every recorded answer."""
+        try:
+            # NumPy is only needed here, so it is not imported at startup
+            from attempt_stats import load_history
+            history_file = AttemptHistory.from_env()
+            history = load_history(history_file.path)
+        except ImportError:
+            QMessageBox.warning(self, "Statistics", "Statistics need NumPy (pip install numpy).")
+            return
+        except (OSError, HistoryFormatError) as e:
+            QMessageBox.warning(self, "Statistics", f"Could not read the answer history: {e}")
+            return
+        if not len(history):
+            QMessageBox.information(self, "Statistics", "No answers recorded yet. Finish a quiz first!")
+            return
+
+        with span("statistics_render", "render", answers=len(history)):
+            dialog = self.build_statistics_dialog(history, history_file.categories())
+        dialog.exec_()
+    
+    def build_statistics_dialog(self, history, categories: List[str]) -> QDialog:
+        from attempt_stats import summary, trend
+        dialog = QDialog(self)
+        dialog.setAttribute(Qt.WA_DeleteOnClose)
+        dialog.setWindowTitle("Statistics")
+        dialog.setGeometry(150, 150, 700, 500)
+        layout = QVBoxLayout()
+        stats = summary(history, categories)
+        times = stats["response_time"]
+        summary_text = f"{stats['answers']} answers, {stats['accuracy']:.1%} correct"
+        if times["p50"] is not None:
+            summary_text += (f"\nResponse time: median {times['p50']:.1f} s, "
+                             f"90% within {times['p90']:.1f} s")
+        recent = trend(history)[-7:]
+        if recent:
+            summary_text += "\nLast days: " + ", ".join(f"{row['accuracy']:.0%}" for row in recent)
+        summary_label = QLabel(summary_text)
+        summary_label.setFont(QFont("Arial", 14))
+        layout.addWidget(summary_label)
+
+        rows = sorted(stats["by_category"], key=lambda row: -row["answers"])
+        table = QTableWidget(len(rows), 4)
+        table.setHorizontalHeaderLabels(["Category", "Answers", "Accuracy", "Timed Out"])
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        for i, row in enumerate(rows):
+            for column, value in enumerate((row["category"] or "Unknown", str(row["answers"]),
+                                            f"{row['accuracy']:.1%}", str(row["timed_out"]))):
+                table.setItem(i, column, QTableWidgetItem(value))
+        layout.addWidget(table)
+
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(dialog.close)
+        layout.addWidget(close_button, alignment=Qt.AlignCenter)
+        dialog.setLayout(layout)
+        return dialog
     
     def close_application(self):
+        self.review_action = "close"
         self.review_widget.close()
         self.close()
     
@@ -366,6 +936,15 @@ class QuizApp(QWidget):
             QLabel {
                 color: #333;
             }
+            QLabel#feedback_label[kind="correct"] {
+                color: #2e7d32;
+            }
+            QLabel#feedback_label[kind="incorrect"] {
+                color: #c62828;
+            }
+            QLabel#feedback_label[kind="warning"] {
+                color: #ef6c00;
+            }
             QPushButton {
                 background-color: #4CAF50;
                 color: white;
@@ -398,6 +977,17 @@ class QuizApp(QWidget):
             }
         """)
     
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.catalog_refresh_pending:
+            self.catalog_refresh_pending = False
+            QTimer.singleShot(0, self.refresh_catalog)
+
+    def closeEvent(self, event):
+        # Stop streaming pages for a quiz that is being closed
+        self.cancel_fetch()
+        super().closeEvent(event)
+    
     def clear_layout(self, layout):
         while layout.count():
             child = layout.takeAt(0)
@@ -406,8 +996,29 @@ class QuizApp(QWidget):
 
 def main():
     app = QApplication(sys.argv)
+    args = app.arguments()
+    # --trace [PATH] (or QUIZ_APP_TRACE=PATH) records timing spans and writes a Chrome trace at exit
+    enable_from_env(args)
+    # --offline starts quizzes from the local question cache only
+    set_question_cache(QuestionCache.from_env(offline="--offline" in args))
+    # --bank PATH serves quizzes from a compiled question bank file
+    if "--bank" in args[:-1]:
+        set_question_bank(args[args.index("--bank") + 1])
+    # --sources SPEC draws every quiz from several sources at once, e.g. "opentdb,cache,extra.jsonl"
+    if "--sources" in args[:-1]:
+        set_question_sources(args[args.index("--sources") + 1])
     quiz_app = QuizApp()
+    # --seed N fixes the option order of new quizzes; --save-plan PATH writes each quiz's plan for sharing
+    if "--seed" in args[:-1]:
+        quiz_app.seed = int(args[args.index("--seed") + 1])
+    if "--save-plan" in args[:-1]:
+        quiz_app.save_plan_path = args[args.index("--save-plan") + 1]
     quiz_app.show()
+    # --plan PATH replays a saved or shared quiz plan; otherwise offer to resume an interrupted quiz
+    if "--plan" in args[:-1]:
+        quiz_app.start_plan(QuizPlan.load(args[args.index("--plan") + 1]))
+    else:
+        quiz_app.offer_resume()
     sys.exit(app.exec_())
 
 if __name__ == "__main__":
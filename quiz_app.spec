@@ -1,39 +1,77 @@
 # -*- mode: python ; coding: utf-8 -*-
+#
+# pyinstaller quiz_app.spec              one-file build (unpacks to a temp dir on every launch)
+# pyinstaller quiz_app.spec -- --onedir  folder build that starts without unpacking
+
+import argparse
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--onedir", action="store_true", help="build a folder instead of a single executable")
+options = parser.parse_args()
 
 
 a = Analysis(
     ['quiz_app.py'],
     pathex=[],
     binaries=[],
-    datas=[('quizappicon.png', '.'), ('logoquizapp.png', '.')],
+    datas=[('quizappicon.png', '.'), ('logoquizapp.png', '.'), ('logoquizapp_200.png', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=['tkinter'],
     noarchive=False,
     optimize=0,
 )
 pyz = PYZ(a.pure)
 
-exe = EXE(
-    pyz,
-    a.scripts,
-    a.binaries,
-    a.datas,
-    [],
-    name='quiz_app',
-    debug=False,
-    bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
-    runtime_tmpdir=None,
-    console=False,
-    disable_windowed_traceback=False,
-    argv_emulation=False,
-    target_arch=None,
-    codesign_identity=None,
-    entitlements_file=None,
-    icon=['quizappicon.png'],
-)
+if options.onedir:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        name='quiz_app',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=False,  # Compressed Qt libraries would have to be decompressed on every start
+        console=False,
+        disable_windowed_traceback=False,
+        argv_emulation=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+        icon=['quizappicon.png'],
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.datas,
+        strip=False,
+        upx=False,
+        upx_exclude=[],
+        name='quiz_app',
+    )
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.datas,
+        [],
+        name='quiz_app',
+        debug=False,
+        bootloader_ignore_signals=False,
+        strip=False,
+        upx=True,
+        upx_exclude=[],
+        runtime_tmpdir=None,
+        console=False,
+        disable_windowed_traceback=False,
+        argv_emulation=False,
+        target_arch=None,
+        codesign_identity=None,
+        entitlements_file=None,
+        icon=['quizappicon.png'],
+    )
@@ -1,64 +1,55 @@
-import requests
-import html
-import random
-from typing import List, Optional
+import math
+import sqlite3
 import tkinter as tk
 from tkinter import messagebox
+from typing import Optional
 
-class Question:
-    def __init__(self, prompt: str, correct_answer: str, incorrect_answers: List[str]):
-        self.prompt = prompt
-        self.correct_answer = correct_answer
-        self.incorrect_answers = incorrect_answers
-
-def fetch_questions(amount: int = 10, category: Optional[int] = None, difficulty: Optional[str] = None) -> List[Question]:
-    """Fetch questions from the Open Trivia DB API."""
-    url = f"https://opentdb.com/api.php?amount={amount}"
-    if category:
-        url += f"&category={category}"
-    if difficulty:
-        url += f"&difficulty={difficulty}"
-    
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        
-        if data['response_code'] != 0:
-            raise ValueError("Failed to fetch questions from the API")
-        
-        questions = []
-        for item in data['results']:
-            prompt = html.unescape(item['question'])
-            correct_answer = html.unescape(item['correct_answer'])
-            incorrect_answers = [html.unescape(ans) for ans in item['incorrect_answers']]
-            questions.append(Question(prompt, correct_answer, incorrect_answers))
-        return questions
-        
-    except requests.RequestException as e:
-        messagebox.showerror("Error", f"Error fetching questions: {e}")
-        return []
-    except Exception as e:
-        messagebox.showerror("Error", f"Unexpected error: {e}")
-        return []
+from attempt_history import AttemptHistory, HistoryFormatError
+from quiz_core import MAX_OPTIONS, QuestionFetchError, fetch_questions
+from quiz_prefetch import QuizPrefetcher
+from quiz_session import QuizSession
+from quiz_timer import QuestionTimer
+from quiz_trace import enable_from_env, span, traced
+from review_scheduler import ReviewScheduler
+
+_prefetcher: Optional[QuizPrefetcher] = None
+_reviews: Optional[ReviewScheduler] = None
+
+
+def get_prefetcher() -> QuizPrefetcher:
+    """Return the prefetcher shared by every quiz, creating it on first use."""
+    global _prefetcher
+    if _prefetcher is None:
+        _prefetcher = QuizPrefetcher.from_env()
+    return _prefetcher
+
+
+def get_reviews() -> ReviewScheduler:
+    """Return the spaced-repetition deck shared by every quiz, opening it on first use."""
+    global _reviews
+    if _reviews is None:
+        _reviews = ReviewScheduler.from_env()
+    return _reviews
 
 class QuizApp:
-    def __init__(self, master, questions):
+    def __init__(self, master, questions, reviews):
         self.master = master
-        self.questions = questions
-        self.score = 0
-        self.question_index = 0
+        self.reviews = reviews  # Spaced-repetition deck of missed questions, shared by every quiz
+        self.session = QuizSession(questions)
+        self.session.start()
+        self.question_timer = QuestionTimer(math.inf)  # No time limit here; only response times are recorded
 
         self.create_widgets()
         self.display_question()
 
+    @traced("build_quiz_ui", "render")
     def create_widgets(self):
         self.lbl_question = tk.Label(self.master, text="", wraplength=500, justify="left", font=("Arial", 14))
         self.lbl_question.pack(pady=20)
 
         self.var_option = tk.IntVar()
         self.radio_buttons = []
-        for i in range(4):
+        for i in range(MAX_OPTIONS):
             rb = tk.Radiobutton(self.master, text="", variable=self.var_option, value=i, font=("Arial", 12))
             rb.pack(anchor="w")
             self.radio_buttons.append(rb)
@@ -67,80 +58,110 @@ class QuizApp:
         self.btn_submit.pack(pady=20)
 
     def display_question(self):
-        if self.question_index < len(self.questions):
-            question = self.questions[self.question_index]
-            self.lbl_question.config(text=f"Q{self.question_index + 1}: {question.prompt}")
-
-            options = question.incorrect_answers + [question.correct_answer]
-            random.shuffle(options)
-            self.current_correct_index = options.index(question.correct_answer)
-            
-            for i, option in enumerate(options):
-                self.radio_buttons[i].config(text=option)
-                self.radio_buttons[i].pack(anchor="w")
-
-            # Hide any extra radio buttons if fewer than 4 options
-            for i in range(len(options), 4):
-                self.radio_buttons[i].pack_forget()
-
-            self.var_option.set(-1)  # Reset the selected option
+        if self.session.has_question():
+            with span("display_question", "render", index=self.session.question_index):
+                options = self.session.present()
+                question = self.session.current_question
+                self.lbl_question.config(text=f"Q{self.session.question_index + 1}: {question.prompt}")
+                
+                for i, option in enumerate(options):
+                    self.radio_buttons[i].config(text=option)
+                    self.radio_buttons[i].pack(anchor="w")
+
+                # Hide any extra radio buttons if fewer than 4 options
+                for i in range(len(options), MAX_OPTIONS):
+                    self.radio_buttons[i].pack_forget()
+
+                self.var_option.set(-1)  # Reset the selected option
+            self.question_timer.start()
         else:
             self.show_result()
 
     def check_answer(self):
         selected = self.var_option.get()
         if selected == -1:
+            self.question_timer.pause()
             messagebox.showwarning("Warning", "Please select an answer.")
+            self.question_timer.resume()
             return
 
-        if selected == self.current_correct_index:
-            self.score += 1
+        result = self.session.answer(selected, self.question_timer.stop())
+        if result.correct:
             messagebox.showinfo("Correct", "✓ Correct!")
         else:
-            correct_answer = self.questions[self.question_index].correct_answer
-            messagebox.showinfo("Incorrect", f"✗ Wrong. The correct answer was: {correct_answer}")
+            messagebox.showinfo("Incorrect", f"✗ Wrong. The correct answer was: {result.correct_answer}")
 
-        self.question_index += 1
         self.display_question()
 
     def show_result(self):
-        percentage = (self.score / len(self.questions)) * 100
-        messagebox.showinfo("Quiz Completed", f"Your score: {self.score}/{len(self.questions)} ({percentage:.1f}%)")
+        self.session.finish()
+        try:
+            AttemptHistory.from_env().record_session(self.session)
+        except (OSError, HistoryFormatError):
+            pass
+        try:
+            self.reviews.record_session(self.session)
+        except sqlite3.Error:
+            pass
+        messagebox.showinfo("Quiz Completed",
+                            f"Your score: {self.session.score}/{self.session.answered} ({self.session.percentage:.1f}%)")
         self.master.destroy()
 
+def load_questions(text):
+    """Validate the requested number of questions and fetch them (blocks unless they were prefetched)."""
+    num_questions = int(text)
+    if not 1 <= num_questions <= 50:
+        raise ValueError("Number must be between 1 and 50")
+    prefetcher = get_prefetcher()
+    questions = prefetcher.take(num_questions)
+    if questions is None:
+        questions = fetch_questions(amount=num_questions)
+    # Fetch the next quiz in the background while this one is played
+    prefetcher.predict(num_questions)
+    return questions
+
 def start_quiz():
     try:
-        num_questions = int(entry_num_questions.get())
-        if not 1 <= num_questions <= 50:
-            raise ValueError("Number must be between 1 and 50")
-        questions = fetch_questions(amount=num_questions)
+        questions = load_questions(entry_num_questions.get())
         if questions:
             quiz_window = tk.Toplevel(root)
             quiz_window.title("Quiz")
             quiz_window.geometry("600x400")
-            app = QuizApp(quiz_window, questions)
+            app = QuizApp(quiz_window, questions, get_reviews())
+    except QuestionFetchError as e:
+        messagebox.showerror("Error", str(e))
     except ValueError as e:
         messagebox.showerror("Invalid Input", f"Invalid input: {e}")
 
-# Main application window
-root = tk.Tk()
-root.title("Quiz App")
-root.geometry("400x200")
-
-# Welcome Label
-lbl_welcome = tk.Label(root, text="Welcome to the Quiz App!", font=("Arial", 16))
-lbl_welcome.pack(pady=10)
-
-# Number of Questions Entry
-frame_entry = tk.Frame(root)
-frame_entry.pack(pady=10)
-lbl_num_questions = tk.Label(frame_entry, text="How many questions would you like? (1-50): ", font=("Arial", 12))
-lbl_num_questions.pack(side="left")
-entry_num_questions = tk.Entry(frame_entry)
-entry_num_questions.pack(side="left")
-
-# Start Button
-btn_start = tk.Button(root, text="Start Quiz", command=start_quiz)
-btn_start.pack(pady=20)
-
-root.mainloop()
\ No newline at end of file
+def main():
+    global root, entry_num_questions
+    # --trace [PATH] (or QUIZ_APP_TRACE=PATH) records timing spans and writes a Chrome trace at exit
+    enable_from_env()
+
+    # Main application window
+    root = tk.Tk()
+    root.title("Quiz App")
+    root.geometry("400x200")
+
+    # Welcome Label
+    lbl_welcome = tk.Label(root, text="Welcome to the Quiz App!", font=("Arial", 16))
+    lbl_welcome.pack(pady=10)
+
+    # Number of Questions Entry
+    frame_entry = tk.Frame(root)
+    frame_entry.pack(pady=10)
+    lbl_num_questions = tk.Label(frame_entry, text="How many questions would you like? (1-50): ", font=("Arial", 12))
+    lbl_num_questions.pack(side="left")
+    entry_num_questions = tk.Entry(frame_entry)
+    entry_num_questions.pack(side="left")
+
+    # Start Button
+    btn_start = tk.Button(root, text="Start Quiz", command=start_quiz)
+    btn_start.pack(pady=20)
+
+    root.mainloop()
+    if _reviews is not None:
+        _reviews.close()
+
+if __name__ == "__main__":
+    main()
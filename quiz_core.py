@@ -0,0 +1,464 @@
+import hashlib
+import html
+import os
+import random
+import sys
+import threading
+import time
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+from category_catalog import CategoryCatalog
+from question_cache import QuestionCache
+from quiz_trace import span, traced
+
+
+API_BASE_URL = os.environ.get("QUIZ_APP_API_URL", "https://opentdb.com")
+# OpenTDB allows one request per IP every 5 seconds; lower only for local stand-ins
+REQUEST_INTERVAL = float(os.environ.get("QUIZ_APP_API_INTERVAL", 5.0))
+REQUEST_TIMEOUT = (3.05, 10)  # (connect, read) seconds
+MAX_RETRIES = 4
+BACKOFF_BASE = 1.0  # Seconds; doubled on every retry
+PAGE_SIZE = 50  # Most questions OpenTDB returns per call
+MAX_OPTIONS = 4  # Answer buttons in both frontends; OpenTDB never has more
+
+RESPONSE_MESSAGES = {
+    1: "Not enough questions available for this category and difficulty",
+    2: "Invalid request parameters",
+    3: "Session token not found",
+    4: "Session token has returned all available questions",
+    5: "Too many requests, rate limit exceeded",
+}
+
+
+class Question:
+    __slots__ = ("prompt", "correct_answer", "incorrect_answers", "category", "difficulty", "question_type")
+
+    def __init__(self, prompt: str, correct_answer: str, incorrect_answers: List[str],
+                 category: str = "", difficulty: str = "", question_type: str = ""):
+        self.prompt = prompt
+        self.correct_answer = correct_answer
+        self.incorrect_answers = incorrect_answers
+        self.category = category
+        self.difficulty = difficulty
+        self.question_type = question_type  # "multiple" or "boolean"
+
+    @property
+    def answers(self) -> List[str]:
+        """The correct answer followed by the incorrect ones."""
+        return [self.correct_answer] + self.incorrect_answers
+
+    @property
+    def question_id(self) -> int:
+        return question_id(self.prompt, self.correct_answer)
+
+
+def question_id(prompt: str, correct_answer: str) -> int:
+    """Stable 64-bit id of a question, insensitive to case and whitespace differences."""
+    text = " ".join(f"{prompt}\0{correct_answer}".split()).casefold()
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def signed_id(question_id: int) -> int:
+    """A question_id as a signed 64-bit integer, the range SQLite can store."""
+    return question_id - (1 << 64) if question_id >= 1 << 63 else question_id
+
+
+def record_question_id(item: Dict) -> int:
+    """question_id of a raw (HTML-escaped) API record, without building a Question."""
+    return question_id(html.unescape(item["question"]), html.unescape(item["correct_answer"]))
+
+
+class Deduplicator:
+    """Drops questions already seen, by question_id fingerprint.
+
+    The fingerprint folds case, whitespace and HTML escaping, so the same
+    question arriving from the API, the cache, a bank or a dump file is
+    recognised. Only the 64-bit fingerprints are kept.
+    """
+
+    def __init__(self, seen: Iterable[int] = ()):
+        self.seen: Set[int] = set(seen)
+        self.kept = 0
+        self.dropped = 0
+
+    def add(self, fingerprint: int) -> bool:
+        """Remember a fingerprint; returns False if it was already seen."""
+        if fingerprint in self.seen:
+            self.dropped += 1
+            return False
+        self.seen.add(fingerprint)
+        self.kept += 1
+        return True
+
+    def questions(self, questions: Iterable[Question]) -> List[Question]:
+        return [question for question in questions if self.add(question.question_id)]
+
+    def records(self, items: Iterable[Dict]) -> Iterator[Dict]:
+        """Filter raw API records lazily, e.g. while compiling a bank."""
+        return (item for item in items if self.add(record_question_id(item)))
+
+
+class AnswerSheet:
+    """Per-session answers, kept apart from the (possibly shared) Question objects.
+
+    Each slot holds the index of the chosen answer in `Question.answers`, so 0
+    means correct. Questions can be recorded in any order and the sheet grows
+    as needed, which suits streamed quizzes.
+    """
+    __slots__ = ("_choices",)
+
+    UNANSWERED = -2
+    NO_ANSWER = -1  # Time ran out
+
+    def __init__(self):
+        self._choices = array("b")
+
+    def __len__(self) -> int:
+        return len(self._choices)
+
+    def record(self, index: int, question: Question, answer: Optional[str]):
+        """Record `answer` (None for a timeout) for the question at `index`."""
+        if index >= len(self._choices):
+            self._choices.extend([self.UNANSWERED] * (index + 1 - len(self._choices)))
+        self._choices[index] = self.NO_ANSWER if answer is None else question.answers.index(answer)
+
+    def answer(self, index: int, question: Question) -> Optional[str]:
+        """The answer given for the question at `index`, or None if there was none."""
+        choice = self._choices[index] if index < len(self._choices) else self.UNANSWERED
+        return question.answers[choice] if choice >= 0 else None
+
+    def is_correct(self, index: int) -> bool:
+        return index < len(self._choices) and self._choices[index] == 0
+
+    def incorrect(self) -> List[int]:
+        """Indices of questions answered wrongly or not in time."""
+        return [i for i, choice in enumerate(self._choices) if choice == self.NO_ANSWER or choice > 0]
+
+
+class QuestionFetchError(Exception):
+    """Raised when questions cannot be fetched from the API."""
+
+    def __init__(self, message: str, response_code: Optional[int] = None):
+        super().__init__(message)
+        self.response_code = response_code
+
+
+class TokenBucket:
+    """Thread-safe token bucket; callers block until a token is available.
+
+    Tokens may go negative: each caller reserves the next free slot, so
+    concurrent callers queue up in arrival order instead of failing.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate  # Tokens per second
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+
+
+class OpenTDBClient:
+    """Pooled, rate-limited HTTP client for the Open Trivia DB API.
+
+    A single keep-alive Session is shared by all callers. Every request goes
+    through the token bucket, and HTTP 429 / response_code 5 answers are
+    retried with exponential backoff.
+    """
+
+    def __init__(self, base_url: str = API_BASE_URL, interval: float = REQUEST_INTERVAL,
+                 timeout=REQUEST_TIMEOUT, max_retries: int = MAX_RETRIES, pool_size: int = 4):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.limiter = TokenBucket(rate=1.0 / interval if interval > 0 else float("inf"))
+        # requests is slow to import, so it is only loaded once a client is needed
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, endpoint: str, **params) -> Dict:
+        """GET an API endpoint and return its decoded JSON body.
+
+        Raises QuestionFetchError for network errors and non-zero response codes.
+        """
+        import requests
+        url = f"{self.base_url}/{endpoint}"
+        params = {key: value for key, value in params.items() if value}
+        attempt = 0
+        while True:
+            with span("rate_limit_wait", "network"):
+                self.limiter.acquire()
+            try:
+                with span("http_get", "network", endpoint=endpoint, attempt=attempt):
+                    response = self.session.get(url, params=params, timeout=self.timeout)
+                if response.status_code == 429:
+                    data = {"response_code": 5}
+                else:
+                    response.raise_for_status()
+                    with span("json_decode", "parse") as trace:
+                        data = response.json()
+                        if trace:  # Only when tracing, so the untraced path does no extra work
+                            trace.args["bytes"] = len(response.content)
+            except requests.RequestException as e:
+                raise QuestionFetchError(f"Error fetching questions: {e}") from e
+            except ValueError as e:
+                raise QuestionFetchError(f"Unexpected error: {e}") from e
+
+            code = data.get("response_code", 0)
+            if code == 5 and attempt < self.max_retries:
+                with span("retry_backoff", "network", response_code=code):
+                    time.sleep(BACKOFF_BASE * 2 ** attempt * random.uniform(1.0, 1.5))
+                attempt += 1
+                continue
+            if code != 0:
+                message = RESPONSE_MESSAGES.get(code, "Failed to fetch questions from the API")
+                raise QuestionFetchError(message, response_code=code)
+            return data
+
+    def questions(self, amount: int = 10, category: Optional[int] = None, difficulty: Optional[str] = None,
+                  question_type: Optional[str] = None, token: Optional[str] = None) -> List[Dict]:
+        """Fetch raw (still HTML-escaped) question records.
+
+        With a session `token`, OpenTDB never returns the same question twice.
+        """
+        data = self.get("api.php", amount=amount, category=category, difficulty=difficulty,
+                        type=question_type, token=token)
+        return data["results"]
+
+    def request_token(self) -> str:
+        """Request a new OpenTDB session token."""
+        return self.get("api_token.php", command="request")["token"]
+
+
+_client: Optional[OpenTDBClient] = None
+_init_lock = threading.Lock()
+_question_cache: Optional[QuestionCache] = None
+_question_bank = None  # MappedQuestionBank, when quizzes are served from a local bank file
+_category_catalog: Optional[CategoryCatalog] = None
+_question_sources = None  # QuestionFanOut, when quizzes are drawn from several sources at once
+
+
+def get_client() -> OpenTDBClient:
+    """Return the process-wide API client, so all callers share one session and rate limit."""
+    global _client
+    with _init_lock:
+        if _client is None:
+            _client = OpenTDBClient()
+        return _client
+
+
+def get_question_cache() -> QuestionCache:
+    """Return the process-wide question cache, opening it on first use."""
+    global _question_cache
+    with _init_lock:
+        if _question_cache is None:
+            _question_cache = QuestionCache.from_env()
+        return _question_cache
+
+
+def set_question_cache(cache: QuestionCache):
+    global _question_cache
+    _question_cache = cache
+
+
+def get_question_bank():
+    """Return the local question bank named by QUIZ_APP_BANK (or set_question_bank), if any."""
+    global _question_bank
+    with _init_lock:
+        if _question_bank is None and os.environ.get("QUIZ_APP_BANK"):
+            from question_bank_file import MappedQuestionBank
+            _question_bank = MappedQuestionBank(os.environ["QUIZ_APP_BANK"])
+        return _question_bank
+
+
+def set_question_bank(path: Optional[str]):
+    global _question_bank
+    from question_bank_file import MappedQuestionBank
+    _question_bank = MappedQuestionBank(path) if path else None
+
+
+def get_question_sources():
+    """Return the QuestionFanOut over the sources named by QUIZ_APP_SOURCES (or set_question_sources), if any."""
+    global _question_sources
+    with _init_lock:
+        if _question_sources is None and os.environ.get("QUIZ_APP_SOURCES"):
+            from question_sources import QuestionFanOut
+            _question_sources = QuestionFanOut.from_spec(os.environ["QUIZ_APP_SOURCES"])
+        return _question_sources
+
+
+def set_question_sources(spec: Optional[str]):
+    """Fan quizzes out to the comma-separated sources in `spec` (see question_sources.parse_sources)."""
+    global _question_sources
+    from question_sources import QuestionFanOut
+    _question_sources = QuestionFanOut.from_spec(spec) if spec else None
+
+
+def get_category_catalog() -> CategoryCatalog:
+    """Return the process-wide category catalog, loading the cached copy on first use."""
+    global _category_catalog
+    with _init_lock:
+        if _category_catalog is None:
+            _category_catalog = CategoryCatalog.from_env()
+        return _category_catalog
+
+
+def category_name(category: Optional[int]) -> Optional[str]:
+    return get_category_catalog().categories.get(category) if category else None
+
+
+def available_questions(category: Optional[int] = None, difficulty: Optional[str] = None,
+                        question_type: Optional[str] = None) -> Optional[int]:
+    """How many questions match, from the local bank or the cached API counts; None if unknown."""
+    if get_question_sources() is not None:
+        return None  # Several sources together; no single count applies
+    bank = get_question_bank()
+    if bank is not None:
+        return bank.index.count(category_name(category), difficulty, question_type)
+    if question_type:
+        return None  # OpenTDB only counts questions per category and difficulty
+    return get_category_catalog().available(category, difficulty)
+
+
+def fetch_raw_questions(amount: int = 10, category: Optional[int] = None, difficulty: Optional[str] = None,
+                        question_type: Optional[str] = None) -> List[Dict]:
+    """Fetch raw (still HTML-escaped) question records from the Open Trivia DB API."""
+    return get_client().questions(amount, category, difficulty, question_type)
+
+
+def parse_question(item: Dict) -> Question:
+    """Turn one raw API record into a Question, unescaping HTML entities."""
+    return Question(
+        html.unescape(item['question']),
+        html.unescape(item['correct_answer']),
+        [html.unescape(ans) for ans in item['incorrect_answers']],
+        # Metadata repeats across questions, so share one copy of each string
+        category=sys.intern(html.unescape(item.get('category', ''))),
+        difficulty=sys.intern(item.get('difficulty', '')),
+        question_type=sys.intern(item.get('type', '')),
+    )
+
+
+def check_options(item: Dict):
+    """Raise ValueError if a raw record has more answers than the frontends can show."""
+    incorrect = item.get("incorrect_answers")
+    if isinstance(incorrect, list) and len(incorrect) >= MAX_OPTIONS:
+        raise ValueError(f"question has {len(incorrect) + 1} answers, at most {MAX_OPTIONS} are supported")
+
+
+def parse_questions(items: Iterable[Dict]) -> List[Question]:
+    """Turn raw API records (any iterable) into Question objects, unescaping HTML entities."""
+    try:
+        with span("html_unescape", "parse") as trace:
+            questions = [parse_question(item) for item in items]
+            if trace:
+                trace.args["questions"] = len(questions)
+            return questions
+    except (KeyError, TypeError) as e:
+        raise QuestionFetchError(f"Unexpected error: {e}") from e
+
+
+@traced("fetch_questions", "fetch")
+def fetch_questions(amount: int = 10, category: Optional[int] = None, difficulty: Optional[str] = None,
+                    question_type: Optional[str] = None) -> List[Question]:
+    """Fetch questions, serving them from the local cache when possible.
+
+    Raises QuestionFetchError on failure and never touches any widgets, so it
+    is safe to call from worker threads.
+    """
+    sources = get_question_sources()
+    if sources is not None:
+        return sources.fetch(amount, category, difficulty, question_type)
+    bank = get_question_bank()
+    if bank is not None:
+        return bank.sample(amount, category_name(category), difficulty, question_type)
+    cache = get_question_cache()
+    items = cache.take(amount, category, difficulty, question_type)
+    if items is None:
+        if cache.offline:
+            raise QuestionFetchError("Offline mode: no cached questions match this category and difficulty")
+        items = fetch_raw_questions(amount, category, difficulty, question_type)
+        cache.put(items, category)
+    cache.refill_async(fetch_raw_questions, category, difficulty, question_type)
+    return Deduplicator().questions(parse_questions(items))
+
+
+def stream_questions(total: int, category: Optional[int] = None, difficulty: Optional[str] = None,
+                     question_type: Optional[str] = None, page_size: int = PAGE_SIZE) -> Iterator[List[Question]]:
+    """Yield pages of unique questions until `total` have been produced or the pool runs dry.
+
+    Pages are fetched lazily with an OpenTDB session token, so callers can start
+    on the first page while later ones are still being requested. Fetched
+    pages are also stored in the local cache. With question sources
+    configured, pages come from all of them at once (see question_sources);
+    with a local question bank, or in offline mode, a single page is produced
+    from the bank or the cache.
+    """
+    sources = get_question_sources()
+    if sources is not None:
+        yield from sources.stream(total, category, difficulty, question_type)
+        return
+    bank = get_question_bank()
+    if bank is not None:
+        yield bank.sample(total, category_name(category), difficulty, question_type)
+        return
+    cache = get_question_cache()
+    if cache.offline:
+        items = cache.take(total, category, difficulty, question_type)
+        if not items:
+            raise QuestionFetchError("Offline mode: no cached questions match this category and difficulty")
+        yield parse_questions(items)
+        return
+    yield from stream_api_questions(total, category, difficulty, question_type, page_size)
+
+
+def stream_api_questions(total: int, category: Optional[int] = None, difficulty: Optional[str] = None,
+                         question_type: Optional[str] = None, page_size: int = PAGE_SIZE) -> Iterator[List[Question]]:
+    """Yield pages of unique questions from OpenTDB, storing them in the cache as they arrive.
+
+    A session token is only requested when more than one page is needed. Pages
+    are counted after deduplication, so duplicates are made up by further pages.
+    """
+    client = get_client()
+    cache = get_question_cache()
+    token = client.request_token() if total > page_size else None
+    seen = Deduplicator()  # The token prevents repeats, but not near-duplicate entries in the database
+    remaining = total
+    requested = False
+    while remaining > 0:
+        if requested and token is None:
+            token = client.request_token()  # Duplicates must be replaced; without a token they could come back
+        amount = min(page_size, remaining)
+        try:
+            items = client.questions(amount, category, difficulty, question_type, token=token)
+        except QuestionFetchError as e:
+            if e.response_code == 1 and amount > 1:
+                # Fewer questions left than requested; ask for a smaller page
+                page_size = amount // 2
+                continue
+            if e.response_code in (1, 4) and requested:
+                return  # Every matching question has been served
+            raise
+        if not items:
+            return
+        requested = True
+        cache.put(items, category)
+        page = seen.questions(parse_questions(items))
+        remaining -= len(page)
+        if page:
+            yield page
@@ -0,0 +1,105 @@
+import json
+import os
+import random
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from quiz_core import Question
+
+PLAN_VERSION = 1
+DEFAULT_RESUME_PATH = os.path.join(os.path.expanduser("~"), ".quiz_app", "unfinished_quiz.json")
+
+
+class QuizPlan:
+    """The questions of a quiz and the display order of every question's options.
+
+    All orders are drawn in one pass from a single seeded RNG when questions
+    are added, so the same seed and questions always give the same quiz. A
+    plan serializes to JSON, which lets a quiz be replayed, shared with other
+    players, or resumed without fetching its questions again.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed if seed is not None else random.SystemRandom().getrandbits(63)
+        self.questions: List[Question] = []
+        self.orders: List[Tuple[int, ...]] = []  # Indexes into Question.answers, in display order
+        self.correct_indexes = array("B")  # Display position of the correct answer
+        self._rng = random.Random(self.seed)
+
+    @classmethod
+    def build(cls, questions: Sequence[Question], seed: Optional[int] = None) -> "QuizPlan":
+        plan = cls(seed)
+        plan.extend(questions)
+        return plan
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def extend(self, questions: Sequence[Question]):
+        """Add questions (e.g. a streamed page), drawing their option orders."""
+        for question in questions:
+            order = list(range(len(question.incorrect_answers) + 1))
+            self._rng.shuffle(order)
+            self.questions.append(question)
+            self.orders.append(tuple(order))
+            self.correct_indexes.append(order.index(0))  # answers[0] is the correct one
+
+    def options(self, index: int) -> List[str]:
+        answers = self.questions[index].answers
+        return [answers[i] for i in self.orders[index]]
+
+    def correct_index(self, index: int) -> int:
+        return self.correct_indexes[index]
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": PLAN_VERSION,
+            "seed": self.seed,
+            "questions": [{
+                "question": q.prompt,
+                "correct_answer": q.correct_answer,
+                "incorrect_answers": q.incorrect_answers,
+                "category": q.category,
+                "difficulty": q.difficulty,
+                "type": q.question_type,
+            } for q in self.questions],
+            "orders": self.orders,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "QuizPlan":
+        if data.get("version") != PLAN_VERSION:
+            raise ValueError(f"unsupported quiz plan version: {data.get('version')}")
+        plan = cls(data["seed"])
+        for item, order in zip(data["questions"], data["orders"]):
+            order = tuple(order)
+            if sorted(order) != list(range(len(item["incorrect_answers"]) + 1)):
+                raise ValueError("quiz plan option order does not match its question")
+            # Advance the RNG as extend() did, so questions added later still follow from the seed
+            plan._rng.shuffle(list(order))
+            plan.questions.append(Question(item["question"], item["correct_answer"], item["incorrect_answers"],
+                                           category=item.get("category", ""),
+                                           difficulty=item.get("difficulty", ""),
+                                           question_type=item.get("type", "")))
+            plan.orders.append(order)
+            plan.correct_indexes.append(order.index(0))
+        return plan
+
+    def save(self, path: str):
+        save_json(self.to_dict(), path)
+
+    @classmethod
+    def load(cls, path: str) -> "QuizPlan":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        # A saved session snapshot holds its plan alongside the answers given
+        return cls.from_dict(data.get("plan", data))
+
+
+def save_json(data: Dict, path: str):
+    """Write JSON atomically, so a crash never leaves a half-written file."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
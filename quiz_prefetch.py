@@ -0,0 +1,143 @@
+"""Background prefetching of the next quiz.
+
+While a quiz is played, QuizPrefetcher fetches question sets for the quiz it
+expects next (the same category, difficulty, type and size as the last one)
+into a small bounded queue, so the next quiz or a "play again" starts
+without waiting for the API. Sets are fetched one at a time with
+fetch_questions, so they go through the shared client's rate limit and
+the question cache like any other request.
+
+Sets older than `max_age` seconds are dropped instead of served, and sets
+for a request that is no longer predicted are discarded. Quizzes larger
+than PAGE_SIZE are not prefetched; they already start on their first page.
+
+QUIZ_APP_PREFETCH_DEPTH sets how many sets are kept ready (0 turns
+prefetching off).
+"""
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from quiz_core import PAGE_SIZE, Question, fetch_questions
+from quiz_trace import span
+
+PREFETCH_DEPTH = 2  # Question sets kept ready
+PREFETCH_MAX_AGE = 15 * 60  # Seconds a prefetched set may wait before it is dropped
+
+Request = Tuple[Optional[int], Optional[str], Optional[str]]  # (category, difficulty, question type)
+
+
+class QuizPrefetcher:
+    """A bounded queue of ready-to-play question sets for the predicted next request."""
+
+    def __init__(self, fetch: Callable[..., List[Question]] = fetch_questions, depth: int = PREFETCH_DEPTH,
+                 max_age: float = PREFETCH_MAX_AGE):
+        self.fetch = fetch
+        self.depth = depth
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._ready: deque = deque()  # (request, fetched at, questions), oldest first
+        self._predicted: Optional[Tuple[Request, int]] = None
+        self._generation = 0  # Bumped whenever the prediction changes; older fetches are discarded
+        self._filling = False
+        self._served_ages: deque = deque(maxlen=1000)  # Seconds each served set had waited
+        self.counters: Dict[str, int] = {"hits": 0, "misses": 0, "fetched": 0, "stale": 0, "discarded": 0,
+                                         "errors": 0}
+
+    @classmethod
+    def from_env(cls) -> "QuizPrefetcher":
+        return cls(depth=int(os.environ.get("QUIZ_APP_PREFETCH_DEPTH", PREFETCH_DEPTH)))
+
+    def _drop_stale(self, now: float):
+        while self._ready and now - self._ready[0][1] > self.max_age:
+            self._ready.popleft()
+            self.counters["stale"] += 1
+
+    def take(self, amount: int, category: Optional[int] = None, difficulty: Optional[str] = None,
+             question_type: Optional[str] = None) -> Optional[List[Question]]:
+        """A prefetched set of `amount` questions for this request, or None on a miss."""
+        if amount > PAGE_SIZE:
+            return None  # Never prefetched, so not counted as a miss
+        request = (category, difficulty, question_type)
+        now = time.monotonic()
+        with self._lock:
+            self._drop_stale(now)
+            for entry in self._ready:
+                ready_request, fetched_at, questions = entry
+                if ready_request == request and len(questions) >= amount:
+                    self._ready.remove(entry)
+                    self.counters["hits"] += 1
+                    self._served_ages.append(now - fetched_at)
+                    return questions[:amount]
+            self.counters["misses"] += 1
+            return None
+
+    def predict(self, amount: int, category: Optional[int] = None, difficulty: Optional[str] = None,
+                question_type: Optional[str] = None):
+        """Expect the next quiz to repeat this request and fill the queue for it in the background.
+
+        Call it once the current quiz's own questions have arrived, so prefetching
+        never queues in front of them at the rate limiter.
+        """
+        if self.depth <= 0 or amount > PAGE_SIZE:
+            return
+        request = (category, difficulty, question_type)
+        with self._lock:
+            if self._predicted != (request, amount):
+                self._predicted = (request, amount)
+                self._generation += 1
+                kept = [entry for entry in self._ready if entry[0] == request and len(entry[2]) >= amount]
+                self.counters["discarded"] += len(self._ready) - len(kept)
+                self._ready = deque(kept)
+            if self._filling:
+                return
+            self._filling = True
+        threading.Thread(target=self._fill, name="quiz-prefetch", daemon=True).start()
+
+    def _fill(self):
+        while True:
+            with self._lock:
+                self._drop_stale(time.monotonic())
+                if len(self._ready) >= self.depth or self._predicted is None:
+                    self._filling = False
+                    return
+                (request, amount), generation = self._predicted, self._generation
+            try:
+                with span("prefetch", "fetch", amount=amount):
+                    questions = self.fetch(amount, *request)
+            except Exception:  # The next quiz fetches on demand, as without prefetching
+                with self._lock:
+                    self.counters["errors"] += 1
+                    self._filling = False
+                return
+            with self._lock:
+                if generation != self._generation:
+                    self.counters["discarded"] += 1
+                    continue  # Fetched for an old prediction; fill for the new one
+                if len(questions) < amount:
+                    # The pool cannot fill a whole quiz; do not keep asking
+                    self.counters["discarded"] += 1
+                    self._filling = False
+                    return
+                self._ready.append((request, time.monotonic(), questions))
+                self.counters["fetched"] += 1
+
+    def ready(self) -> int:
+        """Sets currently waiting in the queue."""
+        with self._lock:
+            return len(self._ready)
+
+    def stats(self) -> Dict[str, float]:
+        """Counters plus the hit rate and the median/max age, in seconds, of the sets served."""
+        with self._lock:
+            result: Dict[str, float] = dict(self.counters)
+            ages = list(self._served_ages)
+            result["ready"] = len(self._ready)
+        requests = result["hits"] + result["misses"]
+        result["hit_rate"] = result["hits"] / requests if requests else 0.0
+        result["median_age_s"] = statistics.median(ages) if ages else 0.0
+        result["max_age_s"] = max(ages, default=0.0)
+        return result
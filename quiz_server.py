@@ -0,0 +1,462 @@
+"""Multi-user quiz server: one shared question pool, many concurrent players.
+
+HTTP API (JSON bodies):
+    POST /quiz                   {"amount", "category", "difficulty", "question_type"} -> first question
+    GET  /quiz/<id>              current question (with remaining time) or final result
+    POST /quiz/<id>/answer       {"option": n} -> verdict plus next question or final result
+    GET  /quiz/<id>/review       incorrectly answered questions
+    GET  /stats                  pool and session counters
+    GET  /ws                     WebSocket; send {"action": "start"|"answer"|"state"|"review", ...}
+                                 and receive the same payloads, plus pushed "timeout" events
+
+The per-question time limit is enforced here, against the server clock.
+
+Usage: python quiz_server.py [--host HOST] [--port PORT] [--time-limit SECONDS]
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import struct
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from quiz_core import PAGE_SIZE, Deduplicator, Question, QuestionFetchError, fetch_questions
+from quiz_session import QuizSession, SessionState, SessionStateError
+
+DEFAULT_PORT = 8080
+TIME_LIMIT = 30  # Seconds per question, as in the desktop app
+ANSWER_GRACE = 0.5  # Seconds allowed for an answer to travel to the server
+POOL_TARGET = 200  # Questions kept ready per category/difficulty/type
+MAX_AMOUNT = 50
+SESSION_TTL = 60 * 60  # Idle sessions are dropped after an hour
+MAX_BODY = 64 * 1024
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+PoolKey = Tuple[Optional[int], Optional[str], Optional[str]]
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class QuestionPool:
+    """Deduplicated questions shared by all sessions, fed by fetch_questions.
+
+    Each (category, difficulty, type) pool is filled on demand and topped up
+    to `target` questions in the background. Fetches for one pool are
+    single-flight, so a burst of new sessions causes one upstream request.
+    """
+
+    def __init__(self, fetch: Callable[..., List[Question]] = fetch_questions, target: int = POOL_TARGET):
+        self.fetch = fetch
+        self.target = target
+        self.fetches = 0
+        self._pools: Dict[PoolKey, List[Question]] = {}
+        self._seen: Dict[PoolKey, Deduplicator] = {}
+        self._locks: Dict[PoolKey, asyncio.Lock] = {}
+        self._refills: Dict[PoolKey, asyncio.Task] = {}
+
+    async def _fetch(self, key: PoolKey, amount: int) -> int:
+        """Fetch up to `amount` questions into a pool; returns how many were new."""
+        loop = asyncio.get_running_loop()
+        questions = await loop.run_in_executor(None, self.fetch, min(amount, PAGE_SIZE), *key)
+        self.fetches += 1
+        added = self._seen[key].questions(questions)
+        self._pools[key].extend(added)
+        return len(added)
+
+    async def get(self, amount: int, category: Optional[int] = None, difficulty: Optional[str] = None,
+                  question_type: Optional[str] = None) -> List[Question]:
+        """Return `amount` distinct random questions from the pool, fetching if it is short."""
+        key = (category, difficulty, question_type)
+        pool = self._pools.setdefault(key, [])
+        self._seen.setdefault(key, Deduplicator())
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            while len(pool) < amount:
+                if not await self._fetch(key, amount - len(pool)):
+                    raise QuestionFetchError("Not enough unique questions available for this quiz")
+        self._schedule_refill(key)
+        return random.sample(pool, amount)
+
+    def _schedule_refill(self, key: PoolKey):
+        task = self._refills.get(key)
+        if len(self._pools[key]) < self.target and (task is None or task.done()):
+            self._refills[key] = asyncio.create_task(self._refill(key))
+
+    async def _refill(self, key: PoolKey):
+        pool = self._pools[key]
+        try:
+            while len(pool) < self.target:
+                async with self._locks[key]:
+                    if not await self._fetch(key, self.target - len(pool)):
+                        return  # The source has nothing new; stop rather than spin
+        except QuestionFetchError:
+            pass  # The next session that needs more will fetch on demand
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pools": len(self._pools),
+            "pooled_questions": sum(len(pool) for pool in self._pools.values()),
+            "upstream_fetches": self.fetches,
+            "duplicates_dropped": sum(seen.dropped for seen in self._seen.values()),
+        }
+
+
+class ServerSession:
+    __slots__ = ("session", "deadline", "touched")
+
+    def __init__(self, session: QuizSession):
+        self.session = session
+        self.deadline = 0.0
+        self.touched = time.monotonic()
+
+
+class QuizServer:
+    def __init__(self, pool: Optional[QuestionPool] = None, time_limit: float = TIME_LIMIT,
+                 session_ttl: float = SESSION_TTL):
+        self.pool = pool or QuestionPool()
+        self.time_limit = time_limit
+        self.session_ttl = session_ttl
+        self.sessions: Dict[str, ServerSession] = {}
+        self.answers = 0
+        self.timeouts = 0
+
+    # Quiz operations shared by the HTTP and WebSocket front ends
+
+    async def create_quiz(self, params: Dict) -> Dict:
+        try:
+            amount = int(params.get("amount", 10))
+            category = int(params["category"]) if params.get("category") else None
+        except (TypeError, ValueError):
+            raise HTTPError(400, "amount and category must be integers")
+        if not 1 <= amount <= MAX_AMOUNT:
+            raise HTTPError(400, f"amount must be between 1 and {MAX_AMOUNT}")
+        try:
+            questions = await self.pool.get(amount, category, params.get("difficulty") or None,
+                                            params.get("question_type") or None)
+        except QuestionFetchError as e:
+            raise HTTPError(503, str(e))
+        session_id = uuid.uuid4().hex
+        entry = self.sessions[session_id] = ServerSession(QuizSession(questions, time_limit=self.time_limit))
+        entry.session.start()
+        return {"session_id": session_id, "total": amount, **self._next(entry)}
+
+    def _entry(self, session_id: str) -> ServerSession:
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            raise HTTPError(404, "unknown quiz session")
+        entry.touched = time.monotonic()
+        return entry
+
+    def _question_payload(self, entry: ServerSession) -> Dict:
+        session = entry.session
+        question = session.current_question
+        return {
+            "index": session.question_index,
+            "prompt": question.prompt,
+            "options": session.current_options,
+            "category": question.category,
+            "difficulty": question.difficulty,
+            "remaining": max(0.0, entry.deadline - time.monotonic()),
+        }
+
+    def _next(self, entry: ServerSession, deadline_base: Optional[float] = None) -> Dict:
+        """Present the next question (starting its clock) or finish the quiz."""
+        session = entry.session
+        if session.has_question():
+            session.present()
+            entry.deadline = (deadline_base or time.monotonic()) + self.time_limit
+            return {"question": self._question_payload(entry)}
+        session.finish()
+        return {"result": {"score": session.score, "answered": session.answered,
+                           "percentage": session.percentage}}
+
+    def _expire(self, entry: ServerSession) -> List[Dict]:
+        """Time out every question whose deadline has passed, as the desktop timer would."""
+        expired = []
+        now = time.monotonic()
+        while entry.session.state is SessionState.PRESENTING and now > entry.deadline + ANSWER_GRACE:
+            deadline = entry.deadline
+            result = entry.session.timeout()
+            self.timeouts += 1
+            expired.append({"index": entry.session.question_index - 1, "correct_answer": result.correct_answer})
+            entry_next = self._next(entry, deadline_base=deadline)
+            if "result" in entry_next:
+                break
+        return expired
+
+    def state(self, session_id: str) -> Dict:
+        entry = self._entry(session_id)
+        expired = self._expire(entry)
+        session = entry.session
+        if session.state is SessionState.PRESENTING:
+            payload = {"question": self._question_payload(entry)}
+        else:
+            payload = {"result": {"score": session.score, "answered": session.answered,
+                                  "percentage": session.percentage}}
+        return {"timed_out": expired, **payload}
+
+    def answer(self, session_id: str, option) -> Dict:
+        entry = self._entry(session_id)
+        expired = self._expire(entry)
+        if expired:
+            # The clock ran out before this answer arrived
+            return {"correct": False, "timed_out": expired, **self.state(session_id)}
+        session = entry.session
+        if session.state is not SessionState.PRESENTING:
+            raise HTTPError(409, "the quiz is already finished")
+        if not isinstance(option, int) or not 0 <= option < len(session.current_options):
+            raise HTTPError(400, "option must be the index of one of the answers")
+        started = entry.deadline - self.time_limit
+        result = session.answer(option, min(time.monotonic() - started, self.time_limit))
+        self.answers += 1
+        return {"correct": result.correct, "correct_answer": result.correct_answer,
+                "response_time": result.response_time, "timed_out": [],
+                **self._next(entry)}
+
+    def review(self, session_id: str) -> Dict:
+        entry = self._entry(session_id)
+        self._expire(entry)
+        try:
+            items = entry.session.review()
+        except SessionStateError:
+            raise HTTPError(409, "the quiz is not finished yet")
+        return {"incorrect": [{"prompt": item.question.prompt, "your_answer": item.user_answer,
+                               "correct_answer": item.question.correct_answer} for item in items]}
+
+    def stats(self) -> Dict:
+        return {"sessions": len(self.sessions), "answers": self.answers, "timeouts": self.timeouts,
+                **self.pool.stats()}
+
+    async def sweep_sessions(self, interval: float = 60.0):
+        """Drop sessions nobody has touched for `session_ttl` seconds."""
+        while True:
+            await asyncio.sleep(interval)
+            cutoff = time.monotonic() - self.session_ttl
+            for session_id in [sid for sid, entry in self.sessions.items() if entry.touched < cutoff]:
+                del self.sessions[session_id]
+
+    # HTTP
+
+    async def route(self, method: str, path: str, body: bytes) -> Dict:
+        try:
+            params = json.loads(body) if body else {}
+        except ValueError:
+            raise HTTPError(400, "request body must be JSON")
+        if not isinstance(params, dict):
+            raise HTTPError(400, "request body must be a JSON object")
+        parts = [part for part in path.split("?", 1)[0].split("/") if part]
+        if parts == ["quiz"] and method == "POST":
+            return await self.create_quiz(params)
+        if len(parts) == 2 and parts[0] == "quiz" and method == "GET":
+            return self.state(parts[1])
+        if len(parts) == 3 and parts[0] == "quiz" and parts[2] == "answer" and method == "POST":
+            return self.answer(parts[1], params.get("option"))
+        if len(parts) == 3 and parts[0] == "quiz" and parts[2] == "review" and method == "GET":
+            return self.review(parts[1])
+        if parts == ["stats"] and method == "GET":
+            return self.stats()
+        raise HTTPError(404, "not found")
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+                try:
+                    method, path, version = request_line.split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if path == "/ws" and headers.get("upgrade", "").lower() == "websocket":
+                    await self.handle_websocket(reader, writer, headers)
+                    break
+                try:
+                    length = int(headers.get("content-length", 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self.send_response(writer, 400, {"error": "invalid Content-Length"}, keep_alive=False)
+                    break
+                if length > MAX_BODY:
+                    await self.send_response(writer, 413, {"error": "request body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, data = 200, await self.route(method, path, body)
+                except HTTPError as e:
+                    status, data = e.status, {"error": str(e)}
+                except Exception:  # A bug in one request must not end the connection
+                    status, data = 500, {"error": "internal server error"}
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self.send_response(writer, status, data, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def send_response(self, writer: asyncio.StreamWriter, status: int, data: Dict, keep_alive: bool):
+        body = json.dumps(data).encode("utf-8")
+        reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 409: "Conflict",
+                  413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}.get(status, "Error")
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+            .encode("latin-1") + body
+        )
+        await writer.drain()
+
+    # WebSocket (RFC 6455, unfragmented text frames)
+
+    async def handle_websocket(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, headers: Dict):
+        key = headers.get("sec-websocket-key")
+        if not key:
+            await self.send_response(writer, 400, {"error": "missing Sec-WebSocket-Key"}, keep_alive=False)
+            return
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode("ascii")).digest()).decode("ascii")
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                      f"Sec-WebSocket-Accept: {accept}\r\n\r\n").encode("latin-1"))
+        await writer.drain()
+
+        send_lock = asyncio.Lock()
+        session_id: Optional[str] = None
+        deadline_task: Optional[asyncio.Task] = None
+
+        async def send(message: Dict):
+            async with send_lock:
+                writer.write(encode_ws_frame(json.dumps(message).encode("utf-8")))
+                await writer.drain()
+
+        async def push_timeouts(sid: str):
+            # Tell the client as soon as a question expires instead of waiting for its next message
+            while True:
+                entry = self.sessions.get(sid)
+                if entry is None or entry.session.state is not SessionState.PRESENTING:
+                    return
+                await asyncio.sleep(max(0.0, entry.deadline + ANSWER_GRACE - time.monotonic()) + 0.01)
+                state = self.state(sid)
+                if state["timed_out"]:
+                    await send({"event": "timeout", **state})
+
+        def watch(sid: str):
+            nonlocal deadline_task
+            if deadline_task is not None:
+                deadline_task.cancel()
+            deadline_task = asyncio.create_task(push_timeouts(sid))
+
+        try:
+            while True:
+                opcode, payload = await read_ws_frame(reader)
+                if opcode == 0x8:  # Close
+                    async with send_lock:
+                        writer.write(encode_ws_frame(payload[:2], opcode=0x8))
+                        await writer.drain()
+                    return
+                if opcode == 0x9:  # Ping
+                    async with send_lock:
+                        writer.write(encode_ws_frame(payload, opcode=0xA))
+                        await writer.drain()
+                    continue
+                if opcode != 0x1:
+                    continue
+                try:
+                    message = json.loads(payload)
+                    if not isinstance(message, dict):
+                        raise HTTPError(400, "messages must be JSON objects")
+                    action = message.get("action")
+                    if action == "start":
+                        reply = await self.create_quiz(message)
+                        session_id = reply["session_id"]
+                    elif session_id is None:
+                        raise HTTPError(409, "start a quiz first")
+                    elif action == "answer":
+                        reply = self.answer(session_id, message.get("option"))
+                    elif action == "state":
+                        reply = self.state(session_id)
+                    elif action == "review":
+                        reply = self.review(session_id)
+                    else:
+                        raise HTTPError(400, "unknown action")
+                    await send({"event": action, **reply})
+                    if action in ("start", "answer"):
+                        watch(session_id)
+                except HTTPError as e:
+                    await send({"event": "error", "status": e.status, "error": str(e)})
+                except ValueError:
+                    await send({"event": "error", "status": 400, "error": "messages must be JSON objects"})
+        finally:
+            if deadline_task is not None:
+                deadline_task.cancel()
+
+
+async def read_ws_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    first, second = await reader.readexactly(2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    if length > MAX_BODY:
+        raise ConnectionError("WebSocket frame too large")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask:
+        payload = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+    return opcode, payload
+
+
+def encode_ws_frame(payload: bytes, opcode: int = 0x1) -> bytes:
+    """Encode a single unmasked server frame."""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+
+async def serve(host: str = "127.0.0.1", port: int = DEFAULT_PORT, server: Optional[QuizServer] = None):
+    """Run the quiz server until cancelled."""
+    server = server or QuizServer()
+    listener = await asyncio.start_server(server.handle_connection, host, port)
+    sweeper = asyncio.create_task(server.sweep_sessions())
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        sweeper.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-user quiz server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--time-limit", type=float, default=TIME_LIMIT, help="seconds per question")
+    args = parser.parse_args()
+    print(f"Quiz server listening on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(serve(args.host, args.port, QuizServer(time_limit=args.time_limit)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+import math
+import random
+import time
+from array import array
+from enum import Enum
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from quiz_core import AnswerSheet, Question
+from quiz_plan import QuizPlan
+
+
+class SessionState(Enum):
+    IDLE = "idle"  # Created, not started
+    READY = "ready"  # Between questions
+    PRESENTING = "presenting"  # A question is shown and awaits an answer
+    FINISHED = "finished"
+    REVIEW = "review"
+
+
+class SessionStateError(Exception):
+    """Raised when a QuizSession method is called in the wrong state."""
+
+
+class AnswerResult(NamedTuple):
+    correct: bool
+    correct_answer: str
+    timed_out: bool = False
+    response_time: float = math.nan  # Seconds taken to answer, if the driver timed it
+
+
+class ReviewItem(NamedTuple):
+    question: Question
+    user_answer: Optional[str]  # None if time ran out
+
+
+class QuizSession:
+    """Display-independent quiz state machine.
+
+    IDLE -start-> READY -present-> PRESENTING -answer/timeout-> READY ...
+    READY -finish-> FINISHED -review-> REVIEW
+
+    The frontends own widgets and timers and drive a session through these
+    calls; everything else about a quiz (score, order, answers) lives here.
+    Questions may be added while the quiz runs, for streamed quizzes. Option
+    order comes from a QuizPlan, drawn from `rng` unless a plan is given.
+    """
+
+    def __init__(self, questions: Sequence[Question] = (), time_limit: int = 30,
+                 rng: Optional[random.Random] = None, plan: Optional[QuizPlan] = None):
+        self.time_limit = time_limit  # Seconds per question, enforced by the driver
+        self.rng = rng or random.Random()
+        self.plan = plan or QuizPlan.build(questions, seed=self.rng.getrandbits(63) if rng else None)
+        self.questions: List[Question] = self.plan.questions
+        self.state = SessionState.IDLE
+        self.score = 0
+        self.question_index = 0
+        self.current_options: List[str] = []
+        self.current_correct_index = -1
+        self.incorrect_questions: List[Question] = []
+        self.answer_sheet = AnswerSheet()
+        self.response_times = array("d")  # Seconds per answered question; NaN where untimed
+
+    def _expect(self, *states: SessionState):
+        if self.state not in states:
+            raise SessionStateError(f"cannot do this while the session is {self.state.value}")
+
+    def add_questions(self, questions: Sequence[Question]):
+        self.plan.extend(questions)
+
+    def has_question(self) -> bool:
+        """Whether another question is available to present."""
+        return self.question_index < len(self.questions)
+
+    @property
+    def current_question(self) -> Question:
+        return self.questions[self.question_index]
+
+    def start(self):
+        self._expect(SessionState.IDLE)
+        self.state = SessionState.READY
+
+    def present(self) -> List[str]:
+        """Show the next question; returns its answer options in display order."""
+        self._expect(SessionState.READY)
+        if not self.has_question():
+            raise SessionStateError("no question left to present")
+        options = self.plan.options(self.question_index)
+        self.current_options = options
+        self.current_correct_index = self.plan.correct_index(self.question_index)
+        self.state = SessionState.PRESENTING
+        return options
+
+    def answer(self, option_index: int, response_time: float = math.nan) -> AnswerResult:
+        """Answer the presented question with one of its options, `response_time` seconds after it appeared."""
+        self._expect(SessionState.PRESENTING)
+        question = self.current_question
+        correct = option_index == self.current_correct_index
+        self.answer_sheet.record(self.question_index, question, self.current_options[option_index])
+        if correct:
+            self.score += 1
+        else:
+            self.incorrect_questions.append(question)
+        return self._advance(AnswerResult(correct, question.correct_answer, response_time=response_time))
+
+    def timeout(self, response_time: Optional[float] = None) -> AnswerResult:
+        """Record that time ran out on the presented question (after the full time limit by default)."""
+        self._expect(SessionState.PRESENTING)
+        question = self.current_question
+        self.answer_sheet.record(self.question_index, question, None)
+        self.incorrect_questions.append(question)
+        if response_time is None:
+            response_time = float(self.time_limit)
+        return self._advance(AnswerResult(False, question.correct_answer, timed_out=True,
+                                          response_time=response_time))
+
+    def _advance(self, result: AnswerResult) -> AnswerResult:
+        self.response_times.append(result.response_time)
+        self.question_index += 1
+        self.state = SessionState.READY
+        return result
+
+    def finish(self):
+        self._expect(SessionState.READY)
+        self.state = SessionState.FINISHED
+
+    @property
+    def answered(self) -> int:
+        return self.question_index
+
+    @property
+    def percentage(self) -> float:
+        return self.score / self.answered * 100 if self.answered else 0.0
+
+    def review(self) -> List[ReviewItem]:
+        """Questions answered wrongly or not in time, with the answers given."""
+        self._expect(SessionState.FINISHED, SessionState.REVIEW)
+        self.state = SessionState.REVIEW
+        return [ReviewItem(self.questions[index], self.answer_sheet.answer(index, self.questions[index]))
+                for index in self.answer_sheet.incorrect()]
+
+    def snapshot(self) -> Dict:
+        """The plan and the answers given so far, as JSON-ready data for resuming later."""
+        responses = []
+        for index in range(self.question_index):
+            answer = self.answer_sheet.answer(index, self.questions[index])
+            responses.append(-1 if answer is None else self.plan.options(index).index(answer))
+        return {"plan": self.plan.to_dict(), "time_limit": self.time_limit, "responses": responses,
+                # JSON has no NaN; untimed answers are stored as null
+                "response_times": [None if math.isnan(t) else t for t in self.response_times]}
+
+    @classmethod
+    def from_snapshot(cls, data: Dict) -> "QuizSession":
+        """Rebuild a session from snapshot(), replaying its answers; it resumes READY."""
+        session = cls(time_limit=data.get("time_limit", 30), plan=QuizPlan.from_dict(data["plan"]))
+        session.start()
+        responses = data.get("responses", [])
+        times = data.get("response_times") or [None] * len(responses)
+        for response, response_time in zip(responses, times):
+            response_time = math.nan if response_time is None else response_time
+            session.present()
+            if response < 0:
+                session.timeout(response_time)
+            else:
+                session.answer(response, response_time)
+        return session
+
+
+AnswerPolicy = Callable[[QuizSession, List[str]], Optional[int]]
+
+
+def random_policy(session: QuizSession, options: List[str]) -> Optional[int]:
+    """Simulated player: answers at random, and lets one question in ten time out."""
+    if session.rng.random() < 0.1:
+        return None
+    return session.rng.randrange(len(options))
+
+
+def run_batch(questions: Sequence[Question], sessions: int, policy: AnswerPolicy = random_policy,
+              time_limit: int = 30, seed: int = 0) -> Dict[str, float]:
+    """Play `sessions` complete quizzes headlessly; returns throughput and score figures."""
+    rng = random.Random(seed)
+    answers = 0
+    total_score = 0
+    start = time.perf_counter()
+    for _ in range(sessions):
+        session = QuizSession(questions, time_limit=time_limit, rng=rng)
+        session.start()
+        while session.has_question():
+            choice = policy(session, session.present())
+            if choice is None:
+                session.timeout()
+            else:
+                session.answer(choice)
+        session.finish()
+        session.review()
+        answers += session.answered
+        total_score += session.score
+    elapsed = time.perf_counter() - start
+    return {
+        "sessions": sessions,
+        "questions_per_session": len(questions),
+        "elapsed_s": elapsed,
+        "sessions_per_s": sessions / elapsed if elapsed else float("inf"),
+        "answers_per_s": answers / elapsed if elapsed else float("inf"),
+        "mean_score": total_score / sessions if sessions else 0.0,
+    }
@@ -0,0 +1,81 @@
+import math
+import time
+from typing import Callable, Optional
+
+
+class QuestionTimer:
+    """Times one question at a time against a monotonic clock.
+
+    Elapsed and remaining time are always computed from the clock, never
+    counted in ticks, so they do not drift however late the GUI gets around
+    to checking them. Paused time counts towards neither, and the elapsed
+    time when a question is answered is its precise response time. Use
+    `math.inf` as the limit to time questions without a deadline.
+    """
+
+    def __init__(self, time_limit: float, clock: Callable[[], float] = time.monotonic):
+        self.time_limit = time_limit
+        self.clock = clock
+        self._started: Optional[float] = None
+        self._paused_at: Optional[float] = None
+        self._paused_total = 0.0
+        self._stopped_elapsed: Optional[float] = None
+
+    def start(self, remaining: Optional[float] = None):
+        """Start timing a question, with the full limit or `remaining` seconds of it left."""
+        used = 0.0 if remaining is None else max(0.0, self.time_limit - remaining)
+        self._started = self.clock() - used
+        self._paused_at = None
+        self._paused_total = 0.0
+        self._stopped_elapsed = None
+
+    @property
+    def running(self) -> bool:
+        return self._started is not None and self._paused_at is None and self._stopped_elapsed is None
+
+    @property
+    def paused(self) -> bool:
+        return self._paused_at is not None
+
+    def _elapsed(self) -> float:
+        if self._stopped_elapsed is not None:
+            return self._stopped_elapsed
+        if self._started is None:
+            return 0.0
+        now = self._paused_at if self._paused_at is not None else self.clock()
+        return now - self._started - self._paused_total
+
+    def elapsed(self) -> float:
+        """Seconds spent on the question so far, excluding pauses, capped at the limit."""
+        return min(self._elapsed(), self.time_limit)
+
+    def remaining(self) -> float:
+        return max(0.0, self.time_limit - self._elapsed())
+
+    def remaining_seconds(self) -> int:
+        """Whole seconds left, rounded up, as a countdown shows them."""
+        return math.ceil(self.remaining())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def until_next_second(self) -> float:
+        """Seconds until remaining_seconds() next changes (or the deadline passes)."""
+        remaining = self.remaining()
+        fraction = remaining - math.floor(remaining)
+        return fraction if fraction else min(remaining, 1.0)
+
+    def pause(self):
+        if self.running:
+            self._paused_at = self.clock()
+
+    def resume(self):
+        if self._paused_at is not None:
+            self._paused_total += self.clock() - self._paused_at
+            self._paused_at = None
+
+    def stop(self) -> float:
+        """Stop timing the question; returns its response time."""
+        if self._stopped_elapsed is None:
+            self._stopped_elapsed = self.elapsed()
+        return self._stopped_elapsed
@@ -0,0 +1,170 @@
+"""Opt-in tracing of the fetch, parse and render paths.
+
+Off by default. Switch it on with QUIZ_APP_TRACE=PATH (or `--trace PATH` in
+either frontend) and timed spans are kept in a ring buffer of the most
+recent TRACE_CAPACITY events, then written to PATH as Chrome trace JSON when
+the app exits. Open the file in chrome://tracing or https://ui.perfetto.dev,
+or summarize it with:
+
+    python quiz_trace.py trace.json
+
+When tracing is off, span() returns a shared do-nothing context manager and
+traced() functions make one extra global check, so the hooks can stay in the
+hot paths.
+"""
+import atexit
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from functools import wraps
+from typing import Dict, List, Optional
+
+TRACE_CAPACITY = 100_000
+DEFAULT_TRACE_PATH = os.path.join(os.path.expanduser("~"), ".quiz_app", "trace.json")
+
+_enabled = False
+_events: deque = deque(maxlen=TRACE_CAPACITY)  # (name, category, start ns, duration ns, thread id, args)
+_path: Optional[str] = None
+_origin = time.perf_counter_ns()
+_NULL_SPAN = nullcontext()
+
+
+class _Span:
+    __slots__ = ("name", "category", "args", "start")
+
+    def __init__(self, name: str, category: str, args: Dict):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        _events.append((self.name, self.category, self.start, end - self.start, threading.get_ident(), self.args))
+        return False
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def span(name: str, category: str = "app", **args):
+    """Context manager timing a block as one trace event; `args` are shown with it.
+
+    It yields the span, or None when tracing is off, so arguments that cost
+    something to compute can be added to `.args` only when they are recorded.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, category, args)
+
+
+def traced(name: Optional[str] = None, category: str = "app"):
+    """Decorator form of span(), named after the function unless `name` is given."""
+    def decorate(function):
+        label = name or function.__qualname__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return function(*args, **kwargs)
+            with _Span(label, category, {}):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def enable(path: Optional[str] = None, capacity: int = TRACE_CAPACITY):
+    """Start recording; the trace is written to `path` at exit (if given)."""
+    global _enabled, _events, _path
+    if capacity != _events.maxlen:
+        _events = deque(_events, maxlen=capacity)
+    if path and _path is None:
+        atexit.register(lambda: export(_path))
+    _path = path or _path
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def enable_from_env(argv: Optional[List[str]] = None):
+    """Enable tracing if QUIZ_APP_TRACE is set or `--trace [PATH]` is among the arguments."""
+    argv = sys.argv if argv is None else argv
+    if "--trace" in argv:
+        position = argv.index("--trace") + 1
+        has_path = position < len(argv) and not argv[position].startswith("-")
+        enable(argv[position] if has_path else DEFAULT_TRACE_PATH)
+    elif os.environ.get("QUIZ_APP_TRACE"):
+        value = os.environ["QUIZ_APP_TRACE"]
+        enable(DEFAULT_TRACE_PATH if value == "1" else value)
+
+
+def events() -> List[tuple]:
+    return list(_events)
+
+
+def clear():
+    _events.clear()
+
+
+def chrome_trace() -> Dict:
+    """The recorded spans as a Chrome trace event document."""
+    pid = os.getpid()
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    trace_events = []
+    threads = set()
+    for name, category, start, duration, tid, args in list(_events):
+        threads.add(tid)
+        trace_events.append({"name": name, "cat": category, "ph": "X", "pid": pid, "tid": tid,
+                             "ts": (start - _origin) / 1000, "dur": duration / 1000, "args": args})
+    for tid in threads:
+        trace_events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                             "args": {"name": names.get(tid, f"thread {tid}")}})
+    return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+
+def export(path: str):
+    """Write the ring buffer as Chrome trace JSON."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(), f)
+
+
+def summarize(trace: Dict) -> List[Dict]:
+    """Count, median, p95 and total milliseconds per span name, slowest total first."""
+    durations: Dict[str, List[float]] = {}
+    for event in trace["traceEvents"]:
+        if event.get("ph") == "X":
+            durations.setdefault(event["name"], []).append(event["dur"] / 1000)
+    rows = []
+    for name, values in durations.items():
+        values.sort()
+        rows.append({"name": name, "count": len(values), "median_ms": statistics.median(values),
+                     "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))], "total_ms": sum(values)})
+    return sorted(rows, key=lambda row: -row["total_ms"])
+
+
+def main(argv: List[str]):
+    path = argv[0] if argv else DEFAULT_TRACE_PATH
+    with open(path, encoding="utf-8") as f:
+        rows = summarize(json.load(f))
+    print(f"{'span':40} {'count':>7} {'median ms':>10} {'p95 ms':>10} {'total ms':>10}")
+    for row in rows:
+        print(f"{row['name']:40} {row['count']:7} {row['median_ms']:10.2f} {row['p95_ms']:10.2f} {row['total_ms']:10.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
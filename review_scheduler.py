@@ -0,0 +1,172 @@
+"""Spaced-repetition deck of missed questions (SM-2), kept across sessions.
+
+Every question answered wrongly or not in time becomes a card. Each time a
+card comes up again it is graded from the answer and rescheduled with the
+SM-2 rules: a miss brings it back the next day, and each correct answer
+pushes it further out by the card's easiness factor.
+
+Cards live in SQLite with an index on their due time, which is the priority
+queue: the next due batch is an index range scan, O(log n + k) for k cards,
+and nothing has to be loaded into memory when the app starts.
+"""
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+from quiz_core import Question, signed_id
+
+DEFAULT_REVIEW_PATH = os.path.join(os.path.expanduser("~"), ".quiz_app", "reviews.sqlite3")
+DAY = 24 * 60 * 60
+INITIAL_EASINESS = 2.5
+MIN_EASINESS = 1.3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    question_id INTEGER PRIMARY KEY,
+    category TEXT,
+    difficulty TEXT,
+    question_type TEXT,
+    payload TEXT NOT NULL,
+    repetitions INTEGER NOT NULL,
+    interval REAL NOT NULL,
+    easiness REAL NOT NULL,
+    lapses INTEGER NOT NULL,
+    due REAL NOT NULL,
+    reviewed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS cards_due ON cards (due);
+"""
+
+
+def answer_quality(correct: bool, timed_out: bool, response_time: float, time_limit: float) -> int:
+    """SM-2 grade (0-5) of one answer: 5 quick and right, 4 right, 1 wrong, 0 no answer."""
+    if timed_out:
+        return 0
+    if not correct:
+        return 1
+    return 5 if response_time <= time_limit / 2 else 4  # NaN (untimed) compares False
+
+
+def sm2(repetitions: int, interval: float, easiness: float, quality: int):
+    """Next (repetitions, interval in days, easiness) of a card graded `quality`."""
+    easiness = max(MIN_EASINESS, easiness + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if quality < 3:
+        return 0, 1.0, easiness
+    if repetitions == 0:
+        interval = 1.0
+    elif repetitions == 1:
+        interval = 6.0
+    else:
+        interval = round(interval * easiness)
+    return repetitions + 1, interval, easiness
+
+
+class ReviewScheduler:
+    """SQLite-backed SM-2 deck of missed questions."""
+
+    def __init__(self, path: str = DEFAULT_REVIEW_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+
+    @classmethod
+    def from_env(cls) -> "ReviewScheduler":
+        return cls(os.environ.get("QUIZ_APP_REVIEW_PATH", DEFAULT_REVIEW_PATH))
+
+    def grade(self, question: Question, quality: int, now: Optional[float] = None):
+        """Reschedule a card after an answer graded `quality`; a failed unknown question becomes a new card."""
+        with self._lock:
+            self._grade(question, quality, time.time() if now is None else now)
+            self._conn.commit()
+
+    def _grade(self, question: Question, quality: int, now: float):
+        key = signed_id(question.question_id)
+        row = self._conn.execute("SELECT repetitions, interval, easiness, lapses FROM cards WHERE question_id = ?",
+                                 (key,)).fetchone()
+        if row is None:
+            if quality >= 3:
+                return  # Only missed questions are worth reviewing
+            row = (0, 0.0, INITIAL_EASINESS, 0)
+        repetitions, interval, easiness = sm2(*row[:3], quality)
+        lapses = row[3] + (quality < 3)
+        self._conn.execute(
+            "INSERT INTO cards VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(question_id) DO UPDATE SET "
+            "repetitions = excluded.repetitions, interval = excluded.interval, easiness = excluded.easiness, "
+            "lapses = excluded.lapses, due = excluded.due, reviewed_at = excluded.reviewed_at",
+            (key, question.category, question.difficulty, question.question_type, json.dumps({
+                "question": question.prompt,
+                "correct_answer": question.correct_answer,
+                "incorrect_answers": question.incorrect_answers,
+            }), repetitions, interval, easiness, lapses, now + interval * DAY, now)
+        )
+
+    def record_session(self, session, now: Optional[float] = None) -> int:
+        """Grade every answered question of a QuizSession in one transaction; returns how many were graded."""
+        now = time.time() if now is None else now
+        with self._lock:
+            for index in range(session.answered):
+                question = session.questions[index]
+                correct = session.answer_sheet.is_correct(index)
+                timed_out = not correct and session.answer_sheet.answer(index, question) is None
+                self._grade(question, answer_quality(correct, timed_out, session.response_times[index],
+                                                     session.time_limit), now)
+            self._conn.commit()
+        return session.answered
+
+    def due(self, limit: int, category: Optional[str] = None, difficulty: Optional[str] = None,
+            question_type: Optional[str] = None, now: Optional[float] = None) -> List[Question]:
+        """Up to `limit` cards due by `now`, most overdue first."""
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT payload, category, difficulty, question_type FROM cards INDEXED BY cards_due "
+                "WHERE due <= ? AND (? IS NULL OR category = ?) AND (? IS NULL OR difficulty = ?) "
+                "AND (? IS NULL OR question_type = ?) ORDER BY due LIMIT ?",
+                (now, category, category, difficulty, difficulty, question_type, question_type, limit)
+            ).fetchall()
+        questions = []
+        for payload, category, difficulty, question_type in rows:
+            item = json.loads(payload)
+            questions.append(Question(item["question"], item["correct_answer"], item["incorrect_answers"],
+                                      category=category or "", difficulty=difficulty or "",
+                                      question_type=question_type or ""))
+        return questions
+
+    def due_count(self, now: Optional[float] = None) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cards WHERE due <= ?",
+                                      (time.time() if now is None else now,)).fetchone()[0]
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, int]:
+        now = time.time() if now is None else now
+        with self._lock:
+            cards, learned = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(repetitions >= 3), 0) FROM cards").fetchone()
+        return {"cards": cards, "due": self.due_count(now), "learned": learned}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def mix_due(due: Sequence[Question], fresh: Sequence[Question], rng: Optional[random.Random] = None) -> List[Question]:
+    """Shuffle due cards in among fresh questions, dropping fresh duplicates of a due card."""
+    due_ids = {question.question_id for question in due}
+    questions = list(due) + [question for question in fresh if question.question_id not in due_ids]
+    (rng or random.Random()).shuffle(questions)
+    return questions
+
+
+if __name__ == "__main__":
+    # Print the deck counters, e.g. `python review_scheduler.py [path]`
+    scheduler = ReviewScheduler(sys.argv[1]) if len(sys.argv) > 1 else ReviewScheduler.from_env()
+    for name, value in scheduler.stats().items():
+        print(f"{name}: {value}")